@@ -0,0 +1,165 @@
+import base64
+import random
+from typing import Any, Dict, List
+
+WORDS = (
+    "notebook cell output markdown image table value result model data plot "
+    "training loss accuracy epoch batch feature column index series frame"
+).split()
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _markdown_source(rng: random.Random, length: int) -> List[str]:
+    """
+    Builds a markdown cell of roughly the given number of characters.
+    """
+    lines = [f"# {_sentence(rng, 4).title()}\n", "\n"]
+    size = 0
+    while size < length:
+        kind = rng.random()
+        if kind < 0.2:
+            line = f"- {_sentence(rng, 6)}\n"
+        elif kind < 0.3:
+            line = f"## {_sentence(rng, 3)}\n"
+        elif kind < 0.35:
+            line = "```python\nx = compute(data)\n```\n"
+        else:
+            line = f"{_sentence(rng, 14)}\n"
+        lines.append(line)
+        size += len(line)
+    return lines
+
+
+def _html_table(rng: random.Random, rows: int, columns: int) -> List[str]:
+    """
+    Builds a pandas-like HTML table.
+    """
+    html = ['<div>\n<table border="1" class="dataframe">\n  <thead>\n    <tr>\n']
+    html.extend(f"      <th>col_{idx}</th>\n" for idx in range(columns))
+    html.append("    </tr>\n  </thead>\n  <tbody>\n")
+    for row in range(rows):
+        html.append(f"    <tr>\n      <th>{row}</th>\n")
+        html.extend(f"      <td>{rng.random():.6f}</td>\n" for _ in range(columns - 1))
+        html.append("    </tr>\n")
+    html.append("  </tbody>\n</table>\n</div>")
+    return html
+
+
+def generate_notebook(
+    cells: int = 100,
+    outputs_per_cell: int = 1,
+    images: int = 0,
+    image_size: int = 16 * 1024,
+    html_rows: int = 0,
+    html_columns: int = 8,
+    markdown_length: int = 400,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """
+    Generates a synthetic notebook.
+
+    Half of the cells are markdown cells, the other half are code cells carrying stream
+    outputs. Images and HTML tables are spread evenly over the code cells.
+
+    Args:
+        cells: Total number of cells
+        outputs_per_cell: Number of stream outputs of each code cell
+        images: Total number of embedded images
+        image_size: Size of each image in bytes
+        html_rows: Number of rows of the HTML table attached to each code cell (0 for none)
+        html_columns: Number of columns of the HTML tables
+        markdown_length: Approximate number of characters of each markdown cell
+        seed: Seed of the random generator, so the same arguments give the same notebook
+
+    Returns:
+        Dict[str, Any]: Notebook in nbformat 4 structure
+    """
+    rng = random.Random(seed)
+    code_cells = cells // 2
+    notebook_cells: List[Dict[str, Any]] = []
+
+    image_bytes = rng.getrandbits(8 * image_size).to_bytes(image_size, "little")
+    image_payload = base64.b64encode(image_bytes).decode("ascii")
+    code_idx = 0
+
+    for idx in range(cells):
+        if idx % 2 == 0:
+            notebook_cells.append(
+                {
+                    "cell_type": "markdown",
+                    "metadata": {},
+                    "source": _markdown_source(rng, markdown_length),
+                }
+            )
+            continue
+
+        outputs: List[Dict[str, Any]] = [
+            {
+                "output_type": "stream",
+                "name": "stdout",
+                "text": [f"{_sentence(rng, 8)}\n" for _ in range(5)],
+            }
+            for _ in range(outputs_per_cell)
+        ]
+
+        if html_rows:
+            outputs.append(
+                {
+                    "output_type": "execute_result",
+                    "execution_count": idx,
+                    "metadata": {},
+                    "data": {
+                        "text/plain": [
+                            f"{_sentence(rng, 6)}\n" for _ in range(html_rows)
+                        ],
+                        "text/html": _html_table(rng, html_rows, html_columns),
+                    },
+                }
+            )
+
+        # Distribute the images evenly over the code cells
+        cell_images = (images * (code_idx + 1)) // code_cells - (
+            images * code_idx
+        ) // code_cells
+        code_idx += 1
+        for _ in range(cell_images):
+            outputs.append(
+                {
+                    "output_type": "display_data",
+                    "metadata": {},
+                    "data": {
+                        "image/png": image_payload,
+                        "text/plain": ["<Figure size 640x480 with 1 Axes>"],
+                    },
+                }
+            )
+
+        notebook_cells.append(
+            {
+                "cell_type": "code",
+                "execution_count": idx,
+                "metadata": {},
+                "outputs": outputs,
+                "source": [
+                    "import numpy as np\n",
+                    f"result = np.mean([{idx}, {idx + 1}])\n",
+                    "print(result)",
+                ],
+            }
+        )
+
+    return {
+        "cells": notebook_cells,
+        "metadata": {
+            "kernelspec": {
+                "display_name": "Python 3",
+                "language": "python",
+                "name": "python3",
+            }
+        },
+        "nbformat": 4,
+        "nbformat_minor": 5,
+    }
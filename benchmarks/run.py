@@ -0,0 +1,209 @@
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.generate import generate_notebook
+from src.ipynb2md.notebook_converter import NotebookConverter
+
+# Each scenario stresses one axis of the notebook structure
+SCENARIOS: Dict[str, Dict[str, Any]] = {
+    "many_cells": {"cells": 5000},
+    "many_outputs": {"cells": 200, "outputs_per_cell": 200},
+    "many_images": {"cells": 100, "images": 400, "image_size": 64 * 1024},
+    "large_images": {"cells": 10, "images": 10, "image_size": 2 * 1024 * 1024},
+    "html_tables": {"cells": 100, "html_rows": 1000},
+    "long_markdown": {"cells": 20, "markdown_length": 500_000},
+}
+
+# Parameters that are multiplied by --scale
+SCALED_PARAMETERS = (
+    "cells",
+    "outputs_per_cell",
+    "images",
+    "html_rows",
+    "markdown_length",
+)
+
+STAGES = ("read_notebook", "convert", "save")
+
+
+def scale_parameters(parameters: Dict[str, Any], scale: float) -> Dict[str, Any]:
+    """
+    Shrinks or grows a scenario while keeping every axis at least 1.
+    """
+    return {
+        name: max(int(value * scale), 1) if name in SCALED_PARAMETERS else value
+        for name, value in parameters.items()
+    }
+
+
+def run_stage(notebook_path: Path, output_path: Path, stage: str) -> Callable[[], Any]:
+    """
+    Prepares a converter and returns the function that runs only the measured stage.
+    """
+    converter = NotebookConverter(str(notebook_path))
+    if stage == "read_notebook":
+        return converter.read_notebook
+
+    converter.read_notebook()
+    if stage == "convert":
+        return converter.convert
+    # Like the command line, which discards the converter after saving
+    return lambda: converter.save(str(output_path), release=True)
+
+
+def measure(
+    notebook_path: Path, output_path: Path, stage: str, repeat: int
+) -> Dict[str, float]:
+    """
+    Measures the best wall time, the peak traced memory of a stage and the memory
+    it leaves allocated.
+    """
+    timings: List[float] = []
+    for _ in range(repeat):
+        stage_function = run_stage(notebook_path, output_path, stage)
+        start = time.perf_counter()
+        stage_function()
+        timings.append(time.perf_counter() - start)
+
+    # Memory is traced in a separate run because tracing slows the code down
+    stage_function = run_stage(notebook_path, output_path, stage)
+    tracemalloc.start()
+    stage_function()
+    # The converter is kept alive by stage_function, so this is what it retains
+    retained, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    return {"seconds": min(timings), "peak_bytes": peak, "retained_bytes": retained}
+
+
+def run_benchmarks(
+    scenarios: Dict[str, Dict[str, Any]], scale: float, repeat: int
+) -> Dict[str, Any]:
+    """
+    Runs every scenario and stage.
+
+    Returns:
+        Dict[str, Any]: Results mapping scenario names to stage measurements
+    """
+    results: Dict[str, Any] = {}
+    with TemporaryDirectory() as temp_dir:
+        for name, parameters in scenarios.items():
+            parameters = scale_parameters(parameters, scale)
+            notebook_path = Path(temp_dir) / f"{name}.ipynb"
+            with open(notebook_path, "w", encoding="utf-8") as file:
+                json.dump(generate_notebook(**parameters), file)
+
+            scenario_results: Dict[str, Any] = {
+                "parameters": parameters,
+                "notebook_bytes": notebook_path.stat().st_size,
+            }
+            for stage in STAGES:
+                scenario_results[stage] = measure(
+                    notebook_path, notebook_path.with_suffix(".md"), stage, repeat
+                )
+                stage_results = scenario_results[stage]
+                print(
+                    f"{name:>14} {stage:>13}: "
+                    f"{stage_results['seconds'] * 1000:9.2f} ms "
+                    f"{stage_results['peak_bytes'] / 2**20:9.2f} MiB "
+                    f"{stage_results['retained_bytes'] / 2**20:9.2f} MiB held",
+                    file=sys.stderr,
+                )
+            results[name] = scenario_results
+
+    return results
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Compares results against a baseline.
+
+    Args:
+        results: Current results
+        baseline: Results of an earlier run
+        threshold: Allowed relative slowdown or memory growth (0.25 = 25%)
+
+    Returns:
+        List[str]: Description of every regression
+    """
+    regressions: List[str] = []
+    for name, scenario in results.items():
+        base_scenario = baseline.get(name)
+        # Scenarios run with different sizes are not comparable
+        if not base_scenario or base_scenario["parameters"] != scenario["parameters"]:
+            continue
+
+        for stage in STAGES:
+            for metric in ("seconds", "peak_bytes", "retained_bytes"):
+                current = scenario[stage][metric]
+                previous = base_scenario.get(stage, {}).get(metric)
+                if previous and current > previous * (1 + threshold):
+                    regressions.append(
+                        f"{name} {stage} {metric}: {previous:.6g} -> {current:.6g} "
+                        f"(+{(current / previous - 1) * 100:.0f}%)"
+                    )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmarks the notebook converter.")
+    parser.add_argument(
+        "--scale", type=float, default=1.0, help="Multiplier for scenario sizes"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="Timed runs per stage (best is kept)"
+    )
+    parser.add_argument(
+        "--only", nargs="+", choices=sorted(SCENARIOS), help="Scenarios to run"
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument(
+        "--baseline", help="JSON results of an earlier run to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative regression against the baseline (default: 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    scenarios = {
+        name: parameters
+        for name, parameters in SCENARIOS.items()
+        if not args.only or name in args.only
+    }
+    results = run_benchmarks(scenarios, args.scale, args.repeat)
+
+    report = {
+        "python": platform.python_version(),
+        "scale": args.scale,
+        "results": results,
+    }
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline.get("results", {}), args.threshold)
+        for regression in regressions:
+            print(f"REGRESSION: {regression}", file=sys.stderr)
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
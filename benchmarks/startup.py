@@ -0,0 +1,193 @@
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from typing import Any, Dict, List, Optional, Tuple
+
+from benchmarks.generate import generate_notebook
+
+ROOT = Path(__file__).resolve().parent.parent
+
+# Modules that converting a small notebook with default options must not import
+LAZY_MODULES = (
+    "multiprocessing",
+    "concurrent.futures",
+    "html.parser",
+    "ctypes",
+    "asyncio",
+)
+
+
+def run_cli(arguments: List[str], importtime: bool = False) -> Tuple[float, str]:
+    """
+    Runs the command line interface in a fresh interpreter.
+
+    Returns:
+        Tuple[float, str]: Wall time in seconds and the standard error output
+    """
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    command += arguments
+
+    start = time.perf_counter()
+    completed = subprocess.run(
+        command, cwd=ROOT, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True
+    )
+    duration = time.perf_counter() - start
+    if completed.returncode != 0:
+        raise RuntimeError(f"{' '.join(command)} failed:\n{completed.stderr}")
+    return duration, completed.stderr
+
+
+def parse_importtime(output: str) -> Dict[str, Any]:
+    """
+    Sums the import times reported by -X importtime.
+
+    Returns:
+        Dict[str, Any]: Total import time, the part spent after the package started
+        loading, and the names of every imported module
+    """
+    total = 0
+    package = 0
+    in_package = False
+    modules: List[str] = []
+    for line in output.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if not cumulative.strip().isdigit():
+            # Header line
+            continue
+        module = name.strip()
+        modules.append(module)
+        # Only top-level entries are counted, nested ones are part of them
+        if name.startswith("  "):
+            continue
+        total += int(cumulative)
+        in_package = in_package or module.startswith("src.ipynb2md")
+        if in_package:
+            package += int(cumulative)
+    return {"total_us": total, "package_us": package, "modules": modules}
+
+
+def measure_startup(repeat: int) -> Dict[str, Any]:
+    """
+    Measures interpreter startup, the CLI on a tiny notebook and its imports.
+
+    Returns:
+        Dict[str, Any]: Best wall times in seconds and the import breakdown
+    """
+    with TemporaryDirectory() as temp_dir:
+        notebook_path = Path(temp_dir) / "tiny.ipynb"
+        with open(notebook_path, "w", encoding="utf-8") as file:
+            json.dump(generate_notebook(cells=4), file)
+        cli = ["run.py", str(notebook_path)]
+
+        interpreter = min(run_cli(["-c", "pass"])[0] for _ in range(repeat))
+        cli_seconds = min(run_cli(cli)[0] for _ in range(repeat))
+        imports = parse_importtime(run_cli(cli, importtime=True)[1])
+
+    imported = set(imports.pop("modules"))
+    return {
+        "interpreter_seconds": interpreter,
+        "cli_seconds": cli_seconds,
+        # Time attributable to ipynb2md rather than to Python itself
+        "overhead_seconds": max(cli_seconds - interpreter, 0.0),
+        "import_total_us": imports["total_us"],
+        "import_package_us": imports["package_us"],
+        "eager_modules": sorted(
+            module for module in LAZY_MODULES if module in imported
+        ),
+    }
+
+
+def compare(
+    results: Dict[str, Any], baseline: Dict[str, Any], threshold: float
+) -> List[str]:
+    """
+    Compares results against a baseline.
+
+    Args:
+        results: Current results
+        baseline: Results of an earlier run
+        threshold: Allowed relative slowdown (0.25 = 25%)
+
+    Returns:
+        List[str]: Description of every regression
+    """
+    regressions: List[str] = []
+    for metric in ("overhead_seconds", "import_package_us"):
+        current = results[metric]
+        previous = baseline.get(metric)
+        if previous and current > previous * (1 + threshold):
+            regressions.append(
+                f"{metric}: {previous:.6g} -> {current:.6g} "
+                f"(+{(current / previous - 1) * 100:.0f}%)"
+            )
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Benchmarks the startup time of the command line interface."
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=10, help="Timed runs per measurement (best kept)"
+    )
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        help="Fail if converting the tiny notebook takes longer (e.g. 50)",
+    )
+    parser.add_argument("--output", help="Write the results to this JSON file")
+    parser.add_argument(
+        "--baseline", help="JSON results of an earlier run to compare against"
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=0.25,
+        help="Allowed relative regression against the baseline (default: 0.25)",
+    )
+    args = parser.parse_args(argv)
+
+    results = measure_startup(args.repeat)
+    print(
+        f"interpreter: {results['interpreter_seconds'] * 1000:7.1f} ms\n"
+        f"        cli: {results['cli_seconds'] * 1000:7.1f} ms "
+        f"(+{results['overhead_seconds'] * 1000:.1f} ms)\n"
+        f"    imports: {results['import_package_us'] / 1000:7.1f} ms of "
+        f"{results['import_total_us'] / 1000:.1f} ms",
+        file=sys.stderr,
+    )
+
+    if args.output:
+        report = {"python": platform.python_version(), "results": results}
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(report, file, indent=2, sort_keys=True)
+
+    failures: List[str] = []
+    if results["eager_modules"]:
+        failures.append(f"imported eagerly: {', '.join(results['eager_modules'])}")
+    if args.budget_ms and results["cli_seconds"] * 1000 > args.budget_ms:
+        failures.append(
+            f"CLI time {results['cli_seconds'] * 1000:.1f} ms exceeds the budget of "
+            f"{args.budget_ms:.0f} ms"
+        )
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as file:
+            baseline = json.load(file)
+        failures += compare(results, baseline.get("results", {}), args.threshold)
+
+    for failure in failures:
+        print(f"REGRESSION: {failure}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
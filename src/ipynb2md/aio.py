@@ -0,0 +1,159 @@
+import asyncio
+import os
+from concurrent.futures import Executor
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Optional, TypeVar
+
+from .api import ConvertedNotebook, NotebookSource, convert_notebook
+from .batch import ConversionResult, convert_file
+from .options import ConversionOptions
+
+# Notebooks of at least this many bytes only run in the lane for large notebooks
+LARGE_NOTEBOOK_SIZE = 4 << 20
+
+T = TypeVar("T")
+
+
+class AsyncConverter:
+    """
+    Converts notebooks from asyncio code without blocking the event loop.
+
+    Reading, parsing, decoding, rendering and writing run in an executor. At most
+    max_concurrency conversions run at once, and large notebooks may only take
+    max_large of those slots, so a few giant notebooks cannot hold up small ones.
+    """
+
+    def __init__(
+        self,
+        options: Optional[ConversionOptions] = None,
+        max_concurrency: int = 8,
+        max_large: int = 2,
+        large_size: int = LARGE_NOTEBOOK_SIZE,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        """
+        Constructor method of the AsyncConverter class.
+
+        Args:
+            options: Conversion settings
+            max_concurrency: Maximum number of conversions running at once, at least 2
+            max_large: Maximum number of large notebooks converted at once; at least one
+                slot is always left for small notebooks
+            large_size: Size in bytes from which a notebook counts as large
+            executor: Executor running the conversions (None uses the default executor
+                of the event loop). convert_file also works with a process pool.
+
+        Raises:
+            ValueError: If max_concurrency leaves no slot for small notebooks
+        """
+        if max_concurrency < 2:
+            raise ValueError(
+                "max_concurrency must be at least 2, one slot is kept for small "
+                f"notebooks (got {max_concurrency})"
+            )
+        self.options: ConversionOptions = (
+            options if options is not None else ConversionOptions()
+        )
+        self.max_concurrency: int = max_concurrency
+        self.max_large: int = max(min(max_large, self.max_concurrency - 1), 1)
+        self.large_size: int = large_size
+        self.executor: Optional[Executor] = executor
+        # Created on first use, so that they belong to the running event loop
+        self._slots: Optional[asyncio.Semaphore] = None
+        self._large_slots: Optional[asyncio.Semaphore] = None
+
+    @asynccontextmanager
+    async def _slot(self, size: int) -> AsyncIterator[None]:
+        """
+        Waits for a free conversion slot.
+
+        Args:
+            size: Size of the notebook in bytes (0 if unknown)
+        """
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.max_concurrency)
+            self._large_slots = asyncio.Semaphore(self.max_large)
+
+        large = size >= self.large_size
+        if large:
+            await self._large_slots.acquire()
+        try:
+            async with self._slots:
+                yield
+        finally:
+            if large:
+                self._large_slots.release()
+
+    async def _run(self, function: Callable[..., T], *args: Any) -> T:
+        """
+        Runs a function in the executor.
+
+        Args:
+            function: Function to run
+            args: Arguments of the function
+
+        Returns:
+            T: Return value of the function
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.run_in_executor(self.executor, function, *args)
+        try:
+            return await asyncio.shield(future)
+        except asyncio.CancelledError:
+            # A running conversion cannot be interrupted, so it keeps its slot until
+            # it ends
+            await asyncio.wait([future])
+            raise
+
+    async def convert(
+        self,
+        source: NotebookSource,
+        name: str = "notebook",
+        size: Optional[int] = None,
+        sink: Optional[Callable[[str, bytes], None]] = None,
+    ) -> ConvertedNotebook:
+        """
+        Converts a notebook in memory, see api.convert_notebook.
+
+        Args:
+            source: Parsed notebook, its JSON as bytes, or a file object
+            name: Name of the notebook, used for the image directory and as title
+                if it has no heading
+            size: Size of the notebook in bytes, chooses the lane of dictionaries and
+                file objects (bytes are measured)
+            sink: Receives the path and contents of each image on an executor thread
+
+        Returns:
+            ConvertedNotebook: Markdown, title and extracted files
+        """
+        if size is None:
+            size = len(source) if isinstance(source, (bytes, bytearray)) else 0
+
+        async with self._slot(size):
+            return await self._run(
+                convert_notebook, source, name, self.options, None, sink
+            )
+
+    async def convert_file(
+        self, input_file: str, output_file: Optional[str] = None
+    ) -> ConversionResult:
+        """
+        Converts a notebook file and writes the Markdown file, see batch.convert_file.
+
+        Args:
+            input_file: Path to .ipynb file to convert
+            output_file: Path to the output file (defaults to the input name with .md)
+
+        Returns:
+            ConversionResult: Result of the conversion
+        """
+        try:
+            size = (await self._run(os.stat, input_file)).st_size
+        except OSError:
+            # Reported by the conversion itself
+            size = 0
+
+        async with self._slot(size):
+            return await self._run(
+                convert_file, input_file, output_file, None, self.options
+            )
@@ -0,0 +1,132 @@
+import json
+from dataclasses import dataclass, field
+from typing import IO, Any, Callable, Dict, List, Optional, Union
+
+from .images import MemoryImageWriter
+from .notebook_converter import NotebookConverter
+from .options import ConversionOptions
+
+# Notebooks accepted by convert_notebook
+NotebookSource = Union[Dict[str, Any], bytes, bytearray, IO[str], IO[bytes]]
+
+
+@dataclass
+class ConvertedNotebook:
+    """Result of converting a notebook in memory."""
+
+    # Markdown content (empty when it was passed to a write function instead)
+    markdown: str
+    # First heading of the notebook, or its name
+    title: str
+    # Images and spilled outputs by the path the Markdown links them with (empty when
+    # they were passed to a sink instead)
+    files: Dict[str, bytes] = field(default_factory=dict)
+
+
+def load_notebook_data(source: NotebookSource) -> Dict[str, Any]:
+    """
+    Parses a notebook given as a dictionary, JSON bytes or a file object.
+
+    Args:
+        source: Parsed notebook, its JSON as bytes, or a text or binary file object
+
+    Returns:
+        Dict[str, Any]: Parsed notebook
+
+    Raises:
+        TypeError: If the source has an unsupported type
+        ValueError: If the source is not valid JSON
+    """
+    if isinstance(source, dict):
+        return source
+    if isinstance(source, (bytes, bytearray)):
+        return json.loads(source)
+    if hasattr(source, "read"):
+        return json.load(source)
+    raise TypeError(
+        "Expected a notebook dictionary, bytes or a file object, "
+        f"got {type(source).__name__}"
+    )
+
+
+def _detach_outputs(notebook_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Copies the containers that conversion modifies, so the caller's notebook is intact.
+
+    Image payloads are replaced in the output data once they are decoded; the payload
+    strings themselves are shared, not copied.
+
+    Args:
+        notebook_data: Parsed notebook
+
+    Returns:
+        Dict[str, Any]: Notebook with copied cells, outputs and output data
+    """
+    cells: List[Dict[str, Any]] = []
+    for cell_data in notebook_data.get("cells", []):
+        if "outputs" in cell_data:
+            outputs = [
+                dict(output, data=dict(output["data"])) if "data" in output else output
+                for output in cell_data["outputs"]
+            ]
+            cell_data = dict(cell_data, outputs=outputs)
+        cells.append(cell_data)
+    return dict(notebook_data, cells=cells)
+
+
+def convert_notebook(
+    source: NotebookSource,
+    name: str = "notebook",
+    options: Optional[ConversionOptions] = None,
+    write: Optional[Callable[[str], None]] = None,
+    sink: Optional[Callable[[str, bytes], None]] = None,
+) -> ConvertedNotebook:
+    """
+    Converts a notebook to Markdown without touching the file system.
+
+    Images are linked as <name>_images/<file>, like next to a converted file, but kept
+    in memory. Only the cache of the image optimizer is stored on disk, when images are
+    optimised. Options that only concern files (stream, image_workers, image_store) are
+    ignored.
+
+    Args:
+        source: Parsed notebook, its JSON as bytes, or a text or binary file object
+        name: Name of the notebook, used for the image directory and as fallback title
+        options: Conversion settings
+        write: Function receiving the Markdown fragments. If not specified, the Markdown
+            is returned in the result.
+        sink: Receives the path and contents of each image and spilled output. If not
+            specified, they are returned in the result.
+
+    Returns:
+        ConvertedNotebook: Markdown, title and extracted files
+
+    Raises:
+        TypeError: If the source has an unsupported type
+        ValueError: If the source is not valid JSON
+    """
+    options = options if options is not None else ConversionOptions()
+    notebook_data = _detach_outputs(load_notebook_data(source))
+
+    image_writer = MemoryImageWriter(
+        sink,
+        optimizer=options.create_image_optimizer(),
+        deterministic=options.deterministic,
+    )
+    converter = NotebookConverter(
+        f"{name}.ipynb",
+        image_writer=image_writer,
+        output_limits=options.output_limits(),
+        merge_streams=options.merge_streams,
+        table_limits=options.table_limits(),
+        display_priority=options.display_priority,
+        deterministic=options.deterministic,
+        normalize_volatile=options.normalize_volatile,
+    )
+    converter.load_notebook(notebook_data)
+
+    fragments: List[str] = []
+    converter.render(write if write else fragments.append, release=True)
+    return ConvertedNotebook(
+        "".join(fragments), converter.extract_title(), image_writer.files
+    )
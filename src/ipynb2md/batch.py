@@ -0,0 +1,339 @@
+import os
+import sys
+import time
+from pathlib import Path
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+)
+
+from .notebook_converter import NotebookConverter
+from .options import ConversionOptions
+from .profiling import NULL_PROFILER, Profiler
+
+if TYPE_CHECKING:
+    from .manifest import Manifest
+
+GLOB_CHARACTERS = "*?["
+
+
+class ConversionResult(NamedTuple):
+    """Outcome of converting a single notebook."""
+
+    input_file: str
+    success: bool
+    output: str
+    image_dir: Optional[str]
+    duration: float
+    skipped: bool = False
+    digest: Optional[str] = None
+    images: Optional[Dict[str, str]] = None
+    profile: Optional[Dict[str, Dict[str, Any]]] = None
+
+
+def discover_notebooks(paths: Iterable[str]) -> List[Path]:
+    """
+    Expands files, directories and glob patterns into a list of notebooks.
+
+    Args:
+        paths: File paths, directories or glob patterns given on the command line
+
+    Returns:
+        List[Path]: Notebook paths in a stable order, without duplicates
+    """
+    notebooks: List[Path] = []
+    seen = set()
+
+    def add(path: Path) -> None:
+        key = os.path.normpath(str(path))
+        if key not in seen:
+            seen.add(key)
+            notebooks.append(path)
+
+    for entry in paths:
+        if any(char in entry for char in GLOB_CHARACTERS):
+            import glob
+
+            for match in sorted(glob.glob(entry, recursive=True)):
+                match_path = Path(match)
+                if match_path.is_dir():
+                    for notebook in _walk_directory(match_path):
+                        add(notebook)
+                elif match_path.suffix == ".ipynb":
+                    add(match_path)
+        elif os.path.isdir(entry):
+            for notebook in _walk_directory(Path(entry)):
+                add(notebook)
+        else:
+            # Explicit files are kept even if missing so that the error is reported
+            add(Path(entry))
+
+    return notebooks
+
+
+def _walk_directory(directory: Path) -> List[Path]:
+    """
+    Finds every notebook below a directory, skipping Jupyter checkpoints.
+
+    Args:
+        directory: Directory to search
+
+    Returns:
+        List[Path]: Sorted notebook paths
+    """
+    return sorted(
+        path
+        for path in directory.rglob("*.ipynb")
+        if ".ipynb_checkpoints" not in path.parts
+    )
+
+
+def shard_of(path: Path, count: int) -> int:
+    """
+    Determines the shard a notebook belongs to from the hash of its path.
+
+    Args:
+        path: Notebook path as discovered (relative paths give the same split on every
+            machine, wherever the repository is checked out)
+        count: Number of shards
+
+    Returns:
+        int: Shard number, from 1 to count
+    """
+    import hashlib
+
+    key = Path(os.path.normpath(str(path))).as_posix()
+    digest = hashlib.sha256(key.encode("utf-8")).digest()
+    return int.from_bytes(digest[:8], "big") % count + 1
+
+
+def shard_notebooks(notebooks: Sequence[Path], index: int, count: int) -> List[Path]:
+    """
+    Selects the notebooks of one shard, e.g. of one CI runner.
+
+    Every runner computes the same split without coordination, and adding or removing
+    a notebook does not move the others to a different shard, so per-shard manifests
+    stay valid between runs.
+
+    Args:
+        notebooks: Discovered notebooks
+        index: Shard number, from 1 to count
+        count: Number of shards
+
+    Returns:
+        List[Path]: Notebooks of the shard in their original order
+    """
+    return [notebook for notebook in notebooks if shard_of(notebook, count) == index]
+
+
+def convert_file(
+    input_file: str,
+    output_file: Optional[str] = None,
+    previous: Optional[Dict[str, Any]] = None,
+    options: Optional[ConversionOptions] = None,
+) -> ConversionResult:
+    """
+    Converts a single notebook. Safe to run inside a worker process.
+
+    Args:
+        input_file: Path to .ipynb file to convert
+        output_file: Path to the output file (defaults to the input name with .md)
+        previous: Manifest entry of the last conversion, enables incremental rebuilds
+        options: Conversion settings
+
+    Returns:
+        ConversionResult: Result of the conversion
+    """
+    start = time.perf_counter()
+    options = options if options is not None else ConversionOptions()
+    profiler = Profiler() if options.profile else NULL_PROFILER
+    try:
+        digest = None
+        image_hashes = None
+        if previous is not None:
+            # Only needed for incremental rebuilds
+            from .manifest import file_digest, is_fresh
+
+            with profiler.stage("hash_notebook"):
+                digest = file_digest(Path(input_file))
+            image_hashes = previous.get("images")
+
+        with options.create_image_writer(profiler) as image_writer:
+            converter = NotebookConverter(
+                input_file,
+                image_hashes,
+                image_writer,
+                profiler,
+                options.output_limits(),
+                options.merge_streams,
+                options.table_limits(),
+                options.display_priority,
+                options.index_chunk_size,
+                options.deterministic,
+                options.normalize_volatile,
+            )
+            output_paths = converter.resolve_output_paths(output_file, options.formats)
+
+            if (
+                digest is not None
+                and is_fresh(
+                    previous,
+                    digest,
+                    options.cache_key(),
+                    output_paths[0],
+                    converter.image_dir,
+                )
+                # The manifest only records the file of the first format
+                and all(path.exists() for path in output_paths[1:])
+            ):
+                return ConversionResult(
+                    input_file,
+                    True,
+                    str(output_paths[0]),
+                    None,
+                    time.perf_counter() - start,
+                    skipped=True,
+                    digest=digest,
+                    images=previous.get("images", {}),
+                )
+
+            if options.stream:
+                success, output = converter.save_streaming(output_file, options.formats)
+            elif converter.read_notebook():
+                # The converter is discarded afterwards, so outputs are released
+                success, output = converter.save(
+                    output_file, options.formats, release=True
+                )
+            else:
+                duration = time.perf_counter() - start
+                return ConversionResult(
+                    input_file, False, "Notebook could not be read", None, duration
+                )
+
+        if success and options.deterministic and image_hashes:
+            from .manifest import remove_images
+
+            # Content-hashed names change with the image, drop the replaced files
+            stale = set(image_hashes) - set(converter.image_digests)
+            remove_images(converter.image_dir, stale)
+
+        image_dir = None
+        if (
+            success
+            and converter.image_dir.exists()
+            and any(converter.image_dir.iterdir())
+        ):
+            image_dir = str(converter.image_dir)
+
+        return ConversionResult(
+            input_file,
+            success,
+            output,
+            image_dir,
+            time.perf_counter() - start,
+            digest=digest,
+            images=converter.image_digests,
+            profile=profiler.to_dict() if profiler.enabled else None,
+        )
+    except Exception as e:
+        print(f"ERROR: {input_file} could not be converted. {str(e)}", file=sys.stderr)
+        return ConversionResult(
+            input_file, False, str(e), None, time.perf_counter() - start
+        )
+
+
+def convert_files(
+    input_files: List[Path],
+    jobs: int = 1,
+    output_file: Optional[str] = None,
+    on_result: Optional[Callable[[ConversionResult], None]] = None,
+    manifest: Optional["Manifest"] = None,
+    options: Optional[ConversionOptions] = None,
+) -> List[ConversionResult]:
+    """
+    Converts many notebooks, optionally spreading the work over a process pool.
+
+    Args:
+        input_files: Notebooks to convert
+        jobs: Number of worker processes (0 or less uses every CPU)
+        output_file: Output path, only meaningful for a single notebook
+        on_result: Callback invoked as soon as each notebook finishes
+        manifest: Manifest of earlier runs; unchanged notebooks are skipped and it is updated in place
+        options: Conversion settings shared by every notebook
+
+    Returns:
+        List[ConversionResult]: Results in the order of input_files
+    """
+    options = options if options is not None else ConversionOptions()
+    if jobs <= 0:
+        jobs = os.cpu_count() or 1
+    jobs = min(jobs, len(input_files)) or 1
+
+    results: List[Optional[ConversionResult]] = [None] * len(input_files)
+
+    def previous_entry(input_file: Path) -> Optional[Dict[str, Any]]:
+        if manifest is None:
+            return None
+        # An empty entry still asks the worker to hash the notebook
+        return manifest.get(str(input_file)) or {}
+
+    def record(idx: int, result: ConversionResult) -> None:
+        results[idx] = result
+        if manifest is not None and result.success and result.digest:
+            manifest.update(
+                result.input_file,
+                result.digest,
+                options.cache_key(),
+                result.output,
+                result.images or {},
+            )
+        if on_result:
+            on_result(result)
+
+    if jobs == 1:
+        for idx, input_file in enumerate(input_files):
+            result = convert_file(
+                str(input_file),
+                output_file,
+                previous_entry(input_file),
+                options,
+            )
+            record(idx, result)
+    else:
+        # multiprocessing is slow to import and not needed for a single job
+        from concurrent.futures import ProcessPoolExecutor, as_completed
+
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            futures = {
+                executor.submit(
+                    convert_file,
+                    str(input_file),
+                    output_file,
+                    previous_entry(input_file),
+                    options,
+                ): idx
+                for idx, input_file in enumerate(input_files)
+            }
+            for future in as_completed(futures):
+                idx = futures[future]
+                try:
+                    result = future.result()
+                except Exception as e:
+                    # The worker process itself died (e.g. killed by the OOM killer)
+                    print(
+                        f"ERROR: {input_files[idx]} could not be converted. {str(e)}",
+                        file=sys.stderr,
+                    )
+                    result = ConversionResult(
+                        str(input_files[idx]), False, str(e), None, 0.0
+                    )
+                record(idx, result)
+
+    return [result for result in results if result is not None]
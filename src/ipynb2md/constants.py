@@ -0,0 +1,20 @@
+# Values shared by the argument parser and the converter. This module imports nothing,
+# so that parsing the command line does not load the converter.
+
+# Formats extracted raster images can be converted to (--image-format)
+OUTPUT_FORMATS = ("png", "webp")
+
+# Representations of a display output in order of preference when only the best one is
+# written. Images come first as they are what plots and figures are meant to show.
+DEFAULT_DISPLAY_PRIORITY = (
+    "image/png",
+    "image/jpeg",
+    "image/svg+xml",
+    "image/gif",
+    "image/webp",
+    "image/bmp",
+    "text/markdown",
+    "text/html",
+    "text/latex",
+    "text/plain",
+)
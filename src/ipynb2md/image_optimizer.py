@@ -0,0 +1,249 @@
+import hashlib
+import io
+import os
+import sys
+import threading
+from pathlib import Path
+from typing import Any, Optional
+
+# Formats Pillow can re-encode; vector and animated images are written unchanged
+RASTER_EXTENSIONS = ("png", "jpg", "bmp", "webp")
+
+_warned_missing = False
+
+
+def sniff_extension(binary_data: bytes) -> Optional[str]:
+    """
+    Recognises the raster formats that can be optimised from their magic bytes.
+
+    Args:
+        binary_data: Decoded image
+
+    Returns:
+        Optional[str]: File extension, or None for other formats
+    """
+    if binary_data.startswith(b"\x89PNG\r\n\x1a\n"):
+        return "png"
+    if binary_data.startswith(b"\xff\xd8\xff"):
+        return "jpg"
+    if binary_data.startswith(b"BM"):
+        return "bmp"
+    if binary_data[:4] == b"RIFF" and binary_data[8:12] == b"WEBP":
+        return "webp"
+    return None
+
+
+def load_pillow() -> Optional[Any]:
+    """
+    Imports Pillow if it is installed.
+
+    Returns:
+        Optional[Any]: The PIL.Image module, or None if Pillow is not available
+    """
+    global _warned_missing
+    try:
+        from PIL import Image
+    except ImportError:
+        if not _warned_missing:
+            _warned_missing = True
+            print(
+                "WARNING: Pillow is not installed, images are written unchanged. "
+                "Install it with: pip install Pillow",
+                file=sys.stderr,
+            )
+        return None
+    return Image
+
+
+def default_cache_dir() -> Path:
+    """
+    Returns the directory of the persistent image cache.
+
+    Returns:
+        Path: $XDG_CACHE_HOME/ipynb2md/images, or ~/.cache/ipynb2md/images
+    """
+    cache_home = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(cache_home) / "ipynb2md" / "images"
+
+
+class ImageOptimizer:
+    """Downscales and re-encodes extracted images, caching the results on disk."""
+
+    def __init__(
+        self,
+        image_module: Any,
+        max_width: int = 0,
+        image_format: Optional[str] = None,
+        quality: int = 80,
+        cache_dir: Optional[str] = None,
+    ) -> None:
+        """
+        Constructor method of the ImageOptimizer class.
+
+        Args:
+            image_module: The PIL.Image module
+            max_width: Images wider than this are scaled down (0 keeps the size)
+            image_format: "png" or "webp" to convert raster images (None keeps the format)
+            quality: WebP and JPEG quality
+            cache_dir: Directory of the persistent cache (None uses the user cache directory)
+        """
+        self.image_module = image_module
+        self.max_width: int = max_width
+        self.image_format: Optional[str] = image_format
+        self.quality: int = quality
+        self.cache_dir: Path = Path(cache_dir) if cache_dir else default_cache_dir()
+        # Part of every cache key, so changed settings never reuse old results
+        self.signature: bytes = (
+            f"{max_width}:{image_format}:{quality}:{image_module.__name__}".encode()
+        )
+
+    def output_extension(self, extension: str, header: Optional[bytes] = None) -> str:
+        """
+        Returns the extension an image will have after optimisation.
+
+        Args:
+            extension: Extension of the embedded image
+            header: First bytes of the decoded image; if given, the image is only
+                converted when they show a raster format, whatever its MIME type says
+
+        Returns:
+            str: Extension of the written file
+        """
+        if header is not None and sniff_extension(header) is None:
+            return extension
+        if self.image_format and extension in RASTER_EXTENSIONS:
+            return self.image_format
+        return extension
+
+    def optimize(self, binary_data: bytes, target: Optional[str] = None) -> bytes:
+        """
+        Optimises an image, reusing the cached result for identical input.
+
+        Args:
+            binary_data: Decoded image
+            target: Extension of the file the result is written to; an image that has
+                to be converted to it is never returned unchanged
+
+        Returns:
+            bytes: Optimised image, or the input if it cannot be optimised
+
+        Raises:
+            ValueError: If the image cannot be converted to the target format
+        """
+        extension = sniff_extension(binary_data)
+        if extension is None:
+            return binary_data
+        converting = target is not None and target != extension
+
+        key = hashlib.sha256(self.signature + b"\0" + binary_data).hexdigest()
+        cache_path = self.cache_dir / f"{key}.{self.output_extension(extension)}"
+        try:
+            with open(cache_path, "rb") as file:
+                return file.read()
+        except OSError:
+            pass
+
+        try:
+            optimized = self._encode(binary_data, extension)
+        except Exception as e:
+            if converting:
+                # The file is named after the target format
+                raise ValueError(
+                    f"The image could not be converted to {target}. {str(e)}"
+                ) from e
+            print(
+                f"WARNING: The image could not be optimised, writing it unchanged. {str(e)}",
+                file=sys.stderr,
+            )
+            return binary_data
+
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            temp_path = cache_path.with_name(
+                f".{cache_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+            with open(temp_path, "wb") as file:
+                file.write(optimized)
+            os.replace(temp_path, cache_path)
+        except OSError:
+            # The cache only saves time; a read-only cache directory is not an error
+            pass
+
+        return optimized
+
+    def _encode(self, binary_data: bytes, extension: str) -> bytes:
+        """
+        Downscales and re-encodes an image with Pillow. Metadata is not copied.
+
+        Args:
+            binary_data: Decoded image
+            extension: Format of the decoded image
+
+        Returns:
+            bytes: Encoded image
+        """
+        image_module = self.image_module
+        output_extension = self.output_extension(extension)
+        resized = False
+
+        with image_module.open(io.BytesIO(binary_data)) as source:
+            image = source.copy()
+
+        if self.max_width and image.width > self.max_width:
+            height = max(round(image.height * self.max_width / image.width), 1)
+            resampling = getattr(image_module, "Resampling", image_module).LANCZOS
+            image = image.resize((self.max_width, height), resampling)
+            resized = True
+
+        output = io.BytesIO()
+        if output_extension == "webp":
+            image.save(output, "WEBP", quality=self.quality, method=4)
+        elif output_extension == "jpg":
+            if image.mode not in ("RGB", "L"):
+                image = image.convert("RGB")
+            image.save(output, "JPEG", quality=self.quality, optimize=True)
+        elif output_extension == "bmp":
+            image.save(output, "BMP")
+        else:
+            image.save(output, "PNG", optimize=True)
+
+        optimized = output.getvalue()
+        # Re-encoding in the same format and size does not always pay off
+        same_format = output_extension == extension
+        if not resized and same_format and len(optimized) >= len(binary_data):
+            return binary_data
+        return optimized
+
+
+def create_image_optimizer(
+    max_width: int = 0,
+    image_format: Optional[str] = None,
+    quality: int = 80,
+    cache_dir: Optional[str] = None,
+) -> Optional[ImageOptimizer]:
+    """
+    Creates an image optimizer if Pillow is installed.
+
+    Args:
+        max_width: Images wider than this are scaled down (0 keeps the size)
+        image_format: "png" or "webp" to convert raster images (None keeps the format)
+        quality: WebP and JPEG quality
+        cache_dir: Directory of the persistent cache
+
+    Returns:
+        Optional[ImageOptimizer]: Optimizer, or None if Pillow is not available
+    """
+    image_module = load_pillow()
+    if image_module is None:
+        return None
+    if image_format == "webp":
+        from PIL import features
+
+        if not features.check("webp"):
+            print(
+                "WARNING: Pillow was built without WebP support, images keep their "
+                "format.",
+                file=sys.stderr,
+            )
+            image_format = None
+    return ImageOptimizer(image_module, max_width, image_format, quality, cache_dir)
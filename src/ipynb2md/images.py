@@ -0,0 +1,778 @@
+import base64
+import binascii
+import io
+import os
+import sys
+from pathlib import Path
+from typing import (
+    IO,
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Set,
+    Union,
+)
+
+from .outputs import IfChangedFile, open_text_file
+from .profiling import NULL_PROFILER, Profiler
+
+if TYPE_CHECKING:
+    from concurrent.futures import Future
+
+    from .image_optimizer import ImageOptimizer
+
+# Base64 payload as embedded in the notebook: one string or a list of lines
+Base64Data = Union[str, List[str]]
+
+# Number of Base64 characters decoded at once
+DECODE_CHUNK_SIZE = 1 << 20
+
+
+class ExtractedImage(NamedTuple):
+    """Takes the place of an image payload once it has been handed to a writer."""
+
+    # Path written into the Markdown (empty if the image could not be extracted)
+    path: str
+
+
+def _text_windows(data: Base64Data, chunk_size: int) -> Iterator[str]:
+    """
+    Splits a Base64 payload into slices of about chunk_size characters.
+
+    Args:
+        data: Base64 payload
+        chunk_size: Approximate number of characters per slice
+
+    Returns:
+        Iterator[str]: Slices of the payload
+    """
+    if isinstance(data, str):
+        for start in range(0, len(data), chunk_size):
+            yield data[start : start + chunk_size]
+        return
+
+    # Lines of a payload usually share one length, so they are joined in batches
+    step = max(chunk_size // max(len(data[0]), 1), 1) if data else 1
+    for start in range(0, len(data), step):
+        yield from _text_windows("".join(data[start : start + step]), chunk_size)
+
+
+def iter_base64_text(
+    data: Base64Data, chunk_size: int = DECODE_CHUNK_SIZE
+) -> Iterator[str]:
+    """
+    Splits a Base64 payload into whitespace-free pieces that can be decoded separately.
+
+    Args:
+        data: Base64 payload
+        chunk_size: Approximate number of characters per piece
+
+    Returns:
+        Iterator[str]: Pieces whose length is a multiple of 4, except possibly the last
+    """
+    remainder = ""
+    for window in _text_windows(data, chunk_size):
+        # Line breaks inside the payload do not change the decoded image
+        text = remainder + "".join(window.split())
+        usable = len(text) - len(text) % 4
+        if usable:
+            yield text[:usable]
+        remainder = text[usable:]
+    if remainder:
+        yield remainder
+
+
+def decode_base64_chunks(data: Base64Data) -> Iterator[bytes]:
+    """
+    Decodes a Base64 payload piece by piece, so it is never held decoded as a whole.
+
+    Args:
+        data: Base64 payload
+
+    Returns:
+        Iterator[bytes]: Decoded pieces
+
+    Raises:
+        binascii.Error: If the payload is not valid Base64
+    """
+    for text in iter_base64_text(data):
+        yield base64.b64decode(text, validate=True)
+
+
+def decode_base64_header(data: Base64Data, size: int = 12) -> bytes:
+    """
+    Decodes only the first bytes of a payload, e.g. to recognise the image format.
+
+    Args:
+        data: Base64 payload
+        size: Number of bytes wanted
+
+    Returns:
+        bytes: Up to size bytes, empty if the payload does not start with valid Base64
+    """
+    length = (size + 2) // 3 * 4
+    text = next(iter_base64_text(data, length), "")[:length]
+    try:
+        return base64.b64decode(text[: len(text) - len(text) % 4], validate=True)
+    except binascii.Error:
+        return b""
+
+
+class ImageWriter:
+    """Decodes extracted images and writes them to disk on the calling thread."""
+
+    def __init__(
+        self,
+        store_dir: Optional[str] = None,
+        profiler: Optional[Profiler] = None,
+        optimizer: Optional["ImageOptimizer"] = None,
+        deterministic: bool = False,
+    ) -> None:
+        """
+        Constructor method of the ImageWriter class.
+
+        Args:
+            store_dir: Shared directory for content-addressed images. If not specified,
+                images are written to the image directory of each notebook.
+            profiler: Collects the time spent decoding and writing images
+            optimizer: Downscales and re-encodes images before they are written
+            deterministic: Name images in the notebook image directory by their content
+                instead of their position, and only rewrite text files that changed
+        """
+        self.profiler: Profiler = profiler if profiler else NULL_PROFILER
+        self.optimizer: Optional["ImageOptimizer"] = optimizer
+        self.deterministic: bool = deterministic
+        self.store_dir: Optional[Path] = None
+        self._claimed: Set[Path] = set()
+        self._claim_lock: Any = None
+        self._prepared: Set[Path] = set()
+
+        if store_dir:
+            self.store_dir = Path(store_dir).resolve()
+            os.makedirs(self.store_dir, exist_ok=True)
+        if store_dir or deterministic:
+            # Content-addressed images may be claimed by several writer threads
+            import threading
+
+            self._claim_lock = threading.Lock()
+
+    def image_path(
+        self, image_dir: Path, image_filename: str, data: Base64Data, extension: str
+    ) -> Path:
+        """
+        Decides where an image is stored.
+
+        In content-addressed mode the name is derived from the hash of the Base64 payload,
+        so identical images share one file across cells and notebooks. Deterministic
+        mode names images the same way inside the image directory of the notebook.
+
+        Args:
+            image_dir: Image directory of the notebook
+            image_filename: Name of the image inside the notebook image directory
+            data: Base64 encoded image data
+            extension: File extension of the image
+
+        Returns:
+            Path: Path of the image file
+        """
+        if self.optimizer is not None:
+            output_extension = self.optimizer.output_extension(
+                extension, decode_base64_header(data)
+            )
+            if output_extension != extension:
+                image_filename = f"{Path(image_filename).stem}.{output_extension}"
+                extension = output_extension
+
+        if self.store_dir is None and not self.deterministic:
+            return image_dir / image_filename
+
+        import hashlib
+
+        content_hash = hashlib.sha256()
+        for text in iter_base64_text(data):
+            content_hash.update(text.encode("ascii"))
+        if self.optimizer is not None:
+            content_hash.update(self.optimizer.signature)
+        directory = self.store_dir if self.store_dir is not None else image_dir
+        return directory / f"{content_hash.hexdigest()[:32]}.{extension}"
+
+    def prepare_directory(self, directory: Path) -> None:
+        """
+        Creates a directory before the first image is written to it.
+
+        Args:
+            directory: Image directory of a notebook
+        """
+        if directory not in self._prepared:
+            os.makedirs(directory, exist_ok=True)
+            self._prepared.add(directory)
+
+    def open_text_file(self, path: Path) -> IO[str]:
+        """
+        Opens a text file written next to the images, e.g. a spilled output.
+
+        Args:
+            path: Path of the file
+
+        Returns:
+            IO[str]: File opened for writing
+        """
+        if self.deterministic:
+            # Unchanged files keep their modification time
+            return IfChangedFile(path)
+        return open_text_file(path)
+
+    def _claim(self, image_path: Path) -> bool:
+        """
+        Checks whether a content-addressed image still has to be written.
+
+        Args:
+            image_path: Path of the image file in the store
+
+        Returns:
+            bool: True if the caller must write the image
+        """
+        with self._claim_lock:
+            if image_path in self._claimed:
+                return False
+            self._claimed.add(image_path)
+        return not image_path.exists()
+
+    def write_image(
+        self, image_path: Path, data: Base64Data, previous_digest: Optional[str] = None
+    ) -> str:
+        """
+        Decodes the Base64 image data and writes it unless the file is unchanged.
+
+        Args:
+            image_path: Path of the image file
+            data: Base64 encoded image data
+            previous_digest: Hash of the file written by a previous run, if any
+
+        Returns:
+            str: Digest identifying the image contents
+        """
+        with self.profiler.stage("image_write"):
+            return self._write_image(image_path, data, previous_digest)
+
+    def _write_image(
+        self, image_path: Path, data: Base64Data, previous_digest: Optional[str]
+    ) -> str:
+        """
+        Implementation of write_image.
+
+        Args:
+            image_path: Path of the image file
+            data: Base64 encoded image data
+            previous_digest: Hash of the file written by a previous run, if any
+
+        Returns:
+            str: Digest identifying the image contents
+        """
+        if self.deterministic or (
+            self.store_dir is not None and image_path.parent == self.store_dir
+        ):
+            # The file name already is the content hash
+            if self._claim(image_path):
+                try:
+                    self._write_chunks(image_path, data, atomic=True)
+                except Exception:
+                    with self._claim_lock:
+                        self._claimed.discard(image_path)
+                    raise
+            return image_path.stem
+
+        # Rewrite the file only if its contents changed since the previous run, so
+        # unchanged images are neither written nor optimised again
+        if previous_digest is not None and image_path.exists():
+            digest = self._digest(data)
+            if digest == previous_digest:
+                return digest
+
+        return self._write_chunks(image_path, data)
+
+    def _digest(self, data: Base64Data) -> str:
+        """
+        Calculates the digest of an image without keeping it decoded in memory.
+
+        Args:
+            data: Base64 encoded image data
+
+        Returns:
+            str: Digest identifying the image contents
+        """
+        import hashlib
+
+        content_hash = hashlib.sha256()
+        for chunk in decode_base64_chunks(data):
+            content_hash.update(chunk)
+        if self.optimizer is not None:
+            # Changed optimisation settings must rewrite the file
+            content_hash.update(self.optimizer.signature)
+        return content_hash.hexdigest()
+
+    def _write_chunks(
+        self, image_path: Path, data: Base64Data, atomic: bool = False
+    ) -> str:
+        """
+        Decodes an image piece by piece straight into its file.
+
+        Args:
+            image_path: Path of the image file
+            data: Base64 encoded image data
+            atomic: Write to a temporary file first so that concurrent writers never
+                expose a partial file
+
+        Returns:
+            str: Digest identifying the image contents
+        """
+        import hashlib
+
+        content_hash = hashlib.sha256()
+
+        def hashed_chunks() -> Iterator[bytes]:
+            for chunk in decode_base64_chunks(data):
+                content_hash.update(chunk)
+                yield chunk
+
+        chunks: Iterator[bytes] = hashed_chunks()
+        if self.optimizer is not None:
+            # Pillow needs the whole image
+            chunks = iter([self._optimize(b"".join(chunks), image_path.suffix[1:])])
+
+        written = self._store(image_path, chunks, atomic)
+        self.profiler.count("image_bytes_written", written)
+
+        if self.optimizer is not None:
+            content_hash.update(self.optimizer.signature)
+        return content_hash.hexdigest()
+
+    def _store(self, image_path: Path, chunks: Iterator[bytes], atomic: bool) -> int:
+        """
+        Writes the decoded pieces of an image to its file.
+
+        Args:
+            image_path: Path of the image file
+            chunks: Decoded pieces of the image
+            atomic: Write to a temporary file first
+
+        Returns:
+            int: Number of bytes written
+        """
+        target = image_path
+        if atomic:
+            import threading
+
+            target = image_path.with_name(
+                f".{image_path.name}.{os.getpid()}.{threading.get_ident()}.tmp"
+            )
+
+        written = 0
+        try:
+            with open(target, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+                    written += len(chunk)
+        except Exception:
+            # Never leave a truncated image behind
+            if target.exists():
+                target.unlink()
+            raise
+
+        if atomic:
+            os.replace(target, image_path)
+        return written
+
+    def _optimize(self, binary_data: bytes, target: str) -> bytes:
+        """
+        Passes a decoded image through the optimizer, if there is one.
+
+        Args:
+            binary_data: Decoded image
+            target: Extension of the image file
+
+        Returns:
+            bytes: Image to write
+
+        Raises:
+            ValueError: If the image cannot be converted to the format of its file
+        """
+        if self.optimizer is None:
+            return binary_data
+        with self.profiler.stage("image_optimize"):
+            return self.optimizer.optimize(binary_data, target)
+
+    def submit(
+        self,
+        image_path: Path,
+        data: Base64Data,
+        previous_digest: Optional[str],
+        on_written: Callable[[str], None],
+    ) -> None:
+        """
+        Schedules an image to be written. The base class writes it immediately.
+
+        Args:
+            image_path: Path of the image file
+            data: Base64 encoded image data
+            previous_digest: Hash of the file written by a previous run, if any
+            on_written: Called with the digest of the image once it has been written
+        """
+        on_written(self.write_image(image_path, data, previous_digest))
+
+    def pending(self, paths: Iterable[str]) -> bool:
+        """
+        Checks whether some of the given images are still being written.
+
+        Args:
+            paths: Image paths as returned by image_path
+
+        Returns:
+            bool: True if a link to them must wait (the base class writes images
+            immediately)
+        """
+        return False
+
+    def wait_for(self, paths: Iterable[str]) -> None:
+        """
+        Waits until the given images have been written or have failed.
+
+        Args:
+            paths: Image paths as returned by image_path
+        """
+
+    def failed_images(self, paths: Iterable[str]) -> Set[str]:
+        """
+        Returns the images that could not be written, so their links can be left out.
+
+        Failures returned here are not counted by join, the conversion no longer links
+        the missing files.
+
+        Args:
+            paths: Image paths as returned by image_path
+
+        Returns:
+            Set[str]: Paths of the failed images (the base class raises from submit
+            instead)
+        """
+        return set()
+
+    def join(self) -> int:
+        """
+        Waits until every submitted image has been written.
+
+        Returns:
+            int: Number of images that could not be written since the previous call
+            (the base class writes images immediately, so submit raises instead)
+        """
+        return 0
+
+    def close(self) -> None:
+        """
+        Releases the resources of the writer.
+        """
+
+    def __enter__(self) -> "ImageWriter":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class MemoryTextFile(io.StringIO):
+    """Text file that is handed to a sink when it is closed."""
+
+    def __init__(self, name: str, sink: Callable[[str, bytes], None]) -> None:
+        """
+        Constructor method of the MemoryTextFile class.
+
+        Args:
+            name: Name the contents are stored under
+            sink: Receives the name and the UTF-8 encoded contents
+        """
+        super().__init__()
+        self.name = name
+        self._sink = sink
+
+    def close(self) -> None:
+        if not self.closed:
+            self._sink(self.name, self.getvalue().encode("utf-8"))
+        super().close()
+
+
+class MemoryImageWriter(ImageWriter):
+    """Image writer that keeps images in memory instead of writing files."""
+
+    def __init__(
+        self,
+        sink: Optional[Callable[[str, bytes], None]] = None,
+        profiler: Optional[Profiler] = None,
+        optimizer: Optional["ImageOptimizer"] = None,
+        deterministic: bool = False,
+    ) -> None:
+        """
+        Constructor method of the MemoryImageWriter class.
+
+        Args:
+            sink: Receives the name and contents of every image and spilled output. If
+                not specified, they are collected in the files attribute.
+            profiler: Collects the time spent decoding images
+            optimizer: Downscales and re-encodes images before they are stored
+            deterministic: Name images by their content, see ImageWriter
+        """
+        super().__init__(None, profiler, optimizer, deterministic)
+        # Image paths as linked from the Markdown mapped to the file contents
+        self.files: Dict[str, bytes] = {}
+        self.sink: Callable[[str, bytes], None] = (
+            sink if sink else self.files.__setitem__
+        )
+
+    def prepare_directory(self, directory: Path) -> None:
+        """
+        Does nothing, no directory is needed.
+
+        Args:
+            directory: Image directory of a notebook
+        """
+
+    def open_text_file(self, path: Path) -> IO[str]:
+        """
+        Opens an in-memory text file that is passed to the sink when it is closed.
+
+        Args:
+            path: Path of the file
+
+        Returns:
+            IO[str]: File opened for writing
+        """
+        return MemoryTextFile(path.as_posix(), self.sink)
+
+    def _claim(self, image_path: Path) -> bool:
+        """
+        Checks whether a content-addressed image was not passed to the sink yet.
+
+        Args:
+            image_path: Path of the image, used as its name
+
+        Returns:
+            bool: True if the caller must store the image
+        """
+        # Files on disk are irrelevant, only images of this writer count
+        with self._claim_lock:
+            if image_path in self._claimed:
+                return False
+            self._claimed.add(image_path)
+        return True
+
+    def _store(self, image_path: Path, chunks: Iterator[bytes], atomic: bool) -> int:
+        """
+        Passes a decoded image to the sink.
+
+        Args:
+            image_path: Path of the image, used as its name
+            chunks: Decoded pieces of the image
+            atomic: Ignored, the sink receives complete images only
+
+        Returns:
+            int: Number of bytes stored
+        """
+        binary_data = b"".join(chunks)
+        self.sink(image_path.as_posix(), binary_data)
+        return len(binary_data)
+
+
+class ThreadedImageWriter(ImageWriter):
+    """Image writer that decodes and writes images on a bounded thread pool."""
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        max_pending: int = 0,
+        store_dir: Optional[str] = None,
+        profiler: Optional[Profiler] = None,
+        optimizer: Optional["ImageOptimizer"] = None,
+        deterministic: bool = False,
+    ) -> None:
+        """
+        Constructor method of the ThreadedImageWriter class.
+
+        Args:
+            max_workers: Number of writer threads
+            max_pending: Maximum number of queued images before submit blocks (default: 4 per worker)
+            store_dir: Shared directory for content-addressed images
+            profiler: Collects the time spent decoding and writing images
+            optimizer: Downscales and re-encodes images on the writer threads
+            deterministic: Name images by their content, see ImageWriter
+        """
+        super().__init__(store_dir, profiler, optimizer, deterministic)
+        self.max_workers: int = max_workers
+        self.max_pending: int = max_pending if max_pending > 0 else max_workers * 4
+        self.failures: int = 0
+        # Failures already returned by join or by failed_images
+        self._joined_failures: int = 0
+        # Images that could not be written, and those whose links already left them out
+        self._failed: Set[Path] = set()
+        self._reported: Set[Path] = set()
+        # Number of queued or running jobs by image path
+        self._pending_paths: Dict[Path, int] = {}
+
+        # concurrent.futures is only imported when images are written in the background
+        import threading
+        from concurrent.futures import ThreadPoolExecutor
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="ipynb2md-image"
+        )
+        # Back-pressure: keeps the Base64 payloads held by queued jobs bounded
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+        self._pending: Set["Future"] = set()
+        self._lock = threading.Lock()
+        # Notified whenever a job finishes
+        self._finished = threading.Condition(self._lock)
+
+    def _run(
+        self,
+        image_path: Path,
+        data: Base64Data,
+        previous_digest: Optional[str],
+        on_written: Callable[[str], None],
+    ) -> None:
+        """
+        Writes a single image on a worker thread.
+
+        Args:
+            image_path: Path of the image file
+            data: Base64 encoded image data
+            previous_digest: Hash of the file written by a previous run, if any
+            on_written: Called with the digest of the image once it has been written
+        """
+        try:
+            on_written(self.write_image(image_path, data, previous_digest))
+        except Exception as e:
+            with self._lock:
+                self.failures += 1
+                self._failed.add(image_path)
+            if isinstance(e, binascii.Error):
+                message = f"WARNING: Invalid Base64 data. {image_path}"
+            else:
+                message = (
+                    f"WARNING: The image could not be written. {image_path}. {str(e)}"
+                )
+            print(message, file=sys.stderr)
+        finally:
+            with self._finished:
+                count = self._pending_paths.pop(image_path) - 1
+                if count:
+                    self._pending_paths[image_path] = count
+                self._finished.notify_all()
+            self._slots.release()
+
+    def submit(
+        self,
+        image_path: Path,
+        data: Base64Data,
+        previous_digest: Optional[str],
+        on_written: Callable[[str], None],
+    ) -> None:
+        """
+        Queues an image to be written, blocking while too many images are pending.
+
+        Args:
+            image_path: Path of the image file
+            data: Base64 encoded image data
+            previous_digest: Hash of the file written by a previous run, if any
+            on_written: Called with the digest of the image once it has been written;
+                failures, e.g. invalid Base64 data, are reported by failed_images
+        """
+        self._slots.acquire()
+        with self._lock:
+            self._pending_paths[image_path] = self._pending_paths.get(image_path, 0) + 1
+        future = self._executor.submit(
+            self._run, image_path, data, previous_digest, on_written
+        )
+        with self._lock:
+            self._pending.add(future)
+        future.add_done_callback(self._discard)
+
+    def _discard(self, future: "Future") -> None:
+        with self._lock:
+            self._pending.discard(future)
+
+    def pending(self, paths: Iterable[str]) -> bool:
+        """
+        Checks whether some of the given images are still being written.
+
+        Args:
+            paths: Image paths as returned by image_path
+
+        Returns:
+            bool: True if a link to them must wait
+        """
+        with self._lock:
+            return any(Path(path) in self._pending_paths for path in paths)
+
+    def wait_for(self, paths: Iterable[str]) -> None:
+        """
+        Waits until the given images have been written or have failed.
+
+        Args:
+            paths: Image paths as returned by image_path
+        """
+        image_paths = [Path(path) for path in paths]
+        with self._finished:
+            self._finished.wait_for(
+                lambda: not any(path in self._pending_paths for path in image_paths)
+            )
+
+    def failed_images(self, paths: Iterable[str]) -> Set[str]:
+        """
+        Returns the images that could not be written, so their links can be left out.
+
+        Failures returned here are not counted by join, the conversion no longer links
+        the missing files.
+
+        Args:
+            paths: Image paths as returned by image_path
+
+        Returns:
+            Set[str]: Paths of the failed images
+        """
+        with self._lock:
+            failed = {path for path in paths if Path(path) in self._failed}
+            reported = {Path(path) for path in failed} - self._reported
+            self._reported.update(reported)
+            self._joined_failures += len(reported)
+        return failed
+
+    def join(self) -> int:
+        """
+        Waits until every submitted image has been written.
+
+        Returns:
+            int: Number of images that could not be written since the previous call and
+            were not returned by failed_images; their links have already been written,
+            so the conversion has failed
+        """
+        from concurrent.futures import wait
+
+        with self._lock:
+            pending = list(self._pending)
+        wait(pending)
+        with self._lock:
+            failures = self.failures - self._joined_failures
+            self._joined_failures = self.failures
+            self._failed.clear()
+            self._reported.clear()
+        return failures
+
+    def close(self) -> None:
+        """
+        Waits for the pending images and stops the worker threads.
+        """
+        self._executor.shutdown(wait=True)
@@ -0,0 +1,111 @@
+from typing import Any, Dict, List, Tuple, Union
+
+from .patterns import LazyPattern
+
+DEFAULT_LANGUAGE = "python"
+
+# Source code rules in priority order: when several match, the earliest rule wins.
+# Each rule lists literal substrings that must occur for its pattern to be able to
+# match; these cheap checks skip most regex searches. The source is lower-cased first.
+SOURCE_RULES: List[Tuple[str, Tuple[str, ...], LazyPattern]] = [
+    (
+        "python",
+        ("import",),
+        LazyPattern(r"import\s+[a-z_][a-z0-9_]*|from\s+[a-z_][a-z0-9_]*\s+import"),
+    ),
+    ("r", ("library(", "require("), LazyPattern(r"library\(|require\(")),
+    (
+        "javascript",
+        ("console.log", "document.get", "var", "let", "const"),
+        LazyPattern(
+            r"console\.log|document\.get|var\s+[a-z_]|let\s+[a-z_]|const\s+[a-z_]"
+        ),
+    ),
+    (
+        "java",
+        ("public",),
+        LazyPattern(r"public\s+(?:static\s+)?class|public\s+(?:static\s+)?void"),
+    ),
+    ("java", ("system.out.println",), LazyPattern(r"system\.out\.println")),
+    ("c", ("printf", "scanf", "#include"), LazyPattern(r"printf|scanf|#include")),
+    ("cpp", ("cout", "cin", "namespace"), LazyPattern(r"cout|cin|namespace")),
+    ("cpp", ("using", "template"), LazyPattern(r"using\s+namespace|template\s*<")),
+    ("go", ("func",), LazyPattern(r"func\s+[a-z_][a-z0-9_]*\s*\(")),
+    ("go", ("package",), LazyPattern(r"package\s+main")),
+]
+
+SQL_KEYWORDS = ("select", "from", "where", "insert", "update", "delete")
+
+# Substrings of kernel names in priority order
+KERNEL_NAME_RULES: List[Tuple[Tuple[str, ...], str]] = [
+    (("python",), "python"),
+    (("ir",), "r"),
+    (("julia",), "julia"),
+    (("javascript", "js"), "javascript"),
+    (("typescript", "ts"), "typescript"),
+    (("java",), "java"),
+]
+
+
+def language_from_kernelspec(kernelspec: Dict[str, Any]) -> str:
+    """
+    Determines the language from a kernelspec dictionary.
+
+    Args:
+        kernelspec: The "kernelspec" entry of notebook or cell metadata
+
+    Returns:
+        str: Lower-case language name, or an empty string if it cannot be determined
+    """
+    kernel_language = kernelspec.get("language", "").lower()
+    if kernel_language:
+        return kernel_language
+
+    kernel_name = kernelspec.get("name", "").lower()
+    if kernel_name == "r":
+        return "r"
+
+    for fragments, language in KERNEL_NAME_RULES:
+        if any(fragment in kernel_name for fragment in fragments):
+            return language
+
+    return ""
+
+
+def language_from_notebook_metadata(metadata: Dict[str, Any]) -> str:
+    """
+    Determines the language of a notebook from its top-level metadata.
+
+    Args:
+        metadata: The "metadata" entry of the notebook
+
+    Returns:
+        str: Lower-case language name, or an empty string if it cannot be determined
+    """
+    language = language_from_kernelspec(metadata.get("kernelspec", {}))
+    if not language:
+        language = metadata.get("language_info", {}).get("name", "").lower()
+    return language
+
+
+def detect_source_language(source: Union[str, List[str]]) -> str:
+    """
+    Guesses the language of a code cell from its source code.
+
+    Args:
+        source: Source code as a string or a list of lines
+
+    Returns:
+        str: Detected language, or an empty string if no rule matches
+    """
+    code = (source if isinstance(source, str) else "".join(source)).lower()
+
+    for language, triggers, pattern in SOURCE_RULES:
+        if any(trigger in code for trigger in triggers) and pattern.search(code):
+            return language
+
+    # SQL statements are only recognised when the code ends with a semicolon
+    if code.rstrip().endswith(";") and any(keyword in code for keyword in SQL_KEYWORDS):
+        return "sql"
+
+    return ""
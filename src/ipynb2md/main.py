@@ -1,5 +1,61 @@
-from src.ipynb2md.notebook_converter import NotebookConverter
-from src.ipynb2md.utils import setup_argparser
+import sys
+import time
+from typing import TYPE_CHECKING, List, Optional
+
+from .utils import setup_argparser
+
+if TYPE_CHECKING:
+    from .batch import ConversionResult
+
+
+def report_result(result: "ConversionResult") -> None:
+    """
+    Prints the outcome of a single conversion.
+
+    Args:
+        result: Result of the conversion
+    """
+    if result.skipped:
+        print(f"Up to date: {result.output}")
+    elif result.success:
+        print(f"Conversion successful: {result.output}")
+        # Provide information for extracted images
+        if result.image_dir:
+            print(f"Extracted images: {result.image_dir}")
+    else:
+        print(f"Conversion failed: {result.input_file}", file=sys.stderr)
+
+
+def merge_report_files(paths: List[str], output: Optional[str]) -> int:
+    """
+    Combines the reports of several shards.
+
+    Args:
+        paths: Report files written with --report
+        output: Path of the combined report (None only prints the summary)
+
+    Returns:
+        int: Exit code (0: every shard succeeded, 1: failures or missing shards)
+    """
+    from .report import format_summary, load_report, merge_reports, write_report
+
+    try:
+        report = merge_reports([load_report(path) for path in paths])
+    except (OSError, ValueError) as e:
+        print(f"ERROR: Reports could not be merged. {str(e)}", file=sys.stderr)
+        return 1
+
+    if output:
+        write_report(output, report)
+    print(format_summary(report))
+    if report["missing_shards"]:
+        print(
+            "ERROR: No report for shard "
+            f"{', '.join(map(str, report['missing_shards']))} "
+            f"of {report['shard_count']}.",
+            file=sys.stderr,
+        )
+    return 1 if report["summary"]["failed"] or report["missing_shards"] else 0
 
 
 def main() -> int:
@@ -12,22 +68,126 @@ def main() -> int:
     parser = setup_argparser()
     args = parser.parse_args()
 
-    # Create the converter
-    converter = NotebookConverter(args.input_file)
+    if args.merge_reports:
+        return merge_report_files(args.input_files, args.report)
+    if args.shard and args.watch:
+        parser.error("--shard cannot be used with --watch")
+
+    # The converter is imported after parsing, so --help and usage errors stay fast
+    from .batch import convert_files, discover_notebooks, shard_notebooks
+    from .options import ConversionOptions
+    from .profiling import Profiler
+    from .renderers import RENDERERS
 
-    # Read the Notebook
-    if not converter.read_notebook():
+    input_files = discover_notebooks(args.input_files)
+    # Watch mode picks up notebooks created later
+    if not input_files and not args.watch:
+        print("ERROR: No notebooks found.", file=sys.stderr)
         return 1
 
-    # Convert and save
-    success, output_path = converter.save(args.output)
+    if args.output and len(input_files) > 1:
+        parser.error("-o/--output can only be used with a single notebook")
 
-    if success:
-        print(f"Conversion successful: {output_path}")
-        # Provide information for extracted images
-        images_path = converter.image_dir
-        if images_path.exists() and any(images_path.iterdir()):
-            print(f"Extracted images: {images_path}")
+    if args.shard:
+        # An empty shard is not an error, other runners convert the notebooks
+        input_files = shard_notebooks(input_files, *args.shard)
+
+    unknown_formats = [name for name in args.formats if name not in RENDERERS]
+    if unknown_formats:
+        parser.error(
+            f"unknown output format: {', '.join(unknown_formats)} "
+            f"(choose from {', '.join(RENDERERS)})"
+        )
+
+    options = ConversionOptions(
+        stream=args.stream,
+        image_workers=args.image_workers,
+        image_store=args.image_store,
+        profile=args.profile,
+        optimize_images=args.optimize_images,
+        image_max_width=args.image_max_width,
+        image_format=args.image_format,
+        image_quality=args.image_quality,
+        image_cache=args.image_cache,
+        max_output_lines=args.max_output_lines,
+        max_output_bytes=args.max_output_bytes,
+        max_cell_lines=args.max_cell_lines,
+        max_cell_bytes=args.max_cell_bytes,
+        spill_outputs=args.spill_outputs,
+        merge_streams=not args.raw_streams,
+        html_tables=args.html_tables,
+        max_table_rows=args.max_table_rows,
+        max_table_columns=args.max_table_columns,
+        display_priority=args.display_priority,
+        formats=args.formats,
+        index_chunk_size=args.index_chunk_size,
+        deterministic=args.deterministic,
+        normalize_volatile=args.normalize_volatile,
+    )
+    profiler = Profiler()
+
+    def on_result(result: "ConversionResult") -> None:
+        report_result(result)
+        if result.profile:
+            profiler.merge(result.profile)
+
+    if args.watch:
+        from .manifest import Manifest
+        from .watch import watch
+
+        # An in-memory manifest keeps the image hashes between conversions
+        manifest = Manifest(args.manifest)
+        manifest.load()
+        try:
+            watch(
+                args.input_files,
+                options,
+                manifest,
+                on_result=on_result,
+                output_file=args.output,
+            )
+        except KeyboardInterrupt:
+            pass
         return 0
-    else:
-        return 1
+
+    manifest = None
+    if args.manifest:
+        from .manifest import Manifest
+
+        manifest = Manifest(args.manifest)
+        manifest.load()
+
+    # Convert and save
+    start = time.perf_counter()
+    results = convert_files(
+        input_files,
+        jobs=args.jobs,
+        output_file=args.output,
+        on_result=on_result,
+        manifest=manifest,
+        options=options,
+    )
+
+    if manifest is not None:
+        manifest.prune()
+        manifest.save()
+
+    if args.report:
+        from .report import build_report, write_report
+
+        report = build_report(
+            results,
+            args.shard,
+            time.perf_counter() - start,
+            profiler.to_dict() if args.profile else None,
+        )
+        write_report(args.report, report)
+
+    if args.profile:
+        print(profiler.report(), file=sys.stderr)
+
+    failed = sum(1 for result in results if not result.success)
+    if len(results) > 1:
+        print(f"Converted {len(results) - failed} of {len(results)} notebooks.")
+
+    return 1 if failed else 0
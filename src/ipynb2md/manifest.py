@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+# Bump when the layout of the manifest file changes incompatibly
+MANIFEST_VERSION = 1
+
+
+@lru_cache(maxsize=None)
+def package_version() -> str:
+    """
+    Returns the installed version of ipynb2md, so an upgrade rebuilds every notebook.
+
+    Returns:
+        str: Version string, or "unknown" when running from a source checkout
+    """
+    # importlib.metadata scans the installed distributions, so it is only loaded here
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("ipynb2md")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+def file_digest(path: Path, chunk_size: int = 1 << 20) -> str:
+    """
+    Calculates the SHA-256 digest of a file without loading it at once.
+
+    Args:
+        path: File to hash
+        chunk_size: Number of bytes read per iteration
+
+    Returns:
+        str: Hexadecimal digest
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as file:
+        for chunk in iter(lambda: file.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class Manifest:
+    """Persistent record of converted notebooks used for incremental rebuilds."""
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        """
+        Constructor method of the Manifest class.
+
+        Args:
+            path: Path to the JSON manifest file (None keeps the manifest in memory only)
+        """
+        self.path: Optional[Path] = Path(path) if path else None
+        self.entries: Dict[str, Dict[str, Any]] = {}
+
+    @staticmethod
+    def key(input_file: str) -> str:
+        """
+        Builds the manifest key of a notebook.
+
+        Args:
+            input_file: Path to the notebook
+
+        Returns:
+            str: Normalised absolute path
+        """
+        return str(Path(input_file).resolve())
+
+    def load(self) -> bool:
+        """
+        Loads the manifest from disk. A missing or unreadable file yields an empty manifest.
+
+        Returns:
+            bool: True if existing entries were loaded, False otherwise
+        """
+        if self.path is None:
+            return False
+
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                data = json.load(file)
+        except FileNotFoundError:
+            return False
+        except (json.JSONDecodeError, PermissionError) as e:
+            print(
+                f"WARNING: Manifest {self.path} could not be read, rebuilding. {str(e)}",
+                file=sys.stderr,
+            )
+            return False
+
+        if not isinstance(data, dict) or data.get("version") != MANIFEST_VERSION:
+            return False
+
+        self.entries = data.get("entries", {})
+        return True
+
+    def save(self) -> None:
+        """
+        Writes the manifest atomically so an interrupted run never corrupts it.
+        """
+        if self.path is None:
+            return
+
+        os.makedirs(self.path.parent, exist_ok=True)
+
+        temp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(temp_path, "w", encoding="utf-8") as file:
+            json.dump(
+                {"version": MANIFEST_VERSION, "entries": self.entries},
+                file,
+                sort_keys=True,
+            )
+        os.replace(temp_path, self.path)
+
+    def get(self, input_file: str) -> Optional[Dict[str, Any]]:
+        """
+        Returns the recorded entry of a notebook.
+
+        Args:
+            input_file: Path to the notebook
+
+        Returns:
+            Optional[Dict[str, Any]]: Entry or None if the notebook was never converted
+        """
+        return self.entries.get(self.key(input_file))
+
+    def update(
+        self,
+        input_file: str,
+        digest: str,
+        options: Dict[str, Any],
+        output: str,
+        images: Dict[str, str],
+    ) -> None:
+        """
+        Records a successful conversion.
+
+        Args:
+            input_file: Path to the notebook
+            digest: Content hash of the notebook
+            options: Converter options that influence the output
+            output: Path to the written Markdown file
+            images: Image file names mapped to the hash of their contents
+        """
+        self.entries[self.key(input_file)] = {
+            "digest": digest,
+            "options": options,
+            "output": str(Path(output).resolve()),
+            "images": images,
+        }
+
+    def prune(self) -> List[str]:
+        """
+        Drops the entries of deleted notebooks together with their extracted images.
+
+        Images in a shared store are kept, other notebooks may still link to them.
+
+        Returns:
+            List[str]: Paths of the notebooks whose entries were removed
+        """
+        removed = [key for key in self.entries if not Path(key).exists()]
+        for key in removed:
+            entry = self.entries.pop(key)
+            # Same location as NotebookConverter.image_dir
+            image_dir = Path(key).parent / f"{Path(key).stem}_images"
+            remove_images(image_dir, entry.get("images", {}))
+            try:
+                image_dir.rmdir()
+            except OSError:
+                # Missing, or still holding files the manifest does not know about
+                pass
+        return removed
+
+
+def remove_images(image_dir: Path, names: Iterable[str]) -> None:
+    """
+    Deletes images recorded in a manifest entry from the image directory of a notebook.
+
+    Only plain file names are removed. Images in a shared store are recorded by their
+    full path and are never deleted.
+
+    Args:
+        image_dir: Image directory of the notebook
+        names: Image names recorded in the manifest
+    """
+    for name in names:
+        path = Path(name)
+        if path.is_absolute() or path.name != name or name == "..":
+            continue
+        try:
+            (image_dir / name).unlink()
+        except FileNotFoundError:
+            pass
+
+
+def is_fresh(
+    entry: Optional[Dict[str, Any]],
+    digest: str,
+    options: Dict[str, Any],
+    output_file: Path,
+    image_dir: Path,
+) -> bool:
+    """
+    Checks whether a recorded conversion is still valid.
+
+    Args:
+        entry: Manifest entry of the notebook
+        digest: Current content hash of the notebook
+        options: Current converter options
+        output_file: Path the Markdown file would be written to
+        image_dir: Directory the images of the notebook are extracted to
+
+    Returns:
+        bool: True if the notebook can be skipped
+    """
+    if (
+        entry is None
+        or entry.get("digest") != digest
+        or entry.get("options") != options
+        or entry.get("output") != str(output_file.resolve())
+        or not output_file.exists()
+    ):
+        return False
+
+    # Outputs deleted by hand must be regenerated
+    return all((image_dir / name).exists() for name in entry.get("images", {}))
@@ -0,0 +1,149 @@
+from typing import Callable, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .outputs import iter_lines
+from .patterns import LazyPattern
+
+# Patterns are matched at the start of a single line, and only tried when the first
+# character of the line allows a match
+HEADING_PATTERN = LazyPattern(r"#{1,6}\s")
+LIST_ITEM_PATTERN = LazyPattern(r"[ \t]*(?:[-*+]|\d{1,9}[.)])\s")
+FENCE_PATTERN = LazyPattern(r" {0,3}(`{3,}|~{3,})")
+FENCE_START = frozenset(" `~")
+LIST_ITEM_START = frozenset(" \t-*+0123456789")
+
+
+class MarkdownSummary(NamedTuple):
+    """Information collected while normalising a markdown cell."""
+
+    # Text of the first "# " heading outside code blocks, if any
+    title: Optional[str]
+    # Number of line breaks at the end of the written text (at most 2)
+    trailing_newlines: int
+
+
+def _fence_end(line: str, fence: str) -> bool:
+    """
+    Checks whether a line closes a fenced code block.
+
+    Args:
+        line: Line inside the block
+        fence: Backticks or tildes that opened the block
+
+    Returns:
+        bool: True if the line closes the block
+    """
+    match = FENCE_PATTERN.match(line)
+    return (
+        match is not None
+        and match.group(1)[0] == fence[0]
+        and len(match.group(1)) >= len(fence)
+        and not line[match.end() :].strip()
+    )
+
+
+def normalize_markdown(
+    source: Union[str, Iterable[str]], write: Callable[[str], None]
+) -> MarkdownSummary:
+    """
+    Normalises the spacing of markdown in a single pass over its lines: a blank line is
+    inserted after headings and lists and around fenced code blocks, whose contents are
+    left untouched. The first title is collected during the same pass.
+
+    Args:
+        source: Markdown source as a string or a list of lines
+        write: Function receiving the normalised Markdown fragments
+
+    Returns:
+        MarkdownSummary: Title and trailing line breaks of the written text
+    """
+    title: Optional[str] = None
+    # Backticks or tildes of the open code block
+    fence: Optional[str] = None
+    in_list = False
+    blank_needed = False
+    # The start of the text counts as blank so nothing is inserted before it
+    previous_blank = True
+    trailing_newlines = 0
+
+    for line in iter_lines(source):
+        if fence is not None:
+            write(line)
+            if _fence_end(line, fence):
+                fence = None
+                blank_needed = True
+            previous_blank = False
+
+        elif line.isspace():
+            write(line)
+            in_list = False
+            blank_needed = False
+            previous_blank = True
+
+        else:
+            first = line[0]
+            fence_match = FENCE_PATTERN.match(line) if first in FENCE_START else None
+            if fence_match and not (
+                fence_match.group(1)[0] == "`" and "`" in line[fence_match.end() :]
+            ):
+                fence = fence_match.group(1)
+                blank_needed = True
+                in_list = False
+            else:
+                # Indented lines continue the list, anything else ends it
+                if first in LIST_ITEM_START and LIST_ITEM_PATTERN.match(line):
+                    in_list = True
+                elif in_list and first not in " \t":
+                    blank_needed = True
+                    in_list = False
+
+            if blank_needed and not previous_blank:
+                write("\n")
+            blank_needed = False
+            write(line)
+            previous_blank = False
+
+            if first == "#" and fence is None and HEADING_PATTERN.match(line):
+                blank_needed = True
+                in_list = False
+                if title is None and line.startswith("# "):
+                    title = line[2:].strip() or None
+
+        if line.endswith("\n"):
+            trailing_newlines = min(trailing_newlines + 1, 2) if line == "\n" else 1
+        else:
+            trailing_newlines = 0
+
+    return MarkdownSummary(title, trailing_newlines)
+
+
+def markdown_headings(source: Union[str, Iterable[str]]) -> List[Tuple[int, int, str]]:
+    """
+    Finds the headings of markdown outside fenced code blocks.
+
+    Args:
+        source: Markdown source as a string or a list of lines
+
+    Returns:
+        List[Tuple[int, int, str]]: Line index, level and text of each heading
+    """
+    headings: List[Tuple[int, int, str]] = []
+    # Backticks or tildes of the open code block
+    fence: Optional[str] = None
+    for index, line in enumerate(iter_lines(source)):
+        if fence is not None:
+            if _fence_end(line, fence):
+                fence = None
+            continue
+
+        first = line[:1]
+        fence_match = FENCE_PATTERN.match(line) if first in FENCE_START else None
+        if fence_match and not (
+            fence_match.group(1)[0] == "`" and "`" in line[fence_match.end() :]
+        ):
+            fence = fence_match.group(1)
+        elif first == "#" and HEADING_PATTERN.match(line):
+            marker = len(line) - len(line.lstrip("#"))
+            # Closing hashes are not part of the text
+            text = line[marker:].strip().rstrip("#").strip()
+            headings.append((index, marker, text))
+    return headings
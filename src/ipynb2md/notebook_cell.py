@@ -1,15 +1,183 @@
-import base64
+import binascii
 import re
 import sys
 from pathlib import Path
-from typing import Dict, List, Any, Optional
+from typing import (
+    TYPE_CHECKING,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    Any,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
+
+from .images import Base64Data, ExtractedImage, ImageWriter
+from .language import (
+    DEFAULT_LANGUAGE,
+    detect_source_language,
+    language_from_kernelspec,
+)
+from .markdown import normalize_markdown
+from .outputs import (
+    CellBudget,
+    OutputLimits,
+    Truncation,
+    coalesce_streams,
+    mask_addresses,
+    select_representation,
+    write_truncated,
+)
+from .patterns import LazyPattern
+from .profiling import NULL_PROFILER, Profiler
+
+if TYPE_CHECKING:
+    from .tables import TableLimits
+
+# Base64 encoded images in Markdown: ![alt text](data:image/png;base64,...)
+INLINE_IMAGE_PATTERN = LazyPattern(
+    r"!\[(.*?)\]\((data:image/([a-z]+);base64,([^)]+))\)"
+)
+
+
+class CellContext:
+    """Settings and image state shared by all cells of a notebook."""
+
+    __slots__ = (
+        "image_dir",
+        "image_hashes",
+        "image_digests",
+        "image_writer",
+        "kernel_language",
+        "profiler",
+        "output_limits",
+        "merge_streams",
+        "table_limits",
+        "display_priority",
+        "normalize_volatile",
+        "link",
+    )
+
+    def __init__(
+        self,
+        image_dir: Path,
+        image_hashes: Optional[Dict[str, str]] = None,
+        image_writer: Optional[ImageWriter] = None,
+        kernel_language: str = "",
+        profiler: Optional[Profiler] = None,
+        output_limits: Optional[OutputLimits] = None,
+        merge_streams: bool = True,
+        table_limits: Optional["TableLimits"] = None,
+        display_priority: Optional[Sequence[str]] = None,
+        normalize_volatile: bool = False,
+        link: Optional[Callable[[str], str]] = None,
+    ) -> None:
+        """
+        Constructor method of the CellContext class.
+
+        Args:
+            image_dir: Directory to save extracted images
+            image_hashes: Hashes of images written by a previous run, used to skip unchanged files
+            image_writer: Writer that decodes and stores extracted images
+            kernel_language: Language of the notebook kernel, used when a cell does not declare one
+            profiler: Collects the time spent in the conversion stages
+            output_limits: Size limits for stream, text/plain and traceback outputs
+            merge_streams: Merge adjacent stream outputs and collapse progress bar updates
+            table_limits: Render HTML tables as Markdown tables of at most this size (None keeps the HTML)
+            display_priority: MIME types in order of preference; only the best representation of each output is written (None writes all of them)
+            normalize_volatile: Replace memory addresses in outputs with 0x0
+            link: Turns the path of an extracted image or spilled output into the link written (None writes the path)
+        """
+        self.image_dir: Path = image_dir
+        self.image_hashes: Dict[str, str] = image_hashes if image_hashes else {}
+        # Hashes of the images written by every cell, recorded by the image writer
+        self.image_digests: Dict[str, str] = {}
+        self.image_writer: ImageWriter = image_writer if image_writer else ImageWriter()
+        self.kernel_language: str = kernel_language
+        self.profiler: Profiler = profiler if profiler else NULL_PROFILER
+        self.output_limits: Optional[OutputLimits] = (
+            output_limits if output_limits and output_limits.enabled else None
+        )
+        self.merge_streams: bool = merge_streams
+        self.table_limits: Optional["TableLimits"] = table_limits
+        self.display_priority: Optional[Sequence[str]] = display_priority
+        self.normalize_volatile: bool = normalize_volatile
+        self.link: Optional[Callable[[str], str]] = link
+
+
+class _ContextAttribute:
+    """
+    Read-only cell attribute that is stored once in the CellContext of the cell.
+
+    Assigning it through one cell would change it for every cell sharing the context,
+    so shared settings are changed on the context itself.
+    """
+
+    def __set_name__(self, owner: type, name: str) -> None:
+        self.name = name
+
+    def __get__(self, cell: Optional["NotebookCell"], owner: type) -> Any:
+        if cell is None:
+            return self
+        return getattr(cell.context, self.name)
+
+    def __set__(self, cell: "NotebookCell", value: Any) -> None:
+        raise AttributeError(
+            f"{self.name} is shared by every cell, set it on the cell context instead"
+        )
 
 
 class NotebookCell:
-    """The class representing the Jupyter Notebook cell."""
+    """
+    The class representing the Jupyter Notebook cell.
+
+    Cells only keep what rendering needs; settings live in a CellContext shared by
+    every cell of the notebook, and outputs can be dropped once they are rendered.
+    """
+
+    __slots__ = (
+        "cell_type",
+        "source",
+        "outputs",
+        "cell_counter",
+        "image_counter",
+        "extracted_images",
+        "context",
+        "truncated_outputs",
+        "_language",
+        "_title",
+    )
+
+    # Shared settings, read from the context
+    image_dir = _ContextAttribute()
+    image_hashes = _ContextAttribute()
+    image_digests = _ContextAttribute()
+    image_writer = _ContextAttribute()
+    kernel_language = _ContextAttribute()
+    profiler = _ContextAttribute()
+    output_limits = _ContextAttribute()
+    merge_streams = _ContextAttribute()
+    table_limits = _ContextAttribute()
+    display_priority = _ContextAttribute()
 
     def __init__(
-        self, cell_data: Dict[str, Any], image_dir: Path, cell_counter: int
+        self,
+        cell_data: Dict[str, Any],
+        image_dir: Path,
+        cell_counter: int,
+        image_hashes: Optional[Dict[str, str]] = None,
+        image_writer: Optional[ImageWriter] = None,
+        kernel_language: str = "",
+        profiler: Optional[Profiler] = None,
+        output_limits: Optional[OutputLimits] = None,
+        merge_streams: bool = True,
+        table_limits: Optional["TableLimits"] = None,
+        display_priority: Optional[Sequence[str]] = None,
+        context: Optional[CellContext] = None,
     ) -> None:
         """
         Constructor method of the NotebookCell class.
@@ -18,132 +186,169 @@ class NotebookCell:
             cell_data: Raw data dictionary of the Jupyter Notebook cell
             image_dir: Directory to save extracted images
             cell_counter: Cell number (for unique identifier)
+            image_hashes: Hashes of images written by a previous run, used to skip unchanged files
+            image_writer: Writer that decodes and stores extracted images
+            kernel_language: Language of the notebook kernel, used when the cell does not declare one
+            profiler: Collects the time spent in the conversion stages
+            output_limits: Size limits for stream, text/plain and traceback outputs
+            merge_streams: Merge adjacent stream outputs and collapse progress bar updates
+            table_limits: Render HTML tables as Markdown tables of at most this size (None keeps the HTML)
+            display_priority: MIME types in order of preference; only the best representation of each output is written (None writes all of them)
+            context: Settings shared with the other cells of the notebook; replaces all of the arguments above except cell_data and cell_counter
         """
         self.cell_type: str = cell_data.get("cell_type", "")
         self.source: List[str] = cell_data.get("source", [])
-        self.metadata: Dict[str, Any] = cell_data.get("metadata", {})
-        self.outputs: List[Dict[str, Any]] = cell_data.get("outputs", [])
-        self.image_dir: Path = image_dir
+        self.outputs: Sequence[Dict[str, Any]] = cell_data.get("outputs", ())
         self.cell_counter: int = cell_counter
         self.image_counter: int = 0
-        self.extracted_images: List[str] = []
+        # Becomes a list when the first image is extracted
+        self.extracted_images: Sequence[str] = ()
+        self.context: CellContext = (
+            context
+            if context is not None
+            else CellContext(
+                image_dir,
+                image_hashes,
+                image_writer,
+                kernel_language,
+                profiler,
+                output_limits,
+                merge_streams,
+                table_limits,
+                display_priority,
+            )
+        )
+
+        # Truncated text outputs by index, shared by the output formats while the
+        # converter renders the cell to several of them (None computes them each time)
+        self.truncated_outputs: Optional[Dict[int, Tuple[str, Truncation]]] = None
+
+        # Only the language declared in the metadata is kept, not the metadata itself
+        metadata = cell_data.get("metadata")
+        language = ""
+        if metadata:
+            language = metadata.get("language", "")
+            if not language and "kernelspec" in metadata:
+                language = language_from_kernelspec(metadata["kernelspec"])
+        self._language: Optional[str] = language.lower() if language else None
+        # First heading of a markdown cell, found while rendering
+        self._title: Optional[str] = None
 
     def detect_language(self) -> str:
         """
-        Detects the programming language of the code cell.
+        Detects the programming language of the code cell. The result is cached.
 
         Returns:
             str: The detected programming language, returning the default ‘python’ if not detected.
         """
-        # Get language information from metadata
-        language = self.metadata.get("language", "")
-
-        # Language extraction from kernel information
-        if not language:
-            kernel_spec = self.metadata.get("kernelspec", {})
-            kernel_name = kernel_spec.get("name", "").lower()
-            kernel_language = kernel_spec.get("language", "").lower()
-
-            if kernel_language:
-                language = kernel_language
-            elif kernel_name:
-                # Language extraction from kernel name
-                if "python" in kernel_name:
-                    language = "python"
-                elif "r" == kernel_name or "ir" in kernel_name:
-                    language = "r"
-                elif "julia" in kernel_name:
-                    language = "julia"
-                elif "javascript" in kernel_name or "js" in kernel_name:
-                    language = "javascript"
-                elif "typescript" in kernel_name or "ts" in kernel_name:
-                    language = "typescript"
-                elif "java" in kernel_name:
-                    language = "java"
+        # Set from the cell metadata, or by an earlier call
+        if self._language is not None:
+            return self._language
+
+        # Language of the notebook kernel, resolved once by the converter
+        language = self.context.kernel_language
 
         # If the language is not found, try to detect it from the source code
         if not language and self.cell_type == "code" and self.source:
-            code = "".join(self.source).lower()
-
-            # Simple language detection rules
-            if re.search(
-                r"import\s+[a-zA-Z_][a-zA-Z0-9_]*|from\s+[a-zA-Z_][a-zA-Z0-9_]*\s+import",
-                code,
-            ):
-                language = "python"
-            elif re.search(r"library\(|require\(", code):
-                language = "r"
-            elif re.search(
-                r"console\.log|document\.get|var\s+[a-zA-Z_]|let\s+[a-zA-Z_]|const\s+[a-zA-Z_]",
-                code,
-            ):
-                language = "javascript"
-            elif re.search(
-                r"public\s+(static\s+)?class|public\s+(static\s+)?void", code
-            ):
-                language = "java"
-            elif re.search(r"System\.out\.println", code):
-                language = "java"
-            elif re.search(r"printf|scanf|#include", code):
-                language = "c"
-            elif re.search(r"cout|cin|namespace|#include\s+<iostream>", code):
-                language = "cpp"
-            elif re.search(r"using\s+namespace|template\s*<", code):
-                language = "cpp"
-            elif re.search(r"func\s+[a-zA-Z_][a-zA-Z0-9_]*\s*\(", code):
-                language = "go"
-            elif re.search(r"package\s+main", code):
-                language = "go"
-            elif re.search(
-                r"SELECT|FROM|WHERE|INSERT|UPDATE|DELETE", code
-            ) and re.search(r";$", code.strip()):
-                language = "sql"
+            language = detect_source_language(self.source)
 
         # Use python by default
-        return language.lower() if language else "python"
+        self._language = language.lower() if language else DEFAULT_LANGUAGE
+        return self._language
 
-    def extract_image(self, data: str, mime_type: str) -> Optional[str]:
+    def extract_image(self, data: Base64Data, mime_type: str) -> Optional[str]:
         """
         Extracts the Base64 encoded image and saves it to a file.
 
         Args:
-            data: Base64 encoded image data
+            data: Base64 encoded image data, as a string or a list of lines
             mime_type: MIME type of the image (image/png, image/jpeg, vb.)
 
         Returns:
             Optional[str]: File path of the recorded image or None in case of error
         """
+        with self.context.profiler.stage("extract_image"):
+            return self._extract_image(data, mime_type)
+
+    def _extract_image(self, data: Base64Data, mime_type: str) -> Optional[str]:
+        """
+        Implementation of extract_image.
+
+        Args:
+            data: Base64 encoded image data
+            mime_type: MIME type of the image
+
+        Returns:
+            Optional[str]: File path of the recorded image or None in case of error
+        """
+        context = self.context
         try:
             # Determine the extension from the MIME type
             extension = mime_type.split("/")[-1]
             # PNG, JPG, JPEG, GIF, SVG destekli
             if extension == "jpeg":
                 extension = "jpg"
+            elif extension == "svg+xml":
+                extension = "svg"
+                # SVG is stored as markup rather than Base64
+                if not isinstance(data, str):
+                    data = "".join(data)
+                if data.lstrip().startswith("<"):
+                    import base64
+
+                    data = base64.b64encode(data.encode("utf-8")).decode("ascii")
             elif extension not in ["png", "jpg", "gif", "svg", "bmp", "webp"]:
                 extension = "png"
 
             # Create the name of the image file - make it unique with cell number and image number
             self.image_counter += 1
+            context.profiler.count("images")
             image_filename = (
                 f"cell_{self.cell_counter}_image_{self.image_counter}.{extension}"
             )
-            image_path = self.image_dir / image_filename
+            image_path = context.image_writer.image_path(
+                context.image_dir, image_filename, data, extension
+            )
+            # Images kept in a shared store are recorded by their full path
+            in_image_dir = image_path.parent == context.image_dir
+            image_key = image_path.name if in_image_dir else str(image_path)
+
+            if in_image_dir:
+                # The directory is only created for notebooks that have images
+                context.image_writer.prepare_directory(context.image_dir)
+
+            def record_digest(digest: str) -> None:
+                # Shared by all cells, the writer thread keeps no reference to this one
+                context.image_digests[image_key] = digest
 
             try:
-                binary_data = base64.b64decode(data)
-                with open(image_path, "wb") as file:
-                    file.write(binary_data)
+                # The writer may decode and write the image on another thread
+                context.image_writer.submit(
+                    image_path,
+                    data,
+                    context.image_hashes.get(image_key),
+                    record_digest,
+                )
 
                 rel_path = str(image_path)
+                if not self.extracted_images:
+                    self.extracted_images = []
                 self.extracted_images.append(str(image_path))
                 return rel_path
 
-            except base64.binascii.Error:
+            except binascii.Error:
                 print(
                     f"WARNING: Invalid Base64 data. Cell: {self.cell_counter}, Image: {self.image_counter}",
                     file=sys.stderr,
                 )
                 return None
+            except (OSError, ValueError) as e:
+                # Reported like a failure on a writer thread, see ThreadedImageWriter
+                print(
+                    f"WARNING: The image could not be written. {image_path}. {str(e)}",
+                    file=sys.stderr,
+                )
+                return None
 
         except Exception as e:
             print(
@@ -152,23 +357,85 @@ class NotebookCell:
             )
             return None
 
-    def _ensure_newline_after_content(self, content: str) -> str:
+    def _link(self, path: str) -> str:
+        """
+        Returns the link written for an extracted file.
+
+        Args:
+            path: Path of the image or spilled output
+
+        Returns:
+            str: Link relative to the output file, if the converter asked for one
+        """
+        link = self.context.link
+        return link(path) if link is not None else path
+
+    def _output_image(
+        self, output: Dict[str, Any], mime_type: str, content: Any
+    ) -> Optional[str]:
         """
-        It makes sure that there is a new line at the end of the content:
+        Extracts an image of a display output; later calls reuse the written file.
 
         Args:
-            content: Content to check
+            output: Display output holding the image
+            mime_type: MIME type of the image
+            content: Base64 encoded image data, or the result of an earlier extraction
 
         Returns:
-            str: Content with new line at the end
+            Optional[str]: File path of the recorded image or None in case of error
+        """
+        if isinstance(content, ExtractedImage):
+            # Extracted by an earlier render or by extract_output_images
+            return content.path or None
+
+        # Base64 lines are decoded without joining them
+        image_path = self.extract_image(content, mime_type)
+        # Release the payload once it has been handed to the writer; images that
+        # could not be extracted are not tried again
+        output["data"][mime_type] = ExtractedImage(image_path or "")
+        return image_path
+
+    def extract_output_images(self) -> None:
         """
-        if not content.endswith("\n"):
-            content += "\n"
+        Extracts the images of the display outputs ahead of rendering, numbered as
+        render numbers them, so that every output format links the same files.
+        """
+        if self.cell_type != "code":
+            return
+
+        priority = self.context.display_priority
+        for output in self.outputs:
+            if output.get("output_type") not in ("execute_result", "display_data"):
+                continue
+            data = output.get("data", {})
+            if priority is not None:
+                data = select_representation(data, priority)
+            for mime_type, content in data.items():
+                if mime_type.startswith("image/"):
+                    self._output_image(output, mime_type, content)
+
+    def drop_images(self, failed: Set[str]) -> None:
+        """
+        Leaves images that could not be written out of the rendered cell.
 
-        if not content.endswith("\n\n"):
-            content += "\n"
+        Args:
+            failed: Paths of the failed images, see ImageWriter.failed_images
+        """
+        self.extracted_images = [
+            path for path in self.extracted_images if path not in failed
+        ]
+        if self.cell_type == "markdown":
+            source = "".join(self.source)
+            for path in failed:
+                source = re.sub(rf"!\[[^\]]*\]\({re.escape(path)}\)", "", source)
+            self.source = [source]
+            return
 
-        return content
+        for output in self.outputs:
+            data = output.get("data", {})
+            for mime_type, content in data.items():
+                if isinstance(content, ExtractedImage) and content.path in failed:
+                    data[mime_type] = ExtractedImage("")
 
     def _normalize_html_output(self, html_content: str) -> str:
         """
@@ -181,33 +448,41 @@ class NotebookCell:
             str: Normalized HTML content
         """
         # Insert new row after table
-        html_content = re.sub(r"(</table>)", r"\1\n\n", html_content)
+        html_content = html_content.replace("</table>", "</table>\n\n")
 
         # Insert new line after div
-        html_content = re.sub(r"(</div>)", r"\1\n", html_content)
+        html_content = html_content.replace("</div>", "</div>\n")
 
         return html_content
 
-    def _process_markdown_source(self, source: str) -> str:
+    def markdown_title(self) -> str:
         """
-        Processes Markdown source code and troubleshoots formatting issues.
-
-        Args:
-            source: Markdown source code
+        Returns the first "# " heading of a markdown cell, collected while rendering.
 
         Returns:
-            str: Processed Markdown content
+            str: Title, or an empty string if the cell has none
         """
-        # Insert space after Markdown lists
-        source = re.sub(r"(\n\s*[-*+]\s+.*\n)(?![\s\n])", r"\1\n", source)
-
-        # Insert new line after title
-        source = re.sub(r"(\n#{1,6}\s+.*\n)(?!\n)", r"\1\n", source)
+        if self._title is None:
+            summary = normalize_markdown(
+                self.source if self.cell_type == "markdown" else "", lambda _: None
+            )
+            self._title = summary.title or ""
+        return self._title
 
-        # Add whitespace before and after the code block
-        source = re.sub(r"(?<!\n\n)```", "\n\n```", source)
-        source = re.sub(r"```(?!\n\n)", "```\n\n", source)
+    def linked_source(self) -> str:
+        """
+        Returns the source, with the inline images extracted from a markdown cell linked
+        the way the converter asked for, see CellContext.link.
 
+        Returns:
+            str: Source of the cell
+        """
+        source = "".join(self.source)
+        link = self.context.link
+        if self.cell_type != "markdown" or link is None or not self.extracted_images:
+            return source
+        for path in self.extracted_images:
+            source = source.replace(f"]({path})", f"]({link(path)})")
         return source
 
     def to_markdown(self) -> str:
@@ -217,74 +492,255 @@ class NotebookCell:
         Returns:
             str: Cell content in Markdown format
         """
+        fragments: List[str] = []
+        self.render(fragments.append)
+        return "".join(fragments)
+
+    def _write_text(
+        self, write: Callable[[str], None], text: Union[str, List[str]]
+    ) -> None:
+        """
+        Writes multi-line notebook text, which may be stored as a string or a list of lines.
+
+        Args:
+            write: Function receiving the Markdown fragments
+            text: Text to write
+        """
+        if isinstance(text, str):
+            write(text)
+        else:
+            for line in text:
+                write(line)
+
+    def spill_path(self, output_idx: int) -> Path:
+        """
+        Returns the file receiving the full text of a truncated output.
+
+        Args:
+            output_idx: Index of the output in the cell
+
+        Returns:
+            Path: Path next to the extracted images
+        """
+        return (
+            self.context.image_dir
+            / f"cell_{self.cell_counter}_output_{output_idx + 1}.txt"
+        )
+
+    def _write_output_text(
+        self,
+        write: Callable[[str], None],
+        text: Union[str, Iterable[str]],
+        output_idx: int,
+        budget: Optional[CellBudget],
+    ) -> None:
+        """
+        Writes the text of an output as a fenced block, truncating it to the output limits.
+
+        Args:
+            write: Function receiving the Markdown fragments
+            text: Text to write
+            output_idx: Index of the output in the cell
+            budget: Remaining per-cell limits, or None if outputs are not limited
+        """
+        context = self.context
+        if context.normalize_volatile:
+            text = mask_addresses(text)
+
+        write("```\n")
+        if budget is None:
+            self._write_text(write, text)
+            write("\n```\n\n")
+            return
+
+        truncated, result = self.truncate_output(text, output_idx, budget)
+        write(truncated)
+        write("\n```\n\n")
+
+        if result.spilled:
+            spill_path = self.spill_path(output_idx)
+            write(
+                f"[Full output - Cell {self.cell_counter}, Output {output_idx + 1}]({self._link(str(spill_path))})\n\n"
+            )
+
+    def truncate_output(
+        self, text: Union[str, Iterable[str]], output_idx: int, budget: CellBudget
+    ) -> Tuple[str, Truncation]:
+        """
+        Truncates the text of an output to the output limits, spilling the full text.
+
+        While truncated_outputs is set, the text is truncated and spilled only once and
+        reused by every output format.
+
+        Args:
+            text: Text of the output
+            output_idx: Index of the output in the cell
+            budget: Remaining per-cell limits, updated with the written amounts
+
+        Returns:
+            Tuple[str, Truncation]: Head and tail of the text, and the written amounts
+        """
+        cache = self.truncated_outputs
+        if cache is not None and output_idx in cache:
+            truncated, result = cache[output_idx]
+        else:
+            context = self.context
+            spill_path = self.spill_path(output_idx) if budget.limits.spill else None
+            max_lines, max_bytes = budget.output_limits()
+            fragments: List[str] = []
+            result = write_truncated(
+                fragments.append,
+                text,
+                max_lines,
+                max_bytes,
+                spill_path,
+                context.image_writer.open_text_file,
+            )
+            truncated = "".join(fragments)
+            if result.omitted_lines:
+                context.profiler.count("omitted_output_lines", result.omitted_lines)
+            if cache is not None:
+                cache[output_idx] = (truncated, result)
+        budget.consume(result)
+        return truncated, result
+
+    def render(self, write: Callable[[str], None], release: bool = False) -> None:
+        """
+        Converts the cell to Markdown format and passes the fragments to a text sink.
+
+        Args:
+            write: Function receiving the Markdown fragments (e.g. list.append or file.write)
+            release: Drop the outputs once they are written; the cell cannot be
+                rendered with its outputs again afterwards
+        """
+        context = self.context
         if self.cell_type == "markdown":
-            # Retrieve markdown content containing HTML tags and troubleshoot formatting issues
-            source = "".join(self.source)
-            processed_source = self._process_markdown_source(source)
-            return self._ensure_newline_after_content(processed_source)
+            # Fix the spacing of headings, lists and code blocks line by line
+            with context.profiler.stage("markdown_source"):
+                summary = normalize_markdown(
+                    self.linked_source() if self.extracted_images else self.source,
+                    write,
+                )
+            self._title = summary.title or ""
+            # End the cell with an empty line
+            write("\n" * (2 - summary.trailing_newlines))
 
         elif self.cell_type == "code":
             # Detect programming language
             language = self.detect_language()
 
             # Create programming language block for code cells
-            md_content = f"\n```{language}\n"
-            md_content += "".join(self.source)
-            md_content += "\n```\n\n"
+            write(f"\n```{language}\n")
+            self._write_text(write, self.source)
+            write("\n```\n\n")
 
             if self.outputs:
-                for output_idx, output in enumerate(self.outputs):
+                context.profiler.count("outputs", len(self.outputs))
+                budget = (
+                    CellBudget(context.output_limits) if context.output_limits else None
+                )
+                outputs = (
+                    coalesce_streams(self.outputs)
+                    if context.merge_streams
+                    else enumerate(self.outputs)
+                )
+                for output_idx, output in outputs:
                     output_type = output.get("output_type", "")
 
                     if output_type == "stream":
-                        md_content += "```\n"
-                        md_content += "".join(output.get("text", []))
-                        md_content += "\n```\n\n"
+                        self._write_output_text(
+                            write, output.get("text", []), output_idx, budget
+                        )
 
                     elif (
                         output_type == "execute_result" or output_type == "display_data"
                     ):
                         data = output.get("data", {})
-
-                        # Output in text/plain format
-                        if "text/plain" in data:
-                            text_content = "".join(data["text/plain"])
-                            md_content += "```\n"
-                            md_content += text_content
-                            md_content += "\n```\n\n"
+                        # The other representations are never decoded or written
+                        if context.display_priority is not None:
+                            data = select_representation(data, context.display_priority)
+                        if context.normalize_volatile:
+                            data = {
+                                mime_type: (
+                                    mask_addresses(content)
+                                    if mime_type.startswith("text/")
+                                    else content
+                                )
+                                for mime_type, content in data.items()
+                            }
+
+                        # HTML tables are rendered as Markdown tables when enabled
+                        tables = None
+                        if context.table_limits is not None and "text/html" in data:
+                            # html.parser is only imported when tables are rendered
+                            from .tables import parse_html_tables
+
+                            with context.profiler.stage("html_tables"):
+                                tables = parse_html_tables(
+                                    data["text/html"], context.table_limits
+                                )
+
+                        # Output in text/plain format, redundant next to a table
+                        if "text/plain" in data and tables is None:
+                            self._write_output_text(
+                                write, data["text/plain"], output_idx, budget
+                            )
+
+                        if tables is not None:
+                            from .tables import write_markdown_tables
+
+                            write_markdown_tables(tables, write)
 
                         # Output in text/html format
-                        if "text/html" in data:
+                        elif "text/html" in data:
                             html_content = "".join(data["text/html"])
-                            html_content = self._normalize_html_output(html_content)
-
-                            md_content += "```html\n"
-                            md_content += html_content
-                            md_content += "\n```\n\n"
+                            with context.profiler.stage("html_output"):
+                                html_content = self._normalize_html_output(html_content)
+
+                            write("```html\n")
+                            write(html_content)
+                            write("\n```\n\n")
+
+                        # Markdown and LaTeX are only written when selected, since
+                        # their text/plain copy is written otherwise
+                        if context.display_priority is not None:
+                            if "text/markdown" in data:
+                                summary = normalize_markdown(
+                                    data["text/markdown"], write
+                                )
+                                write("\n" * (2 - summary.trailing_newlines))
+                            elif "text/latex" in data:
+                                self._write_text(write, data["text/latex"])
+                                write("\n\n")
 
                         # Image output - for all image formats
                         for mime_type, content in data.items():
                             if mime_type.startswith("image/"):
-                                # Get Base64 data
-                                image_data = content
-                                if isinstance(image_data, list):
-                                    image_data = "".join(image_data)
-
-                                # Extract and save image
-                                image_path = self.extract_image(image_data, mime_type)
+                                image_path = self._output_image(
+                                    output, mime_type, content
+                                )
                                 if image_path:
-                                    md_content += f"![Image - Cell {self.cell_counter}, Output {output_idx + 1}]({image_path})\n\n"
+                                    write(
+                                        f"![Image - Cell {self.cell_counter}, Output {output_idx + 1}]({self._link(image_path)})\n\n"
+                                    )
 
                     elif output_type == "error":
-                        md_content += "```\n"
-                        md_content += "\n".join(output.get("traceback", []))
-                        md_content += "\n```\n\n"
-
-            return md_content
+                        # Traceback entries are separated, not terminated, by newlines
+                        traceback = output.get("traceback", [])
+                        self._write_output_text(
+                            write,
+                            [f"{line}\n" for line in traceback[:-1]] + traceback[-1:],
+                            output_idx,
+                            budget,
+                        )
+
+                if release:
+                    # Payloads, HTML and text are not needed after rendering
+                    self.outputs = ()
 
         else:
             # Warning for unknown cell types
-            return f"_Unknown cell type: {self.cell_type}_\n\n"
+            write(f"_Unknown cell type: {self.cell_type}_\n\n")
 
     def extract_inline_images_from_markdown(self) -> str:
         """
@@ -297,10 +753,9 @@ class NotebookCell:
             return "".join(self.source)
 
         markdown_content = "".join(self.source)
-
-        # Detect base64 encoded images in Markdown
-        # ![alt text](data:image/png;base64,...)
-        img_pattern = re.compile(r"!\[(.*?)\]\((data:image/([a-z]+);base64,([^)]+))\)")
+        # Most cells have no inline image, skip the regex for them
+        if "data:image/" not in markdown_content:
+            return markdown_content
 
         def replace_with_file(match):
             alt_text = match.group(1)
@@ -309,10 +764,11 @@ class NotebookCell:
 
             image_path = self.extract_image(base64_data, mime_type)
             if image_path:
+                # Linked when the source is written, see linked_source
                 return f"![{alt_text}]({image_path})"
             else:
                 # Retain original label if image is not extracted
                 return match.group(0)
 
         # Extract all detected images and save them to files
-        return img_pattern.sub(replace_with_file, markdown_content)
+        return INLINE_IMAGE_PATTERN.sub(replace_with_file, markdown_content)
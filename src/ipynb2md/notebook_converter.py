@@ -1,31 +1,107 @@
 import json
 import os
-import re
 import sys
+from collections import deque
+from contextlib import ExitStack
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Tuple, Set
-
-from src.ipynb2md.notebook_cell import NotebookCell
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+)
+
+from .images import ImageWriter
+from .language import DEFAULT_LANGUAGE, language_from_notebook_metadata
+from .notebook_cell import CellContext, NotebookCell
+from .outputs import IfChangedFile, OutputLimits
+from .profiling import NULL_PROFILER, Profiler
+from .renderers import (
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_FORMATS,
+    RENDERERS,
+    MarkdownRenderer,
+    Renderer,
+    SearchIndexRenderer,
+)
+
+if TYPE_CHECKING:
+    from .tables import TableLimits
 
 
 class NotebookConverter:
     """Class that converts Jupyter Notebook file to Markdown file."""
 
-    def __init__(self, input_file: str) -> None:
+    def __init__(
+        self,
+        input_file: str,
+        image_hashes: Optional[Dict[str, str]] = None,
+        image_writer: Optional[ImageWriter] = None,
+        profiler: Optional[Profiler] = None,
+        output_limits: Optional[OutputLimits] = None,
+        merge_streams: bool = True,
+        table_limits: Optional["TableLimits"] = None,
+        display_priority: Optional[Sequence[str]] = None,
+        index_chunk_size: int = DEFAULT_CHUNK_SIZE,
+        deterministic: bool = False,
+        normalize_volatile: bool = False,
+    ) -> None:
         """
         Constructor method of the NotebookConverter class.
 
         Args:
             input_file: Path to .ipynb file to convert
+            image_hashes: Hashes of images written by a previous run, used to skip unchanged files
+            image_writer: Writer that decodes and stores extracted images (owned by the caller)
+            profiler: Collects the time spent in the conversion stages
+            output_limits: Size limits for stream, text/plain and traceback outputs
+            merge_streams: Merge adjacent stream outputs and collapse progress bar updates
+            table_limits: Render HTML tables as Markdown tables of at most this size (None keeps the HTML)
+            display_priority: MIME types in order of preference; only the best representation of each output is written (None writes all of them)
+            index_chunk_size: Maximum number of characters of a search index record (0 is unlimited)
+            deterministic: Only replace output files whose contents changed
+            normalize_volatile: Mask memory addresses in outputs, so that reruns produce the same text
         """
         self.input_file: Path = Path(input_file)
         self.output_file: Optional[Path] = None
         self.notebook_data: Dict[str, Any] = {}
         self.cells: List[NotebookCell] = []
+        # Language declared by the notebook kernel, shared by every cell
+        self.kernel_language: str = ""
+        self.image_hashes: Dict[str, str] = image_hashes if image_hashes else {}
+        self.image_writer: ImageWriter = image_writer if image_writer else ImageWriter()
+        self.profiler: Profiler = profiler if profiler else NULL_PROFILER
+        self.output_limits: Optional[OutputLimits] = output_limits
+        self.merge_streams: bool = merge_streams
+        self.table_limits: Optional["TableLimits"] = table_limits
+        self.display_priority: Optional[Sequence[str]] = display_priority
+        self.index_chunk_size: int = index_chunk_size
+        self.deterministic: bool = deterministic
 
         # Directory for images
         self.image_dir: Path = self.input_file.parent / f"{self.input_file.stem}_images"
 
+        # Settings and image hashes shared by every cell instead of copied into each
+        self.cell_context: CellContext = CellContext(
+            self.image_dir,
+            self.image_hashes,
+            self.image_writer,
+            self.kernel_language,
+            self.profiler,
+            self.output_limits,
+            self.merge_streams,
+            self.table_limits,
+            self.display_priority,
+            normalize_volatile,
+        )
+
     def prepare_image_directory(self) -> None:
         """
         Creates an index for extracted images.
@@ -33,6 +109,24 @@ class NotebookConverter:
         if not self.image_dir.exists():
             os.makedirs(self.image_dir, exist_ok=True)
 
+    def _create_cell(
+        self, cell_data: Dict[str, Any], cell_counter: int
+    ) -> NotebookCell:
+        """
+        Creates a cell sharing the settings of the converter.
+
+        Args:
+            cell_data: Raw data dictionary of the Jupyter Notebook cell
+            cell_counter: Cell number (for unique identifier)
+
+        Returns:
+            NotebookCell: New cell
+        """
+        self.profiler.count("cells")
+        return NotebookCell(
+            cell_data, self.image_dir, cell_counter, context=self.cell_context
+        )
+
     def read_notebook(self) -> bool:
         """
         Reads and parses the notebook file.
@@ -40,17 +134,22 @@ class NotebookConverter:
         Returns:
             bool: True if the read operation was successful, False otherwise
         """
-        try:
-            with open(self.input_file, "r", encoding="utf-8") as file:
-                self.notebook_data = json.load(file)
+        with self.profiler.stage("read_notebook"):
+            return self._read_notebook()
 
-            # Prepare index for images
-            self.prepare_image_directory()
+    def _read_notebook(self) -> bool:
+        """
+        Implementation of read_notebook.
 
-            # Separate cells
-            for idx, cell_data in enumerate(self.notebook_data.get("cells", [])):
-                self.cells.append(NotebookCell(cell_data, self.image_dir, idx + 1))
+        Returns:
+            bool: True if the read operation was successful, False otherwise
+        """
+        try:
+            with open(self.input_file, "r", encoding="utf-8") as file:
+                with self.profiler.stage("json_parse"):
+                    notebook_data = json.load(file)
 
+            self.load_notebook(notebook_data)
             return True
         except (FileNotFoundError, json.JSONDecodeError, PermissionError) as e:
             print(
@@ -58,6 +157,35 @@ class NotebookConverter:
             )
             return False
 
+    def load_notebook(self, notebook_data: Dict[str, Any]) -> None:
+        """
+        Uses an already parsed notebook instead of reading the input file.
+
+        The cells keep what they need from the raw cell data, so only the top-level
+        entries other than the cell list remain in notebook_data.
+
+        Args:
+            notebook_data: Notebook as parsed from JSON
+        """
+        self.notebook_data = {
+            key: value for key, value in notebook_data.items() if key != "cells"
+        }
+        self._set_kernel_language(notebook_data.get("metadata", {}))
+
+        # Separate cells
+        for idx, cell_data in enumerate(notebook_data.get("cells", [])):
+            self.cells.append(self._create_cell(cell_data, idx + 1))
+
+    def _set_kernel_language(self, metadata: Dict[str, Any]) -> None:
+        """
+        Shares the language declared by the notebook kernel with every cell.
+
+        Args:
+            metadata: Top-level metadata of the notebook
+        """
+        self.kernel_language = language_from_notebook_metadata(metadata)
+        self.cell_context.kernel_language = self.kernel_language
+
     def detect_notebook_language(self) -> str:
         """
         Detects the main programming language of the Notebook.
@@ -66,11 +194,8 @@ class NotebookConverter:
             str: Main programming language detected
         """
         # Language detection from kernel information
-        kernel_info = self.notebook_data.get("metadata", {}).get("kernelspec", {})
-        kernel_language = kernel_info.get("language", "")
-
-        if kernel_language:
-            return kernel_language
+        if self.kernel_language:
+            return self.kernel_language
 
         # Count the language frequency from the code cells
         language_counts: Dict[str, int] = {}
@@ -83,7 +208,7 @@ class NotebookConverter:
         main_language = (
             max(language_counts.items(), key=lambda x: x[1])[0]
             if language_counts
-            else "python"
+            else DEFAULT_LANGUAGE
         )
         return main_language
 
@@ -91,11 +216,181 @@ class NotebookConverter:
         """
         Extracts inline base64 encoded images in Markdown cells.
         """
-        for cell in self.cells:
-            if cell.cell_type == "markdown":
-                # Extract base64 images from Markdown content
-                updated_source = cell.extract_inline_images_from_markdown()
-                cell.source = [updated_source]
+        with self.profiler.stage("inline_images"):
+            for cell in self.cells:
+                if cell.cell_type == "markdown":
+                    # Extract base64 images from Markdown content
+                    updated_source = cell.extract_inline_images_from_markdown()
+                    cell.source = [updated_source]
+
+    def render(
+        self,
+        write: Callable[[str], None],
+        relative_paths: bool = False,
+        release: bool = False,
+    ) -> None:
+        """
+        Converts Notebook to Markdown and passes the fragments to a text sink.
+
+        Args:
+            write: Function receiving the Markdown fragments (e.g. list.append or file.write)
+            relative_paths: Link images relative to the output file instead of by their path
+            release: Drop the outputs of each cell once it is rendered, for a single
+                conversion of a large notebook
+        """
+        self.cell_context.link = self._relative_link if relative_paths else None
+        self.render_formats([MarkdownRenderer(write, self._relative_link)], release)
+
+    def render_formats(
+        self, renderers: Sequence[Renderer], release: bool = False
+    ) -> None:
+        """
+        Passes every cell to several output formats in one pass.
+
+        Args:
+            renderers: Output formats, see create_renderers
+            release: Drop the outputs of each cell once it is rendered, for a single
+                conversion of a large notebook
+        """
+        # Extract inline images in Markdown
+        self.check_for_inline_images()
+
+        title = self.input_file.stem
+        if any(renderer.needs_title for renderer in renderers):
+            title = self.extract_title()
+        for renderer in renderers:
+            renderer.begin(title)
+
+        # Convert and insert each cell
+        self._render_cells(self.cells, renderers, release)
+
+        for renderer in renderers:
+            renderer.end()
+
+    def _render_cells(
+        self,
+        cells: Iterable[NotebookCell],
+        renderers: Sequence[Renderer],
+        release: bool,
+    ) -> None:
+        """
+        Passes the cells to every output format in order, each once its images are done.
+
+        Images written in the background may still fail, so a cell is held back while
+        its images are pending and later cells are extracted in the meantime.
+
+        Args:
+            cells: Cells to render
+            renderers: Output formats
+            release: Drop the outputs of each cell afterwards
+        """
+        image_writer = self.image_writer
+        held: Deque[NotebookCell] = deque()
+        for cell in cells:
+            with self.profiler.stage("render"):
+                # Images are decoded and written once, whatever the number of formats
+                cell.extract_output_images()
+                held.append(cell)
+                while held and not image_writer.pending(held[0].extracted_images):
+                    self._render_cell(held.popleft(), renderers, release)
+
+        while held:
+            cell = held.popleft()
+            with self.profiler.stage("image_join"):
+                image_writer.wait_for(cell.extracted_images)
+            with self.profiler.stage("render"):
+                self._render_cell(cell, renderers, release)
+
+    def _render_cell(
+        self, cell: NotebookCell, renderers: Sequence[Renderer], release: bool
+    ) -> None:
+        """
+        Passes one cell to every output format.
+
+        Args:
+            cell: Cell to render, with its images written
+            renderers: Output formats
+            release: Drop the outputs of the cell afterwards
+        """
+        if cell.extracted_images:
+            failed = self.image_writer.failed_images(cell.extracted_images)
+            if failed:
+                # Never link an image that is missing on disk
+                cell.drop_images(failed)
+        if len(renderers) > 1:
+            # Truncated outputs are spilled once, whatever the number of formats
+            cell.truncated_outputs = {}
+        for renderer in renderers:
+            renderer.render_cell(cell)
+        cell.truncated_outputs = None
+        if release:
+            cell.outputs = ()
+
+    def resolve_output_paths(
+        self,
+        output_file: Optional[str] = None,
+        formats: Sequence[str] = DEFAULT_FORMATS,
+    ) -> List[Path]:
+        """
+        Determines where the file of each output format will be written.
+
+        Args:
+            output_file: Path of the output file; the other formats replace its suffix
+            formats: Names of the output formats, see renderers.RENDERERS
+
+        Returns:
+            List[Path]: Output paths in the order of formats
+
+        Raises:
+            ValueError: If a format is unknown
+        """
+        output_path = self.resolve_output_path(output_file)
+        paths: List[Path] = []
+        for name in formats:
+            if name not in RENDERERS:
+                raise ValueError(f"Unknown output format: {name}")
+            if name == "markdown" and output_file:
+                # An explicit output file keeps its own suffix
+                paths.append(output_path)
+            else:
+                paths.append(output_path.with_suffix(RENDERERS[name].extension))
+        return paths
+
+    def create_renderers(
+        self, stack: ExitStack, output_paths: Sequence[Path], formats: Sequence[str]
+    ) -> List[Renderer]:
+        """
+        Opens the output file of each format and creates its renderer.
+
+        Args:
+            stack: Closes the files when it exits
+            output_paths: Output paths, see resolve_output_paths
+            formats: Names of the output formats
+
+        Returns:
+            List[Renderer]: Renderers in the order of formats
+        """
+        # Cells link images relative to the output files as they are rendered
+        self.cell_context.link = self._relative_link
+        renderers: List[Renderer] = []
+        for name, path in zip(formats, output_paths):
+            if self.deterministic:
+                file = stack.enter_context(IfChangedFile(path))
+            else:
+                file = stack.enter_context(open(path, "w", encoding="utf-8"))
+            write = self.profiler.wrap_writer(file.write)
+            renderer_class = RENDERERS[name]
+            if issubclass(renderer_class, SearchIndexRenderer):
+                renderer: Renderer = renderer_class(
+                    write,
+                    self._relative_link,
+                    str(self.input_file),
+                    self.index_chunk_size,
+                )
+            else:
+                renderer = renderer_class(write, self._relative_link)
+            renderers.append(renderer)
+        return renderers
 
     def convert(self) -> str:
         """
@@ -104,88 +399,178 @@ class NotebookConverter:
         Returns:
             str: Created Markdown content
         """
-        # Extract inline images in Markdown
-        self.check_for_inline_images()
+        fragments: List[str] = []
+        self.render(fragments.append)
+        return "".join(fragments)
 
-        markdown_content = ""
+    @property
+    def image_digests(self) -> Dict[str, str]:
+        """
+        Hashes of the images extracted during the last conversion.
 
-        # Convert and insert each cell
-        for cell in self.cells:
-            markdown_content += cell.to_markdown()
+        Returns:
+            Dict[str, str]: Image file names mapped to the SHA-256 of their contents
+        """
+        return dict(self.cell_context.image_digests)
 
-        # Create a list of extracted images
-        extracted_images: Set[str] = set()
-        for cell in self.cells:
-            extracted_images.update(cell.extracted_images)
+    def resolve_output_path(self, output_file: Optional[str] = None) -> Path:
+        """
+        Determines where the Markdown file will be written.
 
-        return markdown_content
+        Args:
+            output_file: Path to the output file. If not specified, a .md file with the same name as input_file is used.
 
-    def _extract_title(self) -> str:
+        Returns:
+            Path: Path to the output file
+        """
+        if output_file:
+            return Path(output_file)
+        return self.input_file.with_suffix(".md")
+
+    def extract_title(self) -> str:
         """
-        It removes the hood from the notebook.
+        Extracts the title of the notebook from its first Markdown heading.
 
         Returns:
             str: Notebook title, if not found the file name is used
         """
-        # First search for the title in the first markdown cell
+        # The first markdown cell with a title wins; rendered cells reuse their scan
         for cell in self.cells:
             if cell.cell_type == "markdown":
-                source = "".join(cell.source)
-                match = re.search(r"^# (.+)$", source, re.MULTILINE)
-                if match:
-                    return match.group(1).strip()
+                title = cell.markdown_title()
+                if title:
+                    return title
 
         # Title not found, use file name
         return self.input_file.stem
 
-    def _ensure_relative_paths(self, content: str) -> str:
+    def _relative_link(self, path: str) -> str:
         """
-        Corrects markdown content by making image paths relative.
+        Makes the path of an extracted image relative to the output files.
 
         Args:
-            content: Markdown content
+            path: Image path, absolute or relative to the working directory
 
         Returns:
-            str: Markdown content with relative paths
+            str: Path relative to the directory of the output file
         """
+        output_file = self.output_file or self.resolve_output_path()
+        link = Path(os.path.relpath(path, output_file.parent)).as_posix()
+        if link.startswith("../"):
+            return link
+        return f"./{link}"
 
-        # Turn absolute paths into relative paths
-        def replace_path(match):
-            full_path = match.group(1)
-            if os.path.isabs(full_path):
-                filename = os.path.basename(full_path)
-                return f"](./{self.image_dir.name}/{filename})"
-            return match.group(0)
-
-        # ![...](path) fix the roads in the structure
-        path_pattern = re.compile(r"\]\(([^)]+)\)")
-        return path_pattern.sub(replace_path, content)
+    def _join_images(self) -> Tuple[bool, str]:
+        """
+        Waits for the images that are written in the background.
 
-    def save(self, output_file: Optional[str] = None) -> Tuple[bool, str]:
+        Returns:
+            Tuple[bool, str]: Success status and the output file or the error message;
+            the output already links the images, so a failed image fails the save
+        """
+        with self.profiler.stage("image_join"):
+            failures = self.image_writer.join()
+        if failures:
+            error_msg = (
+                f"ERROR: {failures} image(s) of {self.input_file} could not be "
+                f"written, {self.output_file} links missing files."
+            )
+            print(error_msg, file=sys.stderr)
+            return False, error_msg
+        return True, str(self.output_file)
+
+    def save(
+        self,
+        output_file: Optional[str] = None,
+        formats: Sequence[str] = DEFAULT_FORMATS,
+        release: bool = False,
+    ) -> Tuple[bool, str]:
         """
         Saves the generated Markdown content to the file.
 
         Args:
             output_file: Path to the output file. If not specified, a .md file with the same name as input_file is used.
+            formats: Output formats written in the same pass, see renderers.RENDERERS; the other formats replace the suffix of the output file
+            release: Drop the outputs of each cell once it is written, when the converter is not used again afterwards
 
         Returns:
-            Tuple[bool, str]: Full path to the success status and output file
+            Tuple[bool, str]: Full path to the success status and the file of the first format
         """
-        if output_file:
-            self.output_file = Path(output_file)
-        else:
-            self.output_file = self.input_file.with_suffix(".md")
+        output_paths = self.resolve_output_paths(output_file, formats)
+        self.output_file = output_paths[0]
 
         try:
-            markdown_content = self.convert()
+            with ExitStack() as stack:
+                renderers = self.create_renderers(stack, output_paths, formats)
+                self.render_formats(renderers, release)
 
-            # Final check - relativise the paths of images
-            markdown_content = self._ensure_relative_paths(markdown_content)
+            # Images may still be written in the background
+            return self._join_images()
+        except (PermissionError, IOError) as e:
+            error_msg = f"ERROR: Failed to write {self.output_file}. {str(e)}"
+            print(error_msg, file=sys.stderr)
+            return False, error_msg
+
+    def save_streaming(
+        self,
+        output_file: Optional[str] = None,
+        formats: Sequence[str] = DEFAULT_FORMATS,
+    ) -> Tuple[bool, str]:
+        """
+        Converts the notebook cell by cell while reading it and writes the Markdown file.
 
-            with open(self.output_file, "w", encoding="utf-8") as file:
-                file.write(markdown_content)
+        Only one cell is kept in memory at a time, so read_notebook must not be called beforehand.
+        The notebook metadata follows the cells in the file, so a first pass skips the cells
+        to read the kernel language. The title is only known after the cells, so the HTML
+        title is the name of the notebook.
+
+        Args:
+            output_file: Path to the output file. If not specified, a .md file with the same name as input_file is used.
+            formats: Output formats written in the same pass, see renderers.RENDERERS; the other formats replace the suffix of the output file
 
-            return True, str(self.output_file)
+        Returns:
+            Tuple[bool, str]: Full path to the success status and the file of the first format
+        """
+        output_paths = self.resolve_output_paths(output_file, formats)
+        self.output_file = output_paths[0]
+
+        try:
+            with ExitStack() as stack:
+                input_stream = stack.enter_context(
+                    open(self.input_file, "r", encoding="utf-8")
+                )
+                # The streaming parser is only needed with --stream
+                from .streaming import NotebookStreamReader
+
+                with self.profiler.stage("read_metadata"):
+                    entries = NotebookStreamReader(input_stream).read_entries()
+                self._set_kernel_language(entries.get("metadata", {}))
+                input_stream.seek(0)
+
+                reader = NotebookStreamReader(input_stream)
+                renderers = self.create_renderers(stack, output_paths, formats)
+                for renderer in renderers:
+                    renderer.begin(self.input_file.stem)
+
+                def read_cells() -> Iterator[NotebookCell]:
+                    for idx, cell_data in enumerate(reader.cells()):
+                        cell = self._create_cell(cell_data, idx + 1)
+                        if cell.cell_type == "markdown":
+                            cell.source = [cell.extract_inline_images_from_markdown()]
+                        yield cell
+
+                self._render_cells(read_cells(), renderers, release=False)
+
+                for renderer in renderers:
+                    renderer.end()
+                self.notebook_data = reader.notebook_data
+
+            # Images may still be written in the background
+            return self._join_images()
+        except (FileNotFoundError, json.JSONDecodeError, UnicodeDecodeError) as e:
+            error_msg = f"ERROR: File {self.input_file} could not be read. {str(e)}"
+            print(error_msg, file=sys.stderr)
+            return False, error_msg
         except (PermissionError, IOError) as e:
             error_msg = f"ERROR: Failed to write {self.output_file}. {str(e)}"
             print(error_msg, file=sys.stderr)
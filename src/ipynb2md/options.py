@@ -0,0 +1,156 @@
+from typing import TYPE_CHECKING, Any, Dict, NamedTuple, Optional, Tuple
+
+from .images import ImageWriter, ThreadedImageWriter
+from .outputs import OutputLimits
+from .profiling import Profiler
+
+if TYPE_CHECKING:
+    from .image_optimizer import ImageOptimizer
+    from .tables import TableLimits
+
+
+class ConversionOptions(NamedTuple):
+    """Settings shared by every notebook converted in one run."""
+
+    # Convert cells while reading the notebook
+    stream: bool = False
+    # Number of threads writing images (0 writes them on the rendering thread)
+    image_workers: int = 0
+    # Maximum number of images waiting to be written (0 uses 4 per worker)
+    image_queue_size: int = 0
+    # Shared directory storing each distinct image once under its content hash
+    image_store: Optional[str] = None
+    # Collect per-stage timings
+    profile: bool = False
+    # Re-encode extracted images without metadata (implied by the two settings below)
+    optimize_images: bool = False
+    # Images wider than this are scaled down (0 keeps the size)
+    image_max_width: int = 0
+    # "png" or "webp" to convert raster images (None keeps their format)
+    image_format: Optional[str] = None
+    # WebP and JPEG quality of re-encoded images
+    image_quality: int = 80
+    # Persistent cache of optimised images (None uses the user cache directory)
+    image_cache: Optional[str] = None
+    # Per-output and per-cell limits for text outputs (0 is unlimited)
+    max_output_lines: int = 0
+    max_output_bytes: int = 0
+    max_cell_lines: int = 0
+    max_cell_bytes: int = 0
+    # Write the full text of truncated outputs to a side file
+    spill_outputs: bool = False
+    # Merge adjacent stream outputs and keep only the final state of progress bars
+    merge_streams: bool = True
+    # Render HTML tables as Markdown tables instead of HTML blocks
+    html_tables: bool = False
+    # Maximum rows and columns of rendered tables (0 is unlimited)
+    max_table_rows: int = 0
+    max_table_columns: int = 0
+    # MIME types in order of preference; only the best representation of each output
+    # is written (None writes every representation)
+    display_priority: Optional[Tuple[str, ...]] = None
+    # Output formats written in one pass (see renderers.RENDERERS)
+    formats: Tuple[str, ...] = ("markdown",)
+    # Maximum number of characters of a search index record (0 is unlimited)
+    index_chunk_size: int = 2000
+    # Name images by their content and only rewrite files whose contents changed
+    deterministic: bool = False
+    # Replace memory addresses in outputs (e.g. <Figure at 0x7f...>) with 0x0
+    normalize_volatile: bool = False
+
+    # Fields that change how a notebook is converted but not the files produced
+    RUNTIME_FIELDS = (
+        "stream",
+        "image_workers",
+        "image_queue_size",
+        "profile",
+        "image_cache",
+    )
+
+    def cache_key(self) -> Dict[str, Any]:
+        """
+        Returns the options and version that influence the generated files, for the manifest.
+
+        Returns:
+            Dict[str, Any]: Option names mapped to their values, plus the package version
+        """
+        key: Dict[str, Any] = {}
+        for name, value in zip(self._fields, self):
+            if name in self.RUNTIME_FIELDS:
+                continue
+            # Tuples are stored as lists so that keys read back from JSON compare equal
+            key[name] = list(value) if isinstance(value, tuple) else value
+        # A new release may render the same notebook differently
+        from .manifest import package_version
+
+        key["version"] = package_version()
+        return key
+
+    def output_limits(self) -> OutputLimits:
+        """
+        Returns the size limits for the text outputs of a cell.
+
+        Returns:
+            OutputLimits: Limits matching the options
+        """
+        return OutputLimits(
+            self.max_output_lines,
+            self.max_output_bytes,
+            self.max_cell_lines,
+            self.max_cell_bytes,
+            self.spill_outputs,
+        )
+
+    def table_limits(self) -> Optional["TableLimits"]:
+        """
+        Returns the settings for rendering HTML tables as Markdown tables.
+
+        Returns:
+            Optional[TableLimits]: Limits, or None if HTML outputs are kept as HTML
+        """
+        if not self.html_tables:
+            return None
+        # html.parser is only imported when tables are rendered
+        from .tables import TableLimits
+
+        return TableLimits(self.max_table_rows, self.max_table_columns)
+
+    def create_image_optimizer(self) -> Optional["ImageOptimizer"]:
+        """
+        Creates the image optimizer matching the options.
+
+        Returns:
+            Optional[ImageOptimizer]: Optimizer, or None if images are written unchanged
+        """
+        if not (self.optimize_images or self.image_max_width or self.image_format):
+            return None
+        from .image_optimizer import create_image_optimizer
+
+        return create_image_optimizer(
+            self.image_max_width,
+            self.image_format,
+            self.image_quality,
+            self.image_cache,
+        )
+
+    def create_image_writer(self, profiler: Optional[Profiler] = None) -> ImageWriter:
+        """
+        Creates the image writer matching the options.
+
+        Args:
+            profiler: Collects the time spent decoding and writing images
+
+        Returns:
+            ImageWriter: New image writer, to be closed by the caller
+        """
+        optimizer = self.create_image_optimizer()
+        if self.image_workers > 0:
+            return ThreadedImageWriter(
+                self.image_workers,
+                self.image_queue_size,
+                self.image_store,
+                profiler,
+                optimizer,
+                self.deterministic,
+            )
+        return ImageWriter(self.image_store, profiler, optimizer, self.deterministic)
@@ -0,0 +1,496 @@
+import io
+import os
+import sys
+from collections import deque
+from pathlib import Path
+from typing import (
+    IO,
+    Any,
+    Callable,
+    Dict,
+    Deque,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Union,
+)
+
+from .patterns import LazyPattern
+
+# Used when a limit is disabled
+UNLIMITED = sys.maxsize
+
+
+# Line breaks and the terminal control characters applied to stream text
+CONTROL_PATTERN = LazyPattern(r"\r\n|[\r\n\b]")
+# Memory addresses in reprs such as <Figure at 0x7f3a2c1b5e50>, which change every run
+ADDRESS_PATTERN = LazyPattern(r"\b0x[0-9a-fA-F]{8,16}\b")
+
+
+class OutputLimits(NamedTuple):
+    """Size limits for the text outputs (streams, text/plain results and tracebacks) of a cell."""
+
+    # Maximum number of lines of a single output (0 is unlimited)
+    max_lines: int = 0
+    # Maximum number of UTF-8 bytes of a single output (0 is unlimited)
+    max_bytes: int = 0
+    # Maximum number of lines of all text outputs of a cell together (0 is unlimited)
+    max_cell_lines: int = 0
+    # Maximum number of UTF-8 bytes of all text outputs of a cell together (0 is unlimited)
+    max_cell_bytes: int = 0
+    # Write the full text of truncated outputs to a side file linked from the Markdown
+    spill: bool = False
+
+    @property
+    def enabled(self) -> bool:
+        """
+        Checks whether any limit is set.
+
+        Returns:
+            bool: True if outputs may be truncated
+        """
+        return bool(
+            self.max_lines
+            or self.max_bytes
+            or self.max_cell_lines
+            or self.max_cell_bytes
+        )
+
+
+class Truncation(NamedTuple):
+    """Outcome of writing one text output."""
+
+    lines: int
+    bytes: int
+    omitted_lines: int
+    omitted_bytes: int
+    spilled: bool
+
+
+class CellBudget:
+    """Tracks how much of the per-cell limits the outputs of a cell have used."""
+
+    def __init__(self, limits: OutputLimits) -> None:
+        """
+        Constructor method of the CellBudget class.
+
+        Args:
+            limits: Limits to enforce
+        """
+        self.limits: OutputLimits = limits
+        self.lines: int = limits.max_cell_lines or UNLIMITED
+        self.bytes: int = limits.max_cell_bytes or UNLIMITED
+
+    def output_limits(self) -> Tuple[int, int]:
+        """
+        Computes the limits of the next output.
+
+        Returns:
+            Tuple[int, int]: Maximum number of lines and bytes
+        """
+        return (
+            min(self.limits.max_lines or UNLIMITED, self.lines),
+            min(self.limits.max_bytes or UNLIMITED, self.bytes),
+        )
+
+    def consume(self, result: Truncation) -> None:
+        """
+        Subtracts a written output from the remaining budget.
+
+        Args:
+            result: Result of write_truncated
+        """
+        self.lines = max(self.lines - result.lines, 0)
+        self.bytes = max(self.bytes - result.bytes, 0)
+
+
+def select_representation(
+    data: Dict[str, Any], priority: Iterable[str]
+) -> Dict[str, Any]:
+    """
+    Keeps only the preferred representation of a display output.
+
+    Args:
+        data: MIME bundle of the output
+        priority: MIME types in order of preference
+
+    Returns:
+        Dict[str, Any]: Bundle holding only the selected representation, or an empty
+        bundle if the output has none of the MIME types
+    """
+    for mime_type in priority:
+        if mime_type in data:
+            return {mime_type: data[mime_type]}
+    return {}
+
+
+def iter_lines(text: Union[str, Iterable[str]]) -> Iterator[str]:
+    """
+    Splits notebook text, stored as a string or a list of lines, into lines.
+
+    Args:
+        text: Text to split
+
+    Returns:
+        Iterator[str]: Lines including their line breaks
+    """
+    chunks = [text] if isinstance(text, str) else text
+    # Pieces of a line split across several chunks
+    partial: List[str] = []
+    for chunk in chunks:
+        if not chunk:
+            continue
+        # Lists usually hold one line per item, so most chunks need no splitting
+        newline = chunk.find("\n")
+        if newline == -1:
+            partial.append(chunk)
+        elif newline == len(chunk) - 1 and not partial:
+            yield chunk
+        else:
+            for line in io.StringIO(chunk, newline="\n"):
+                if partial:
+                    partial.append(line)
+                    line = "".join(partial)
+                    partial = []
+                if line.endswith("\n"):
+                    yield line
+                else:
+                    partial.append(line)
+
+    if partial:
+        yield "".join(partial)
+
+
+def line_size(line: str) -> int:
+    """
+    Calculates the UTF-8 size of a line without encoding ASCII text.
+
+    Args:
+        line: Line to measure
+
+    Returns:
+        int: Number of bytes
+    """
+    return len(line) if line.isascii() else len(line.encode("utf-8"))
+
+
+def elision_marker(lines: int, size: int) -> str:
+    """
+    Builds the line written in place of the omitted part of an output.
+
+    Args:
+        lines: Number of omitted lines
+        size: Number of omitted bytes
+
+    Returns:
+        str: Marker line
+    """
+    return f"[... {lines} lines ({size} bytes) omitted ...]\n"
+
+
+def open_text_file(path: Path) -> IO[str]:
+    """
+    Opens a UTF-8 text file for writing, creating its directory if needed.
+
+    Args:
+        path: Path of the file
+
+    Returns:
+        IO[str]: File opened for writing
+    """
+    os.makedirs(path.parent, exist_ok=True)
+    return open(path, "w", encoding="utf-8")
+
+
+class IfChangedFile:
+    """
+    Text file that only replaces its target if the contents differ.
+
+    The text is written to a temporary file next to the target. When the file is closed,
+    the target is replaced atomically, or left untouched (keeping its modification time)
+    if it already holds the same bytes.
+    """
+
+    def __init__(self, path: Path) -> None:
+        """
+        Constructor method of the IfChangedFile class.
+
+        Args:
+            path: Path of the target file
+        """
+        os.makedirs(path.parent, exist_ok=True)
+        self.path: Path = path
+        # None while open, then whether the target was replaced
+        self.changed: Optional[bool] = None
+        self._temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        self._file = open(self._temp_path, "w", encoding="utf-8")
+        self.write = self._file.write
+        self.writelines = self._file.writelines
+
+    def close(self) -> None:
+        if self._file.closed:
+            return
+        self._file.close()
+        if self.path.exists() and _same_bytes(self._temp_path, self.path):
+            self._temp_path.unlink()
+            self.changed = False
+        else:
+            os.replace(self._temp_path, self.path)
+            self.changed = True
+
+    def discard(self) -> None:
+        """
+        Closes the file without touching the target.
+        """
+        self._file.close()
+        if self._temp_path.exists():
+            self._temp_path.unlink()
+
+    def __enter__(self) -> "IfChangedFile":
+        return self
+
+    def __exit__(self, exc_type, *exc_info) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self.discard()
+
+
+def _same_bytes(first: Path, second: Path, chunk_size: int = 1 << 16) -> bool:
+    """
+    Compares the contents of two files.
+
+    Args:
+        first: Path of a file
+        second: Path of the other file
+        chunk_size: Number of bytes compared at a time
+
+    Returns:
+        bool: True if both files hold the same bytes
+    """
+    if first.stat().st_size != second.stat().st_size:
+        return False
+    with open(first, "rb") as first_file, open(second, "rb") as second_file:
+        while True:
+            chunk = first_file.read(chunk_size)
+            if chunk != second_file.read(chunk_size):
+                return False
+            if not chunk:
+                return True
+
+
+def mask_addresses(text: Union[str, Iterable[str]]) -> Union[str, List[str]]:
+    """
+    Replaces memory addresses with 0x0, so that reprs are identical between runs.
+
+    Args:
+        text: Output text as a string or a list of lines
+
+    Returns:
+        Union[str, List[str]]: Text with masked addresses
+    """
+    if isinstance(text, str):
+        return ADDRESS_PATTERN.sub("0x0", text) if "0x" in text else text
+    return [ADDRESS_PATTERN.sub("0x0", line) if "0x" in line else line for line in text]
+
+
+def write_truncated(
+    write: Callable[[str], None],
+    text: Union[str, Iterable[str]],
+    max_lines: int = UNLIMITED,
+    max_bytes: int = UNLIMITED,
+    spill_path: Optional[Path] = None,
+    open_spill: Callable[[Path], IO[str]] = open_text_file,
+) -> Truncation:
+    """
+    Writes the head and tail of a text, replacing the middle with an elision marker when
+    the text exceeds the limits. The head is written as it is read and only the tail is
+    buffered, so memory stays bounded by the limits.
+
+    Args:
+        write: Function receiving the Markdown fragments
+        text: Text to write, as a string or a list of lines
+        max_lines: Maximum number of lines to write
+        max_bytes: Maximum number of UTF-8 bytes to write
+        spill_path: File receiving the full text if it has to be truncated
+        open_spill: Opens the spill file
+
+    Returns:
+        Truncation: Written and omitted amounts
+    """
+    head_lines = (max_lines + 1) // 2
+    head_bytes = max_bytes // 2
+    written_lines = 0
+    written_bytes = 0
+    in_head = True
+    # Head lines are only kept to be copied to the spill file
+    head: List[str] = []
+
+    tail: Deque[Tuple[str, int]] = deque()
+    tail_bytes = 0
+    omitted_lines = 0
+    omitted_bytes = 0
+    spill = None
+
+    try:
+        for line in iter_lines(text):
+            size = line_size(line)
+            if (
+                in_head
+                and written_lines < head_lines
+                and written_bytes + size <= head_bytes
+            ):
+                write(line)
+                written_lines += 1
+                written_bytes += size
+                if spill_path is not None:
+                    head.append(line)
+                continue
+
+            # The tail may use whatever the head left of the limits
+            in_head = False
+            if spill is not None:
+                spill.write(line)
+            tail.append((line, size))
+            tail_bytes += size
+
+            while tail and (
+                len(tail) > max_lines - written_lines
+                or tail_bytes > max_bytes - written_bytes
+            ):
+                if spill is None and spill_path is not None:
+                    spill = open_spill(spill_path)
+                    spill.writelines(head)
+                    spill.writelines(pending for pending, _ in tail)
+                    head = []
+                _, dropped_size = tail.popleft()
+                tail_bytes -= dropped_size
+                omitted_lines += 1
+                omitted_bytes += dropped_size
+    finally:
+        if spill is not None:
+            spill.close()
+
+    if omitted_lines:
+        write(elision_marker(omitted_lines, omitted_bytes))
+    for line, _ in tail:
+        write(line)
+
+    return Truncation(
+        written_lines + len(tail),
+        written_bytes + tail_bytes,
+        omitted_lines,
+        omitted_bytes,
+        spill is not None,
+    )
+
+
+def _overwrite(line: List[str], cursor: int, text: str) -> int:
+    """
+    Writes text over the characters of a line starting at the cursor, like a terminal.
+
+    Args:
+        line: Characters of the current line
+        cursor: Position to write at
+        text: Text to write
+
+    Returns:
+        int: New cursor position
+    """
+    end = cursor + len(text)
+    line[cursor:end] = text
+    return end
+
+
+def apply_control_characters(chunks: Iterable[str]) -> List[str]:
+    """
+    Applies carriage returns and backspaces the way the notebook frontend displays them,
+    so that only the final state of progress bars is kept. Runs in linear time.
+
+    Args:
+        chunks: Consecutive pieces of stream text
+
+    Returns:
+        List[str]: Visible lines including their line breaks
+    """
+    lines: List[str] = []
+    line: List[str] = []
+    cursor = 0
+
+    for chunk in chunks:
+        position = 0
+        for match in CONTROL_PATTERN.finditer(chunk):
+            if match.start() > position:
+                cursor = _overwrite(line, cursor, chunk[position : match.start()])
+            position = match.end()
+
+            control = match.group()
+            if control == "\r":
+                # Return to the start of the line; later text overwrites it
+                cursor = 0
+            elif control == "\b":
+                if cursor:
+                    cursor -= 1
+                    del line[cursor]
+            else:
+                lines.append("".join(line) + "\n")
+                line = []
+                cursor = 0
+
+        if position < len(chunk):
+            cursor = _overwrite(line, cursor, chunk[position:])
+
+    if line:
+        lines.append("".join(line))
+    return lines
+
+
+def _stream_chunks(texts: List[Union[str, List[str]]]) -> Iterator[str]:
+    for text in texts:
+        if isinstance(text, str):
+            yield text
+        else:
+            yield from text
+
+
+def coalesce_streams(outputs: List[Dict[str, Any]]) -> List[Tuple[int, Dict[str, Any]]]:
+    """
+    Merges adjacent stream outputs of the same stream and collapses carriage-return
+    progress updates. Outputs are not modified; merged outputs are new dictionaries.
+
+    Args:
+        outputs: Outputs of a code cell
+
+    Returns:
+        List[Tuple[int, Dict[str, Any]]]: Outputs with the index of the first output they stem from
+    """
+    groups: List[Tuple[int, Dict[str, Any], Optional[List[Any]]]] = []
+    for index, output in enumerate(outputs):
+        if output.get("output_type") != "stream":
+            groups.append((index, output, None))
+            continue
+
+        text = output.get("text", [])
+        previous = groups[-1] if groups else None
+        if (
+            previous is not None
+            and previous[2] is not None
+            and previous[1].get("name") == output.get("name")
+        ):
+            previous[2].append(text)
+        else:
+            groups.append((index, output, [text]))
+
+    coalesced: List[Tuple[int, Dict[str, Any]]] = []
+    for index, output, texts in groups:
+        if texts is not None:
+            chunks = _stream_chunks(texts)
+            if any("\r" in chunk or "\b" in chunk for chunk in _stream_chunks(texts)):
+                output = {**output, "text": apply_control_characters(chunks)}
+            elif len(texts) > 1:
+                output = {**output, "text": list(chunks)}
+        coalesced.append((index, output))
+    return coalesced
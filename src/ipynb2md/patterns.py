@@ -0,0 +1,48 @@
+import re
+from typing import Any, Pattern
+
+
+class LazyPattern:
+    """
+    Regular expression that is compiled when it is first used.
+
+    Module-level patterns cost nothing at import time this way. Attributes of the
+    compiled pattern are cached on the instance, so later calls such as
+    PATTERN.match(...) are as fast as on the compiled pattern itself.
+    """
+
+    def __init__(self, pattern: str, flags: int = 0) -> None:
+        """
+        Constructor method of the LazyPattern class.
+
+        Args:
+            pattern: Regular expression
+            flags: Flags passed to re.compile
+        """
+        self._source = pattern
+        self._flags = flags
+
+    def compile(self) -> Pattern[str]:
+        """
+        Returns the compiled pattern, compiling it on the first call.
+
+        Returns:
+            Pattern[str]: Compiled pattern
+        """
+        compiled = self.__dict__.get("_compiled")
+        if compiled is None:
+            compiled = self.__dict__["_compiled"] = re.compile(
+                self._source, self._flags
+            )
+        return compiled
+
+    def __getattr__(self, name: str) -> Any:
+        # Only called for attributes not cached yet
+        if name.startswith("__"):
+            raise AttributeError(name)
+        value = getattr(self.compile(), name)
+        self.__dict__[name] = value
+        return value
+
+    def __repr__(self) -> str:
+        return f"LazyPattern({self._source!r})"
@@ -0,0 +1,203 @@
+import time
+from contextlib import nullcontext
+from typing import Any, Callable, Dict, Optional
+
+StageCallback = Callable[[str, float], None]
+
+
+class _Stage:
+    """Context manager timing one execution of a stage."""
+
+    __slots__ = ("profiler", "name", "start")
+
+    def __init__(self, profiler: "Profiler", name: str) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self) -> "_Stage":
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.profiler.add_time(self.name, time.perf_counter() - self.start)
+
+
+class _NullStage:
+    """Context manager that does nothing, shared by every disabled stage."""
+
+    __slots__ = ()
+
+    def __enter__(self) -> "_NullStage":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        pass
+
+
+_NULL_STAGE = _NullStage()
+
+
+class Profiler:
+    """Collects the wall time and counters of the conversion stages."""
+
+    enabled: bool = True
+
+    def __init__(self, callback: Optional[StageCallback] = None) -> None:
+        """
+        Constructor method of the Profiler class.
+
+        Args:
+            callback: Called with the stage name and its duration in seconds every time a stage ends
+        """
+        self.callback: Optional[StageCallback] = callback
+        self.timings: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self.counters: Dict[str, int] = {}
+        self._lock = self._create_lock()
+
+    def _create_lock(self) -> Any:
+        """
+        Creates the lock guarding the collected data.
+
+        Returns:
+            Any: Lock, as stages may end on image writer threads
+        """
+        import threading
+
+        return threading.Lock()
+
+    def stage(self, name: str) -> Any:
+        """
+        Times a stage.
+
+        Args:
+            name: Name of the stage
+
+        Returns:
+            Any: Context manager measuring the enclosed block
+        """
+        return _Stage(self, name)
+
+    def add_time(self, name: str, seconds: float) -> None:
+        """
+        Records a duration for a stage.
+
+        Args:
+            name: Name of the stage
+            seconds: Duration in seconds
+        """
+        with self._lock:
+            self.timings[name] = self.timings.get(name, 0.0) + seconds
+            self.calls[name] = self.calls.get(name, 0) + 1
+        if self.callback:
+            self.callback(name, seconds)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """
+        Increments a counter.
+
+        Args:
+            name: Name of the counter
+            amount: Value to add
+        """
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def wrap_writer(self, write: Callable[[str], None]) -> Callable[[str], None]:
+        """
+        Wraps a text sink so that the time spent writing is recorded.
+
+        Args:
+            write: Function receiving the Markdown fragments
+
+        Returns:
+            Callable[[str], None]: Wrapped function
+        """
+
+        def timed_write(fragment: str) -> None:
+            start = time.perf_counter()
+            write(fragment)
+            self.add_time("write", time.perf_counter() - start)
+            self.count("characters_written", len(fragment))
+
+        return timed_write
+
+    def to_dict(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Exports the collected data, e.g. to send it from a worker process.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Timings, call counts and counters
+        """
+        with self._lock:
+            return {
+                "timings": dict(self.timings),
+                "calls": dict(self.calls),
+                "counters": dict(self.counters),
+            }
+
+    def merge(self, data: Dict[str, Dict[str, Any]]) -> None:
+        """
+        Adds data exported by another profiler.
+
+        Args:
+            data: Result of Profiler.to_dict
+        """
+        with self._lock:
+            for name, seconds in data.get("timings", {}).items():
+                self.timings[name] = self.timings.get(name, 0.0) + seconds
+            for name, calls in data.get("calls", {}).items():
+                self.calls[name] = self.calls.get(name, 0) + calls
+            for name, value in data.get("counters", {}).items():
+                self.counters[name] = self.counters.get(name, 0) + value
+
+    def report(self) -> str:
+        """
+        Formats a per-stage breakdown. Times of nested stages are included in their parents.
+
+        Returns:
+            str: Human readable report
+        """
+        data = self.to_dict()
+        lines = [f"{'Stage':<24}{'Calls':>10}{'Total (s)':>14}{'Mean (ms)':>14}"]
+        for name, seconds in sorted(
+            data["timings"].items(), key=lambda item: item[1], reverse=True
+        ):
+            calls = data["calls"][name]
+            lines.append(
+                f"{name:<24}{calls:>10}{seconds:>14.4f}{seconds / calls * 1000:>14.3f}"
+            )
+
+        if data["counters"]:
+            lines.append("")
+            lines.append(f"{'Counter':<24}{'Value':>10}")
+            for name, value in sorted(data["counters"].items()):
+                lines.append(f"{name:<24}{value:>10}")
+
+        return "\n".join(lines)
+
+
+class NullProfiler(Profiler):
+    """Profiler used when profiling is disabled; every hook is a no-op."""
+
+    enabled = False
+
+    def _create_lock(self) -> Any:
+        # Nothing is recorded, so threading is not imported for the disabled profiler
+        return nullcontext()
+
+    def stage(self, name: str) -> Any:
+        return _NULL_STAGE
+
+    def add_time(self, name: str, seconds: float) -> None:
+        pass
+
+    def count(self, name: str, amount: int = 1) -> None:
+        pass
+
+    def wrap_writer(self, write: Callable[[str], None]) -> Callable[[str], None]:
+        return write
+
+
+NULL_PROFILER = NullProfiler()
@@ -0,0 +1,501 @@
+import json
+import sys
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Tuple,
+    Type,
+)
+
+from .images import ExtractedImage
+from .markdown import markdown_headings
+from .outputs import (
+    CellBudget,
+    coalesce_streams,
+    iter_lines,
+    mask_addresses,
+    select_representation,
+)
+from .patterns import LazyPattern
+
+if TYPE_CHECKING:
+    from .notebook_cell import NotebookCell
+
+# Terminal colour codes of tracebacks and coloured stream output
+ANSI_PATTERN = LazyPattern(r"\x1b\[[0-9;]*[A-Za-z]")
+# HTML tags, removed from the plain text of HTML outputs
+TAG_PATTERN = LazyPattern(r"<[^>]*>")
+
+STYLE = """body { max-width: 60rem; margin: 2rem auto; padding: 0 1rem;
+  font-family: system-ui, sans-serif; line-height: 1.5; }
+pre { background: #f6f8fa; padding: 0.75rem; overflow-x: auto; }
+.output pre { background: #fff; border-left: 3px solid #d0d7de; }
+.output img { max-width: 100%; }"""
+
+# Maximum number of characters of the text of a search index record
+DEFAULT_CHUNK_SIZE = 2000
+
+_warned_missing = False
+
+
+class OutputItem(NamedTuple):
+    """One representation of a cell output, as shown by the output formats."""
+
+    # Index of the output in the cell
+    index: int
+    # "text", "markdown", "latex", "html", "image" or "error"
+    kind: str
+    # Text of the output, or the path of an image
+    value: str
+    # Path of the file holding the full text of a truncated output, if it was spilled
+    spill: str = ""
+
+
+def _join(text: Any) -> str:
+    return text if isinstance(text, str) else "".join(text)
+
+
+def _limited_item(
+    cell: "NotebookCell",
+    budget: Optional[CellBudget],
+    index: int,
+    kind: str,
+    text: Any,
+) -> OutputItem:
+    """
+    Creates the item of a text output, truncated to the output limits like in Markdown.
+
+    Args:
+        cell: Code cell
+        budget: Remaining per-cell limits, or None if outputs are not limited
+        index: Index of the output in the cell
+        kind: Kind of the item
+        text: Text of the output, as a string or a list of lines
+
+    Returns:
+        OutputItem: Item with the head and tail of the text
+    """
+    if budget is None:
+        return OutputItem(index, kind, _join(text))
+
+    truncated, result = cell.truncate_output(text, index, budget)
+    spill = str(cell.spill_path(index)) if result.spilled else ""
+    return OutputItem(index, kind, truncated, spill)
+
+
+def output_items(cell: "NotebookCell") -> Iterator[OutputItem]:
+    """
+    Lists the outputs of a code cell in the order and selection used for Markdown.
+
+    Images must have been extracted with NotebookCell.extract_output_images. Text
+    outputs are truncated to the output limits; table rendering only applies to
+    Markdown.
+
+    Args:
+        cell: Code cell
+
+    Returns:
+        Iterator[OutputItem]: Representations of the outputs
+    """
+    context = cell.context
+    budget = CellBudget(context.output_limits) if context.output_limits else None
+    outputs = (
+        coalesce_streams(cell.outputs)
+        if context.merge_streams
+        else enumerate(cell.outputs)
+    )
+    for index, output in outputs:
+        output_type = output.get("output_type", "")
+        if output_type == "stream":
+            text = output.get("text", [])
+            if context.normalize_volatile:
+                text = mask_addresses(text)
+            yield _limited_item(cell, budget, index, "text", text)
+
+        elif output_type == "execute_result" or output_type == "display_data":
+            data = output.get("data", {})
+            if context.display_priority is not None:
+                data = select_representation(data, context.display_priority)
+            if context.normalize_volatile:
+                data = {
+                    mime_type: (
+                        mask_addresses(content)
+                        if mime_type.startswith("text/")
+                        else content
+                    )
+                    for mime_type, content in data.items()
+                }
+            if "text/plain" in data:
+                yield _limited_item(cell, budget, index, "text", data["text/plain"])
+            if "text/html" in data:
+                yield OutputItem(index, "html", _join(data["text/html"]))
+            if context.display_priority is not None:
+                if "text/markdown" in data:
+                    yield OutputItem(index, "markdown", _join(data["text/markdown"]))
+                elif "text/latex" in data:
+                    yield OutputItem(index, "latex", _join(data["text/latex"]))
+            for mime_type, content in data.items():
+                if (
+                    mime_type.startswith("image/")
+                    and isinstance(content, ExtractedImage)
+                    and content.path
+                ):
+                    yield OutputItem(index, "image", content.path)
+
+        elif output_type == "error":
+            traceback = ANSI_PATTERN.sub("", "\n".join(output.get("traceback", [])))
+            if context.normalize_volatile:
+                traceback = mask_addresses(traceback)
+            yield _limited_item(cell, budget, index, "error", traceback)
+
+
+def output_texts(cell: "NotebookCell") -> Iterator[str]:
+    """
+    Lists the text of the outputs of a code cell without markup and colour codes.
+
+    Args:
+        cell: Code cell
+
+    Returns:
+        Iterator[str]: Non-empty texts, e.g. for full-text search
+    """
+    for item in output_items(cell):
+        if item.kind == "image":
+            continue
+        text = item.value
+        if item.kind == "html":
+            import html
+
+            text = html.unescape(TAG_PATTERN.sub("", text))
+        else:
+            text = ANSI_PATTERN.sub("", text)
+        text = text.strip("\n")
+        if text:
+            yield text
+
+
+class Renderer:
+    """
+    Base class of the output formats.
+
+    The converter creates one renderer per format and passes every cell to all of
+    them in one pass, after the images of the cell have been extracted.
+    """
+
+    # File name suffix of the format
+    extension: str = ""
+    # Whether the notebook title is needed before the first cell
+    needs_title: bool = False
+
+    def __init__(
+        self, write: Callable[[str], None], link: Callable[[str], str]
+    ) -> None:
+        """
+        Constructor method of the Renderer class.
+
+        Args:
+            write: Function receiving the text fragments (e.g. file.write)
+            link: Turns the path of an extracted image into the link to write
+        """
+        self.write = write
+        self.link = link
+
+    def begin(self, title: str) -> None:
+        """
+        Writes what precedes the first cell.
+
+        Args:
+            title: Title of the notebook
+        """
+
+    def render_cell(self, cell: "NotebookCell") -> None:
+        """
+        Writes one cell.
+
+        Args:
+            cell: Cell to write
+        """
+        raise NotImplementedError
+
+    def end(self) -> None:
+        """
+        Writes what follows the last cell.
+        """
+
+
+class MarkdownRenderer(Renderer):
+    """GitHub flavoured Markdown, as written by NotebookCell.render."""
+
+    extension = ".md"
+
+    def render_cell(self, cell: "NotebookCell") -> None:
+        # Links are written by the cell, see CellContext.link
+        cell.render(self.write)
+
+
+def markdown_to_html(text: str) -> str:
+    """
+    Converts Markdown to HTML with the markdown package if it is installed.
+
+    Args:
+        text: Markdown text
+
+    Returns:
+        str: HTML, or the escaped text in a <pre> block without the markdown package
+    """
+    global _warned_missing
+    try:
+        import markdown
+    except ImportError:
+        if not _warned_missing:
+            _warned_missing = True
+            print(
+                "WARNING: markdown is not installed, Markdown is written as plain "
+                "text to HTML files. Install it with: pip install markdown",
+                file=sys.stderr,
+            )
+        import html
+
+        return f'<pre class="markdown">{html.escape(text)}</pre>\n'
+    return markdown.markdown(text, extensions=["tables", "fenced_code"]) + "\n"
+
+
+class HtmlRenderer(Renderer):
+    """Standalone HTML page for previews."""
+
+    extension = ".html"
+    needs_title = True
+
+    def begin(self, title: str) -> None:
+        # html is only imported when an HTML format is written
+        import html
+
+        self.write(
+            "<!DOCTYPE html>\n<html>\n<head>\n"
+            '<meta charset="utf-8">\n'
+            f"<title>{html.escape(title)}</title>\n"
+            f"<style>\n{STYLE}\n</style>\n"
+            "</head>\n<body>\n"
+        )
+
+    def render_cell(self, cell: "NotebookCell") -> None:
+        import html
+
+        write = self.write
+        source = cell.linked_source()
+        if cell.cell_type == "markdown":
+            fragment = markdown_to_html(source)
+            write(f'<div class="cell markdown">\n{fragment}</div>\n')
+            return
+        if cell.cell_type != "code":
+            write(f'<div class="cell raw"><pre>{html.escape(source)}</pre></div>\n')
+            return
+
+        write(
+            f'<div class="cell code">\n'
+            f'<pre><code class="language-{html.escape(cell.detect_language())}">'
+            f"{html.escape(source)}</code></pre>\n"
+        )
+        for item in output_items(cell):
+            if item.kind == "html":
+                fragment = item.value
+            elif item.kind == "markdown":
+                fragment = markdown_to_html(item.value)
+            elif item.kind == "image":
+                alt = f"Image - Cell {cell.cell_counter}, Output {item.index + 1}"
+                fragment = (
+                    f'<img src="{html.escape(self.link(item.value))}" '
+                    f'alt="{html.escape(alt)}">'
+                )
+            else:
+                fragment = f'<pre class="{item.kind}">{html.escape(item.value)}</pre>'
+            if item.spill:
+                fragment += (
+                    f'\n<a href="{html.escape(self.link(item.spill))}">'
+                    f"Full output - Cell {cell.cell_counter}, Output {item.index + 1}</a>"
+                )
+            write(f'<div class="output">\n{fragment}\n</div>\n')
+        write("</div>\n")
+
+    def end(self) -> None:
+        self.write("</body>\n</html>\n")
+
+
+class TextRenderer(Renderer):
+    """Plain text of the sources and text outputs, e.g. for full-text search."""
+
+    extension = ".txt"
+
+    def render_cell(self, cell: "NotebookCell") -> None:
+        write = self.write
+        write(cell.linked_source().rstrip("\n"))
+        write("\n\n")
+        if cell.cell_type != "code":
+            return
+
+        for text in output_texts(cell):
+            write(text)
+            write("\n\n")
+
+
+class JsonLinesRenderer(Renderer):
+    """One JSON object per cell with its type, language, source and outputs."""
+
+    extension = ".jsonl"
+
+    def render_cell(self, cell: "NotebookCell") -> None:
+        language: Optional[str] = None
+        source = cell.linked_source()
+        outputs: List[Dict[str, Any]] = []
+        if cell.cell_type == "code":
+            language = cell.detect_language()
+            for item in output_items(cell):
+                if item.kind == "image":
+                    outputs.append({"type": "image", "path": self.link(item.value)})
+                else:
+                    entry = {"type": item.kind, "text": item.value}
+                    if item.spill:
+                        entry["full_output"] = self.link(item.spill)
+                    outputs.append(entry)
+        elif cell.cell_type == "markdown":
+            language = "markdown"
+
+        record = {
+            "cell": cell.cell_counter,
+            "cell_type": cell.cell_type,
+            "language": language,
+            "source": source,
+            "outputs": outputs,
+        }
+        self.write(json.dumps(record, ensure_ascii=False))
+        self.write("\n")
+
+
+class SearchIndexRenderer(Renderer):
+    """
+    JSON lines for full-text and embedding indexes.
+
+    Each cell is split into chunks of at most chunk_size characters; every heading
+    starts a new chunk. A record holds one chunk with the notebook path, the cell
+    index, type and language and the path of markdown headings above it.
+    """
+
+    extension = ".index.jsonl"
+
+    def __init__(
+        self,
+        write: Callable[[str], None],
+        link: Callable[[str], str],
+        notebook_path: str = "",
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> None:
+        """
+        Constructor method of the SearchIndexRenderer class.
+
+        Args:
+            write: Function receiving the text fragments (e.g. file.write)
+            link: Turns the path of an extracted image into the link to write
+            notebook_path: Path of the notebook stored in every record
+            chunk_size: Maximum number of characters of a chunk (0 is unlimited)
+        """
+        super().__init__(write, link)
+        self.notebook_path = notebook_path
+        self.chunk_size = chunk_size
+        # Level and text of the enclosing headings
+        self.headings: List[Tuple[int, str]] = []
+
+    def _enter_heading(self, level: int, text: str) -> None:
+        while self.headings and self.headings[-1][0] >= level:
+            self.headings.pop()
+        self.headings.append((level, text))
+
+    def _split_line(self, line: str) -> Iterator[str]:
+        # Lines longer than a chunk are split after a space where possible
+        while self.chunk_size and len(line) > self.chunk_size:
+            end = line.rfind(" ", 0, self.chunk_size) + 1 or self.chunk_size
+            yield line[:end]
+            line = line[end:]
+        yield line
+
+    def _chunks(
+        self, lines: List[str], headings: Dict[int, Tuple[int, str]]
+    ) -> Iterator[Tuple[List[str], str]]:
+        """
+        Splits the lines of a cell into chunks.
+
+        Args:
+            lines: Lines of the cell text
+            headings: Level and text of the markdown headings by line index
+
+        Returns:
+            Iterator[Tuple[List[str], str]]: Heading path and text of each chunk
+        """
+        chunk: List[str] = []
+        size = 0
+        path = [text for _, text in self.headings]
+        for index, line in enumerate(lines):
+            heading = headings.get(index)
+            if heading is not None:
+                if chunk:
+                    yield path, "".join(chunk)
+                    chunk, size = [], 0
+                self._enter_heading(*heading)
+                path = [text for _, text in self.headings]
+
+            for piece in self._split_line(line):
+                if chunk and self.chunk_size and size + len(piece) > self.chunk_size:
+                    yield path, "".join(chunk)
+                    chunk, size = [], 0
+                chunk.append(piece)
+                size += len(piece)
+        if chunk:
+            yield path, "".join(chunk)
+
+    def render_cell(self, cell: "NotebookCell") -> None:
+        source = cell.linked_source()
+        headings: Dict[int, Tuple[int, str]] = {}
+        language: Optional[str] = None
+        if cell.cell_type == "markdown":
+            language = "markdown"
+            headings = {
+                index: (level, text) for index, level, text in markdown_headings(source)
+            }
+        elif cell.cell_type == "code":
+            language = cell.detect_language()
+            texts = [source.rstrip("\n"), *output_texts(cell)]
+            source = "\n\n".join(texts)
+
+        chunk_index = 0
+        for path, text in self._chunks(list(iter_lines(source)), headings):
+            text = text.strip()
+            if not text:
+                continue
+            record = {
+                "notebook": self.notebook_path,
+                "cell": cell.cell_counter,
+                "chunk": chunk_index,
+                "cell_type": cell.cell_type,
+                "language": language,
+                "headings": path,
+                "text": text,
+            }
+            self.write(json.dumps(record, ensure_ascii=False))
+            self.write("\n")
+            chunk_index += 1
+
+
+# Output formats by the name used on the command line
+RENDERERS: Dict[str, Type[Renderer]] = {
+    "markdown": MarkdownRenderer,
+    "html": HtmlRenderer,
+    "text": TextRenderer,
+    "jsonl": JsonLinesRenderer,
+    "index": SearchIndexRenderer,
+}
+DEFAULT_FORMATS: Tuple[str, ...] = ("markdown",)
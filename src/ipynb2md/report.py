@@ -0,0 +1,224 @@
+import json
+import os
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Sequence, Tuple
+
+from .profiling import Profiler
+
+if TYPE_CHECKING:
+    from .batch import ConversionResult
+
+# Bump when the layout of the report file changes incompatibly
+REPORT_VERSION = 1
+
+
+def result_entry(result: "ConversionResult") -> Dict[str, Any]:
+    """
+    Describes the outcome of one conversion for a report.
+
+    Args:
+        result: Result of the conversion
+
+    Returns:
+        Dict[str, Any]: Input, status, duration and the written files or the error
+    """
+    entry: Dict[str, Any] = {
+        "input": result.input_file,
+        "duration": result.duration,
+    }
+    if not result.success:
+        entry["status"] = "failed"
+        entry["error"] = result.output
+        return entry
+
+    entry["status"] = "skipped" if result.skipped else "converted"
+    entry["output"] = result.output
+    entry["image_dir"] = result.image_dir
+    entry["images"] = result.images or {}
+    return entry
+
+
+def summarize(notebooks: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Counts the notebooks of a report by status.
+
+    Args:
+        notebooks: Entries created by result_entry
+
+    Returns:
+        Dict[str, Any]: Number of notebooks, conversions, skips, failures and images,
+        and the summed conversion time in seconds
+    """
+    summary: Dict[str, Any] = {
+        "notebooks": len(notebooks),
+        "converted": 0,
+        "skipped": 0,
+        "failed": 0,
+        "images": 0,
+        "duration": 0.0,
+    }
+    for entry in notebooks:
+        summary[entry["status"]] += 1
+        summary["images"] += len(entry.get("images", {}))
+        summary["duration"] += entry.get("duration", 0.0)
+    return summary
+
+
+def build_report(
+    results: Sequence["ConversionResult"],
+    shard: Optional[Tuple[int, int]] = None,
+    elapsed: float = 0.0,
+    profile: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Creates the report of a run, e.g. of one shard.
+
+    Args:
+        results: Results of convert_files
+        shard: Shard number and number of shards (None for an unsharded run)
+        elapsed: Wall time of the run in seconds
+        profile: Stage timings of the run, see Profiler.to_dict
+
+    Returns:
+        Dict[str, Any]: Report that can be written with write_report and merged with
+        merge_reports
+    """
+    index, count = shard if shard is not None else (1, 1)
+    notebooks = sorted(
+        (result_entry(result) for result in results), key=lambda entry: entry["input"]
+    )
+    return {
+        "version": REPORT_VERSION,
+        "shard_count": count,
+        "shards": [index],
+        "missing_shards": [shard for shard in range(1, count + 1) if shard != index],
+        # Wall time of each shard, the slowest one bounds the whole build
+        "elapsed": {str(index): elapsed},
+        "summary": summarize(notebooks),
+        "notebooks": notebooks,
+        "profile": profile,
+    }
+
+
+def merge_reports(reports: Sequence[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Combines the reports of several shards into one report.
+
+    Merged reports can be merged again, e.g. per team and then for the whole build.
+
+    Args:
+        reports: Reports created by build_report or merge_reports
+
+    Returns:
+        Dict[str, Any]: Combined report; missing_shards lists the shards none of the
+        reports covered
+
+    Raises:
+        ValueError: If the reports were split into different numbers of shards or cover
+            the same shard twice
+    """
+    if not reports:
+        raise ValueError("No reports to merge")
+
+    count = reports[0]["shard_count"]
+    shards: List[int] = []
+    elapsed: Dict[str, float] = {}
+    notebooks: List[Dict[str, Any]] = []
+    profiler: Optional[Profiler] = None
+    for report in reports:
+        if report["shard_count"] != count:
+            raise ValueError(
+                f"Reports of {count} and {report['shard_count']} shards "
+                "cannot be merged"
+            )
+        duplicates = sorted(set(shards) & set(report["shards"]))
+        if duplicates:
+            raise ValueError(
+                f"Shard {', '.join(map(str, duplicates))} is reported more than once"
+            )
+        shards += report["shards"]
+        elapsed.update(report["elapsed"])
+        notebooks += report["notebooks"]
+        if report.get("profile"):
+            profiler = profiler if profiler is not None else Profiler()
+            profiler.merge(report["profile"])
+
+    notebooks.sort(key=lambda entry: entry["input"])
+    return {
+        "version": REPORT_VERSION,
+        "shard_count": count,
+        "shards": sorted(shards),
+        "missing_shards": [
+            shard for shard in range(1, count + 1) if shard not in shards
+        ],
+        "elapsed": elapsed,
+        "summary": summarize(notebooks),
+        "notebooks": notebooks,
+        "profile": profiler.to_dict() if profiler is not None else None,
+    }
+
+
+def load_report(path: str) -> Dict[str, Any]:
+    """
+    Reads a report file.
+
+    Args:
+        path: Path to the JSON report
+
+    Returns:
+        Dict[str, Any]: Report
+
+    Raises:
+        OSError: If the file cannot be read
+        ValueError: If the file is not a report of this version
+    """
+    with open(path, "r", encoding="utf-8") as file:
+        data = json.load(file)
+    if (
+        not isinstance(data, dict)
+        or data.get("version") != REPORT_VERSION
+        or "notebooks" not in data
+    ):
+        raise ValueError(f"{path} is not a version {REPORT_VERSION} report")
+    return data
+
+
+def write_report(path: str, report: Dict[str, Any]) -> None:
+    """
+    Writes a report atomically, so a runner killed while writing leaves no partial file.
+
+    Args:
+        path: Path to the JSON report
+        report: Report created by build_report or merge_reports
+    """
+    report_path = Path(path)
+    os.makedirs(report_path.parent, exist_ok=True)
+
+    temp_path = report_path.with_name(report_path.name + ".tmp")
+    with open(temp_path, "w", encoding="utf-8") as file:
+        json.dump(report, file, indent=2, sort_keys=True)
+    os.replace(temp_path, report_path)
+
+
+def format_summary(report: Dict[str, Any]) -> str:
+    """
+    Formats the totals and failures of a report.
+
+    Args:
+        report: Report created by build_report or merge_reports
+
+    Returns:
+        str: Human readable summary
+    """
+    summary = report["summary"]
+    elapsed = max(report["elapsed"].values(), default=0.0)
+    lines = [
+        f"{len(report['shards'])} of {report['shard_count']} shards: "
+        f"{summary['notebooks']} notebooks, {summary['converted']} converted, "
+        f"{summary['skipped']} up to date, {summary['failed']} failed, "
+        f"{summary['images']} images ({elapsed:.1f} s on the slowest shard)"
+    ]
+    for entry in report["notebooks"]:
+        if entry["status"] == "failed":
+            lines.append(f"Failed: {entry['input']}: {entry['error']}")
+    return "\n".join(lines)
@@ -0,0 +1,228 @@
+import json
+from typing import Any, Dict, Iterator, TextIO
+
+from .patterns import LazyPattern
+
+DEFAULT_CHUNK_SIZE = 1 << 16
+WHITESPACE = " \t\n\r"
+
+# Characters that matter when a value is skipped, outside and inside strings
+STRUCTURE_PATTERN = LazyPattern(r'["\[\]{}]')
+STRING_PATTERN = LazyPattern(r'["\\]')
+
+
+class NotebookStreamReader:
+    """Incremental reader that yields notebook cells without loading the whole document."""
+
+    def __init__(self, file: TextIO, chunk_size: int = DEFAULT_CHUNK_SIZE) -> None:
+        """
+        Constructor method of the NotebookStreamReader class.
+
+        Args:
+            file: Notebook file opened in text mode
+            chunk_size: Number of characters read from the file at once
+        """
+        self.file: TextIO = file
+        self.chunk_size: int = chunk_size
+        # Top-level entries other than "cells" (metadata, nbformat, ...)
+        self.notebook_data: Dict[str, Any] = {}
+
+        self._decoder = json.JSONDecoder()
+        self._buffer: str = ""
+        self._pos: int = 0
+        self._eof: bool = False
+
+    def _fill(self, min_size: int = 0) -> bool:
+        """
+        Reads more data into the buffer and drops the part already consumed.
+
+        Args:
+            min_size: Minimum number of characters to read
+
+        Returns:
+            bool: False if the end of the file was reached before any data was read
+        """
+        if self._eof:
+            return False
+
+        chunk = self.file.read(max(self.chunk_size, min_size))
+        if not chunk:
+            self._eof = True
+            return False
+
+        self._buffer = self._buffer[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _peek(self) -> str:
+        """
+        Skips whitespace and returns the next character without consuming it.
+
+        Returns:
+            str: Next character or an empty string at the end of the file
+        """
+        while True:
+            buffer = self._buffer
+            while self._pos < len(buffer) and buffer[self._pos] in WHITESPACE:
+                self._pos += 1
+            if self._pos < len(buffer) or not self._fill():
+                break
+
+        return self._buffer[self._pos] if self._pos < len(self._buffer) else ""
+
+    def _expect(self, char: str) -> None:
+        """
+        Consumes the given structural character.
+
+        Args:
+            char: Expected character
+        """
+        if self._peek() != char:
+            raise json.JSONDecodeError(f"Expecting '{char}'", self._buffer, self._pos)
+        self._pos += 1
+
+    def _decode_value(self) -> Any:
+        """
+        Decodes the next complete JSON value, reading more data as needed.
+
+        Returns:
+            Any: Decoded value
+        """
+        self._peek()
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError:
+                # Grow geometrically so that a huge value is not re-scanned once per chunk
+                if not self._fill(len(self._buffer) - self._pos):
+                    raise
+                continue
+
+            # A number ending exactly at the buffer boundary may still continue
+            if end == len(self._buffer) and self._fill():
+                continue
+
+            self._pos = end
+            return value
+
+    def _skip_value(self) -> None:
+        """
+        Moves past the next JSON value without decoding it.
+
+        Arrays and objects are only scanned for brackets and strings, so skipping them
+        costs a fraction of decoding them and keeps nothing in memory.
+        """
+        if self._peek() not in ("[", "{"):
+            self._decode_value()
+            return
+
+        depth = 0
+        in_string = False
+        while True:
+            pattern = STRING_PATTERN if in_string else STRUCTURE_PATTERN
+            match = pattern.search(self._buffer, self._pos)
+            if match is None:
+                self._pos = len(self._buffer)
+                if not self._fill():
+                    raise json.JSONDecodeError(
+                        "Unterminated value", self._buffer, self._pos
+                    )
+                continue
+
+            char = match.group()
+            index = match.start()
+            if char == "\\":
+                if index + 1 == len(self._buffer):
+                    # The escaped character is in the next chunk
+                    self._pos = index
+                    if not self._fill():
+                        raise json.JSONDecodeError(
+                            "Unterminated string", self._buffer, self._pos
+                        )
+                    continue
+                self._pos = index + 2
+                continue
+
+            self._pos = index + 1
+            if char == '"':
+                in_string = not in_string
+            elif char in "[{":
+                depth += 1
+            else:
+                depth -= 1
+                if depth == 0:
+                    return
+
+    def read_entries(self) -> Dict[str, Any]:
+        """
+        Reads the top-level entries other than the cells, which are skipped undecoded.
+
+        nbformat writes the metadata after the cells, so this lets a caller learn the
+        kernel language before streaming the cells from a second reader.
+
+        Returns:
+            Dict[str, Any]: Top-level entries (metadata, nbformat, ...)
+        """
+        for _ in self._read(decode_cells=False):
+            pass
+        return self.notebook_data
+
+    def cells(self) -> Iterator[Dict[str, Any]]:
+        """
+        Yields the raw cell dictionaries one by one.
+
+        Top-level entries are collected in notebook_data as they are encountered, so entries
+        that follow the cells array are only available once the iterator is exhausted.
+
+        Returns:
+            Iterator[Dict[str, Any]]: Raw cell dictionaries
+        """
+        return self._read(decode_cells=True)
+
+    def _read(self, decode_cells: bool) -> Iterator[Dict[str, Any]]:
+        """
+        Implementation of cells and read_entries.
+
+        Args:
+            decode_cells: Yield the cells; otherwise the cells array is skipped
+
+        Returns:
+            Iterator[Dict[str, Any]]: Raw cell dictionaries
+        """
+        self._expect("{")
+        if self._peek() == "}":
+            self._pos += 1
+            return
+
+        while True:
+            key = self._decode_value()
+            self._expect(":")
+
+            if key == "cells" and not decode_cells:
+                self._skip_value()
+            elif key == "cells":
+                self._expect("[")
+                if self._peek() == "]":
+                    self._pos += 1
+                else:
+                    while True:
+                        yield self._decode_value()
+                        separator = self._peek()
+                        self._pos += 1
+                        if separator == "]":
+                            break
+                        if separator != ",":
+                            raise json.JSONDecodeError(
+                                "Expecting ',' delimiter", self._buffer, self._pos - 1
+                            )
+            else:
+                self.notebook_data[key] = self._decode_value()
+
+            separator = self._peek()
+            self._pos += 1
+            if separator == "}":
+                return
+            if separator != ",":
+                raise json.JSONDecodeError(
+                    "Expecting ',' delimiter", self._buffer, self._pos - 1
+                )
@@ -0,0 +1,254 @@
+from html.parser import HTMLParser
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from .outputs import UNLIMITED
+
+# Elements whose text is never shown
+HIDDEN_TAGS = ("style", "script")
+# Elements that would be lost in a Markdown table, so the HTML is kept as it is
+EMBEDDED_TAGS = frozenset(
+    ("img", "svg", "iframe", "video", "audio", "canvas", "object", "embed", "form")
+)
+
+
+class TableLimits(NamedTuple):
+    """Settings for rendering HTML tables as Markdown tables."""
+
+    # Maximum number of body rows kept per table (0 is unlimited)
+    max_rows: int = 0
+    # Maximum number of columns kept per table (0 is unlimited)
+    max_columns: int = 0
+
+
+class Table:
+    """Cells of one HTML table, capped to the configured size."""
+
+    def __init__(self) -> None:
+        """
+        Constructor method of the Table class.
+        """
+        self.header_rows: List[List[str]] = []
+        self.rows: List[List[str]] = []
+        # Sizes before capping
+        self.total_rows: int = 0
+        self.total_columns: int = 0
+
+
+class HTMLTableParser(HTMLParser):
+    """Streaming parser collecting the tables of an HTML output."""
+
+    def __init__(self, limits: TableLimits) -> None:
+        """
+        Constructor method of the HTMLTableParser class.
+
+        Args:
+            limits: Maximum size of the collected tables
+        """
+        super().__init__(convert_charrefs=True)
+        self.max_rows: int = limits.max_rows or UNLIMITED
+        self.max_columns: int = limits.max_columns or UNLIMITED
+        self.tables: List[Table] = []
+        # Text outside of tables, e.g. the "5 rows × 3 columns" note of pandas
+        self.text: List[str] = []
+        # False when the HTML cannot be represented as Markdown tables
+        self.supported: bool = True
+
+        self._hidden_depth = 0
+        self._table: Optional[Table] = None
+        self._in_head = False
+        self._row: Optional[List[str]] = None
+        self._row_width = 0
+        self._row_has_data = False
+        # Columns covered by cells of previous rows mapped to the rows left to cover
+        self._row_spans: Dict[int, int] = {}
+        self._cell: Optional[List[str]] = None
+        self._cell_span: Tuple[int, int] = (1, 1)
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag in HIDDEN_TAGS:
+            self._hidden_depth += 1
+        elif tag in EMBEDDED_TAGS:
+            self.supported = False
+        elif tag == "table":
+            if self._table is not None:
+                # Nested tables have no Markdown equivalent
+                self.supported = False
+            self._table = Table()
+            self._row_spans = {}
+        elif self._table is None:
+            return
+        elif tag == "thead":
+            self._in_head = True
+        elif tag in ("tbody", "tfoot"):
+            self._in_head = False
+        elif tag == "tr":
+            self._row = []
+            self._row_width = 0
+            self._row_has_data = False
+        elif tag in ("th", "td") and self._row is not None:
+            self._cell = []
+            self._cell_span = (_span(attrs, "colspan"), _span(attrs, "rowspan"))
+            self._row_has_data = self._row_has_data or tag == "td"
+        elif tag == "br" and self._cell is not None:
+            self._cell.append(" ")
+
+    def handle_endtag(self, tag: str) -> None:
+        if tag in HIDDEN_TAGS:
+            self._hidden_depth = max(self._hidden_depth - 1, 0)
+        elif self._table is None:
+            return
+        elif tag in ("th", "td") and self._cell is not None:
+            self._end_cell()
+        elif tag == "tr" and self._row is not None:
+            self._end_row()
+        elif tag == "thead":
+            self._in_head = False
+        elif tag == "table":
+            if self._cell is not None:
+                self._end_cell()
+            if self._row is not None:
+                self._end_row()
+            self.tables.append(self._table)
+            self._table = None
+
+    def handle_data(self, data: str) -> None:
+        if self._hidden_depth:
+            return
+        if self._cell is not None:
+            self._cell.append(data)
+        elif self._table is None:
+            self.text.append(data)
+
+    def _add_column(self, text: str) -> None:
+        if self._row_width < self.max_columns:
+            self._row.append(text)
+        self._row_width += 1
+
+    def _fill_row_spans(self) -> None:
+        # Cells spanning several rows leave empty cells in the following rows
+        while self._row_spans.get(self._row_width):
+            column = self._row_width
+            self._row_spans[column] -= 1
+            if not self._row_spans[column]:
+                del self._row_spans[column]
+            self._add_column("")
+
+    def _end_cell(self) -> None:
+        self._fill_row_spans()
+        text = " ".join("".join(self._cell).split()).replace("|", "\\|")
+        columns, rows = self._cell_span
+        for offset in range(columns):
+            if rows > 1:
+                self._row_spans[self._row_width] = rows - 1
+            self._add_column(text if offset == 0 else "")
+        self._cell = None
+
+    def _end_row(self) -> None:
+        if self._cell is not None:
+            self._end_cell()
+        while self._row_spans and max(self._row_spans) >= self._row_width:
+            if self._row_width in self._row_spans:
+                self._fill_row_spans()
+            else:
+                self._add_column("")
+
+        table = self._table
+        table.total_columns = max(table.total_columns, self._row_width)
+        # Rows of header cells before any data form the header
+        if self._in_head or (not self._row_has_data and not table.rows):
+            table.header_rows.append(self._row)
+        else:
+            table.total_rows += 1
+            if len(table.rows) < self.max_rows:
+                table.rows.append(self._row)
+        self._row = None
+
+
+def _span(attrs: List[Tuple[str, Optional[str]]], name: str) -> int:
+    """
+    Reads a colspan or rowspan attribute.
+
+    Args:
+        attrs: Attributes of the cell
+        name: Attribute name
+
+    Returns:
+        int: Number of columns or rows covered by the cell
+    """
+    for key, value in attrs:
+        if key == name and value and value.strip().isdigit():
+            return max(int(value), 1)
+    return 1
+
+
+def parse_html_tables(
+    html: Union[str, Iterable[str]], limits: TableLimits
+) -> Optional[HTMLTableParser]:
+    """
+    Parses an HTML output that consists of tables, feeding it chunk by chunk.
+
+    Args:
+        html: HTML as a string or a list of lines
+        limits: Maximum size of the collected tables
+
+    Returns:
+        Optional[HTMLTableParser]: Parser holding the tables, or None if the HTML cannot
+        be represented as Markdown tables
+    """
+    parser = HTMLTableParser(limits)
+    for chunk in [html] if isinstance(html, str) else html:
+        parser.feed(chunk)
+    parser.close()
+
+    if not parser.supported or not parser.tables:
+        return None
+    if not any(table.header_rows or table.rows for table in parser.tables):
+        return None
+    return parser
+
+
+def _write_row(write: Callable[[str], None], cells: List[str], width: int) -> None:
+    write("| " + " | ".join(cells + [""] * (width - len(cells))) + " |\n")
+
+
+def write_markdown_tables(
+    parser: HTMLTableParser, write: Callable[[str], None]
+) -> None:
+    """
+    Writes the parsed tables as GitHub Flavored Markdown pipe tables.
+
+    Args:
+        parser: Result of parse_html_tables
+        write: Function receiving the Markdown fragments
+    """
+    for table in parser.tables:
+        width = min(table.total_columns, parser.max_columns)
+        truncated_columns = table.total_columns > width
+        columns = width + 1 if truncated_columns else width
+        ellipsis = ["..."] if truncated_columns else []
+
+        rows = table.rows
+        header_rows = table.header_rows
+        if not header_rows:
+            # Pipe tables need a header; use the first row
+            header_rows, rows = rows[:1], rows[1:]
+
+        # Stacked header rows (e.g. pandas column and index names) are merged
+        header = [
+            " ".join(
+                row[column] for row in header_rows if column < len(row) and row[column]
+            )
+            for column in range(width)
+        ]
+        _write_row(write, header + ellipsis, columns)
+        write("|" + " --- |" * columns + "\n")
+
+        for row in rows:
+            _write_row(write, row + [""] * (width - len(row)) + ellipsis, columns)
+        if table.total_rows > len(table.rows):
+            _write_row(write, ["..."] * columns, columns)
+        write("\n")
+
+    note = " ".join("".join(parser.text).split())
+    if note:
+        write(f"{note}\n\n")
@@ -1,4 +1,66 @@
 import argparse
+from typing import Tuple
+
+from .constants import DEFAULT_DISPLAY_PRIORITY, OUTPUT_FORMATS
+
+
+def parse_mime_types(value: str) -> Tuple[str, ...]:
+    """
+    Parses a comma-separated list of MIME types.
+
+    Args:
+        value: Command line value
+
+    Returns:
+        Tuple[str, ...]: MIME types in the given order
+    """
+    mime_types = tuple(part.strip() for part in value.split(",") if part.strip())
+    if not mime_types:
+        raise argparse.ArgumentTypeError("expected at least one MIME type")
+    for mime_type in mime_types:
+        if "/" not in mime_type:
+            raise argparse.ArgumentTypeError(
+                f"{mime_type!r} is not a MIME type, e.g. image/png"
+            )
+    return mime_types
+
+
+def parse_formats(value: str) -> Tuple[str, ...]:
+    """
+    Parses a comma-separated list of output formats.
+
+    Args:
+        value: Command line value
+
+    Returns:
+        Tuple[str, ...]: Format names in the given order, without duplicates
+    """
+    formats = tuple(
+        dict.fromkeys(part.strip().lower() for part in value.split(",") if part.strip())
+    )
+    if not formats:
+        raise argparse.ArgumentTypeError("expected at least one format")
+    return formats
+
+
+def parse_shard(value: str) -> Tuple[int, int]:
+    """
+    Parses a shard given as i/N.
+
+    Args:
+        value: Command line value
+
+    Returns:
+        Tuple[int, int]: Shard number (from 1 to N) and number of shards
+    """
+    index, _, count = value.partition("/")
+    try:
+        shard = (int(index), int(count))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, e.g. 2/4, got {value!r}")
+    if not 1 <= shard[0] <= shard[1]:
+        raise argparse.ArgumentTypeError(f"shard {value} is not between 1/N and N/N")
+    return shard
 
 
 def setup_argparser() -> argparse.ArgumentParser:
@@ -12,12 +74,212 @@ def setup_argparser() -> argparse.ArgumentParser:
         description="Converts Jupyter Notebook (.ipynb) files to Markdown (.md) files."
     )
 
-    parser.add_argument("input_file", help="Path to .ipynb file to convert")
+    parser.add_argument(
+        "input_files",
+        nargs="+",
+        metavar="input",
+        help="Paths, directories or glob patterns of .ipynb files to convert",
+    )
 
     parser.add_argument(
         "-o",
         "--output",
-        help="Path to the output Markdown file (if not specified, a .md file with the same name will be created)",
+        help="Path to the output Markdown file (if not specified, a .md file with the same name will be created). Only valid with a single notebook",
+    )
+
+    parser.add_argument(
+        "-j",
+        "--jobs",
+        type=int,
+        default=1,
+        help="Number of worker processes used to convert notebooks in parallel (0 uses every CPU, default: 1)",
+    )
+
+    parser.add_argument(
+        "--manifest",
+        help="Path to a manifest file used for incremental rebuilds; unchanged notebooks are skipped",
+    )
+
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        metavar="I/N",
+        help="Only convert the I-th of N shards of the notebooks (1 <= I <= N), split by the hash of their paths, e.g. one per CI runner",
+    )
+
+    parser.add_argument(
+        "--report",
+        metavar="PATH",
+        help="Write a JSON report of the converted files, images, timings and failures",
+    )
+
+    parser.add_argument(
+        "--merge-reports",
+        action="store_true",
+        help="Treat the inputs as --report files of shards, print their combined summary and write it to --report",
+    )
+
+    parser.add_argument(
+        "--stream",
+        action="store_true",
+        help="Convert cells while reading the notebook to keep memory usage bounded by the largest cell",
+    )
+
+    parser.add_argument(
+        "--image-workers",
+        type=int,
+        default=0,
+        help="Number of threads decoding and writing images in the background (default: 0, write them inline)",
+    )
+
+    parser.add_argument(
+        "--image-store",
+        help="Shared directory where each distinct image is written once under its content hash and referenced from every Markdown file",
+    )
+
+    parser.add_argument(
+        "--optimize-images",
+        action="store_true",
+        help="Re-encode extracted images to smaller files without metadata (requires Pillow)",
+    )
+
+    parser.add_argument(
+        "--image-max-width",
+        type=int,
+        default=0,
+        help="Scale down images wider than this many pixels (requires Pillow, default: 0, keep the size)",
+    )
+
+    parser.add_argument(
+        "--image-format",
+        choices=OUTPUT_FORMATS,
+        help="Convert raster images to this format (requires Pillow)",
+    )
+
+    parser.add_argument(
+        "--image-quality",
+        type=int,
+        default=80,
+        help="Quality of re-encoded WebP and JPEG images (default: 80)",
+    )
+
+    parser.add_argument(
+        "--image-cache",
+        help="Directory caching optimised images between runs (default: ~/.cache/ipynb2md/images)",
+    )
+
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Print a per-stage timing breakdown after the conversion",
+    )
+
+    parser.add_argument(
+        "--max-output-lines",
+        type=int,
+        default=0,
+        help="Keep only the first and last lines of longer stream, text and traceback outputs (default: 0, unlimited)",
+    )
+
+    parser.add_argument(
+        "--max-output-bytes",
+        type=int,
+        default=0,
+        help="Keep only the first and last bytes of larger text outputs (default: 0, unlimited)",
+    )
+
+    parser.add_argument(
+        "--max-cell-lines",
+        type=int,
+        default=0,
+        help="Limit the number of text output lines of a whole cell (default: 0, unlimited)",
+    )
+
+    parser.add_argument(
+        "--max-cell-bytes",
+        type=int,
+        default=0,
+        help="Limit the size of the text outputs of a whole cell in bytes (default: 0, unlimited)",
+    )
+
+    parser.add_argument(
+        "--spill-outputs",
+        action="store_true",
+        help="Write the full text of truncated outputs to a file linked from the Markdown",
+    )
+
+    parser.add_argument(
+        "--raw-streams",
+        action="store_true",
+        help="Keep every stream output in its own block and keep progress bar updates, instead of merging them",
+    )
+
+    parser.add_argument(
+        "--html-tables",
+        action="store_true",
+        help="Render HTML tables (e.g. pandas DataFrames) as Markdown tables and drop their plain text copy",
+    )
+
+    parser.add_argument(
+        "--max-table-rows",
+        type=int,
+        default=0,
+        help="Maximum number of rows of a rendered table (default: 0, unlimited)",
+    )
+
+    parser.add_argument(
+        "--max-table-columns",
+        type=int,
+        default=0,
+        help="Maximum number of columns of a rendered table (default: 0, unlimited)",
+    )
+
+    parser.add_argument(
+        "--best-display",
+        action="store_const",
+        dest="display_priority",
+        const=DEFAULT_DISPLAY_PRIORITY,
+        help="Write only the best representation of each output: images, then Markdown, HTML, LaTeX and plain text",
+    )
+
+    parser.add_argument(
+        "--display-priority",
+        type=parse_mime_types,
+        metavar="MIME,...",
+        help="Like --best-display, with this comma-separated MIME type order",
+    )
+
+    parser.add_argument(
+        "--formats",
+        type=parse_formats,
+        default=("markdown",),
+        metavar="FORMAT,...",
+        help="Comma-separated output formats written in one pass: markdown, html, text, jsonl, index (default: markdown). The other formats replace the suffix of the Markdown file",
+    )
+
+    parser.add_argument(
+        "--index-chunk-size",
+        type=int,
+        default=2000,
+        help="Maximum number of characters of a record of the search index format (default: 2000, 0 is unlimited)",
+    )
+
+    parser.add_argument(
+        "--deterministic",
+        action="store_true",
+        help="Name images by their content and only rewrite output files whose contents changed, for reproducible builds",
+    )
+
+    parser.add_argument(
+        "--normalize-volatile",
+        action="store_true",
+        help="Replace memory addresses in outputs (e.g. <Figure at 0x7f...>) with 0x0",
+    )
+
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="Keep running and reconvert notebooks as soon as they are saved (stop with Ctrl+C)",
     )
 
     return parser
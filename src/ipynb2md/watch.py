@@ -0,0 +1,430 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from .batch import GLOB_CHARACTERS, ConversionResult, convert_files, discover_notebooks
+from .manifest import Manifest
+from .options import ConversionOptions
+
+# inotify event masks, see inotify(7)
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_Q_OVERFLOW = 0x00004000
+IN_ISDIR = 0x40000000
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_CREATE
+
+EVENT_HEADER = struct.Struct("iIII")
+
+
+def is_notebook(path: Path) -> bool:
+    """
+    Checks whether a path is a notebook that should be converted.
+
+    Args:
+        path: Path to check
+
+    Returns:
+        bool: True for .ipynb files outside Jupyter checkpoint directories
+    """
+    return path.suffix == ".ipynb" and ".ipynb_checkpoints" not in path.parts
+
+
+def glob_base(pattern: Path) -> Path:
+    """
+    Finds the directory below which a glob pattern matches.
+
+    Args:
+        pattern: Glob pattern, e.g. docs/**/*.ipynb
+
+    Returns:
+        Path: Leading part of the pattern without glob characters, e.g. docs
+    """
+    parts: List[str] = []
+    for part in pattern.parts:
+        if any(char in part for char in GLOB_CHARACTERS):
+            break
+        parts.append(part)
+    return Path(*parts) if parts else Path(".")
+
+
+def _match_parts(parts: Tuple[str, ...], pattern: Tuple[str, ...]) -> bool:
+    """
+    Matches path components against glob components, like glob.glob(recursive=True).
+
+    Args:
+        parts: Components of the path
+        pattern: Components of the pattern; * never crosses a separator and ** matches
+            any number of directories
+
+    Returns:
+        bool: True if the path matches the pattern
+    """
+    if not pattern:
+        return not parts
+    if pattern[0] == "**":
+        return any(
+            _match_parts(parts[index:], pattern[1:]) for index in range(len(parts) + 1)
+        )
+    return (
+        bool(parts)
+        and fnmatchcase(parts[0], pattern[0])
+        and _match_parts(parts[1:], pattern[1:])
+    )
+
+
+def matches_glob(path: Path, pattern: Path) -> bool:
+    """
+    Checks whether a notebook is one discover_notebooks finds for a glob pattern.
+
+    Args:
+        path: Notebook path, relative to the same directory as the pattern
+        pattern: Glob pattern
+
+    Returns:
+        bool: True if the path or one of its directories matches the pattern
+    """
+    pattern_parts = Path(os.path.normpath(str(pattern))).parts
+    return any(
+        _match_parts(Path(os.path.normpath(str(candidate))).parts, pattern_parts)
+        for candidate in (path, *path.parents)
+    )
+
+
+class PollingWatcher:
+    """Detects changed notebooks by comparing modification times."""
+
+    def __init__(self, roots: List[Path], interval: float = 0.5) -> None:
+        """
+        Constructor method of the PollingWatcher class.
+
+        Args:
+            roots: Directories, notebook files or glob patterns to watch
+            interval: Seconds between two scans
+        """
+        self.roots: List[Path] = roots
+        self.interval: float = interval
+        self._snapshot: Dict[Path, Tuple[int, int]] = self._scan()
+
+    def _scan(self) -> Dict[Path, Tuple[int, int]]:
+        """
+        Records the modification time and size of every watched notebook.
+
+        Returns:
+            Dict[Path, Tuple[int, int]]: Notebook paths mapped to (mtime_ns, size)
+        """
+        snapshot: Dict[Path, Tuple[int, int]] = {}
+        for notebook in discover_notebooks(str(root) for root in self.roots):
+            try:
+                stat = notebook.stat()
+            except OSError:
+                continue
+            snapshot[notebook] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout: float) -> Set[Path]:
+        """
+        Waits for changes.
+
+        Args:
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            Set[Path]: Notebooks created or modified since the previous call
+        """
+        time.sleep(min(timeout, self.interval))
+        snapshot = self._scan()
+        changed = {
+            path
+            for path, signature in snapshot.items()
+            if self._snapshot.get(path) != signature
+        }
+        self._snapshot = snapshot
+        return changed
+
+    def close(self) -> None:
+        """
+        Releases the resources of the watcher.
+        """
+
+
+class InotifyWatcher:
+    """Detects changed notebooks with the Linux inotify API."""
+
+    def __init__(self, roots: List[Path]) -> None:
+        """
+        Constructor method of the InotifyWatcher class.
+
+        Args:
+            roots: Directories, notebook files or glob patterns to watch
+
+        Raises:
+            OSError: If inotify is not available
+        """
+        libc_name = ctypes.util.find_library("c") or "libc.so.6"
+        self._libc = ctypes.CDLL(libc_name, use_errno=True)
+        self._fd: int = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+        self.roots: List[Path] = roots
+        self._directories: Dict[int, Path] = {}
+        # Notebooks given explicitly; None means every notebook below the directory
+        self._files: Dict[Path, Optional[Set[str]]] = {}
+        # Glob patterns by the directory watched for them
+        self._patterns: Dict[Path, Set[Path]] = {}
+
+        for root in roots:
+            if any(char in str(root) for char in GLOB_CHARACTERS):
+                base = glob_base(root)
+                self._patterns.setdefault(base, set()).add(root)
+                if base.is_dir():
+                    self._add_tree(base)
+            elif root.is_dir():
+                self._files[root] = None
+                self._add_tree(root)
+            else:
+                directory = root.parent if str(root.parent) else Path(".")
+                names = self._files.setdefault(directory, set())
+                if names is not None:
+                    names.add(root.name)
+                self._add_watch(directory)
+
+    def _add_watch(self, directory: Path) -> None:
+        watch = self._libc.inotify_add_watch(
+            self._fd, os.fsencode(str(directory)), WATCH_MASK
+        )
+        if watch >= 0:
+            self._directories[watch] = directory
+
+    def _add_tree(self, directory: Path) -> None:
+        if ".ipynb_checkpoints" in directory.parts:
+            return
+        self._add_watch(directory)
+        for path in directory.rglob("*"):
+            if path.is_dir() and ".ipynb_checkpoints" not in path.parts:
+                self._add_watch(path)
+
+    def _in_tree(self, directory: Path) -> bool:
+        trees = [root for root, names in self._files.items() if names is None]
+        trees.extend(self._patterns)
+        return any(root == directory or root in directory.parents for root in trees)
+
+    def _is_watched(self, path: Path) -> bool:
+        names = self._files.get(path.parent)
+        if names is not None and path.name in names:
+            return True
+        if any(
+            names is None and (root == path.parent or root in path.parents)
+            for root, names in self._files.items()
+        ):
+            return True
+        return any(
+            matches_glob(path, pattern)
+            for base, patterns in self._patterns.items()
+            if base in path.parents
+            for pattern in patterns
+        )
+
+    def wait(self, timeout: float) -> Set[Path]:
+        """
+        Waits for changes.
+
+        Args:
+            timeout: Maximum number of seconds to wait
+
+        Returns:
+            Set[Path]: Notebooks created or modified since the previous call
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return set()
+
+        try:
+            data = os.read(self._fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: Set[Path] = set()
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            watch, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = data[offset : offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, fall back to a full scan
+                return set(discover_notebooks(str(root) for root in self.roots))
+
+            directory = self._directories.get(watch)
+            if directory is None or not name:
+                continue
+
+            path = directory / os.fsdecode(name)
+            if mask & IN_ISDIR:
+                # Watch new subdirectories and pick up notebooks moved in with them
+                if mask & (IN_CREATE | IN_MOVED_TO) and self._in_tree(path):
+                    self._add_tree(path)
+                    changed.update(
+                        p
+                        for p in path.rglob("*.ipynb")
+                        if is_notebook(p) and self._is_watched(p)
+                    )
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                if is_notebook(path) and self._is_watched(path):
+                    changed.add(path)
+
+        return changed
+
+    def close(self) -> None:
+        """
+        Releases the inotify file descriptor.
+        """
+        if self._fd >= 0:
+            os.close(self._fd)
+            self._fd = -1
+
+
+def create_watcher(roots: List[Path], poll_interval: float = 0.5):
+    """
+    Creates the most efficient watcher available on this platform.
+
+    Args:
+        roots: Directories, notebook files or glob patterns to watch
+        poll_interval: Seconds between two scans when polling
+
+    Returns:
+        InotifyWatcher or PollingWatcher: Watcher instance
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(roots)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(roots, poll_interval)
+
+
+class Debouncer:
+    """Collects changed paths until no new change arrived for a quiet period."""
+
+    def __init__(self, delay: float) -> None:
+        """
+        Constructor method of the Debouncer class.
+
+        Args:
+            delay: Seconds without changes before the pending paths are released
+        """
+        self.delay: float = delay
+        self._pending: Dict[Path, None] = {}
+        self._last_change: float = 0.0
+
+    def add(self, paths: Iterable[Path], now: float) -> None:
+        """
+        Records changed paths.
+
+        Args:
+            paths: Changed paths
+            now: Current monotonic time
+        """
+        for path in paths:
+            self._pending[path] = None
+            self._last_change = now
+
+    def ready(self, now: float) -> List[Path]:
+        """
+        Releases the pending paths once the quiet period has passed.
+
+        Args:
+            now: Current monotonic time
+
+        Returns:
+            List[Path]: Paths to process, in the order they first changed
+        """
+        if not self._pending or now - self._last_change < self.delay:
+            return []
+        paths = list(self._pending)
+        self._pending.clear()
+        return paths
+
+    def timeout(self, now: float, idle: float) -> float:
+        """
+        Computes how long to wait for the next change.
+
+        Args:
+            now: Current monotonic time
+            idle: Timeout to use when nothing is pending
+
+        Returns:
+            float: Seconds to wait
+        """
+        if not self._pending:
+            return idle
+        return max(self.delay - (now - self._last_change), 0.0)
+
+
+def watch(
+    paths: List[str],
+    options: ConversionOptions,
+    manifest: Manifest,
+    on_result: Optional[Callable[[ConversionResult], None]] = None,
+    output_file: Optional[str] = None,
+    debounce: float = 0.1,
+    poll_interval: float = 0.5,
+    stop: Optional[threading.Event] = None,
+) -> None:
+    """
+    Converts the notebooks and keeps converting those that change until stopped.
+
+    The process stays alive between conversions, so compiled patterns, the image hashes
+    of the manifest and the imported modules are reused for every change.
+
+    Args:
+        paths: Directories, notebook files or glob patterns to watch
+        options: Conversion settings
+        manifest: Skips unchanged notebooks and images; saved after each batch if it has a path
+        on_result: Callback invoked for each converted notebook
+        output_file: Output path, only meaningful for a single notebook
+        debounce: Seconds without further changes before converting
+        poll_interval: Seconds between two scans when inotify is not available
+        stop: Event that ends the loop when set
+    """
+    roots = [Path(path) for path in paths]
+    stop = stop if stop is not None else threading.Event()
+
+    def convert(notebooks: List[Path]) -> None:
+        convert_files(
+            notebooks,
+            output_file=output_file,
+            on_result=on_result,
+            manifest=manifest,
+            options=options,
+        )
+        manifest.prune()
+        manifest.save()
+
+    watcher = create_watcher(roots, poll_interval)
+    try:
+        convert(discover_notebooks(paths))
+
+        debouncer = Debouncer(debounce)
+        while not stop.is_set():
+            now = time.monotonic()
+            changed = watcher.wait(debouncer.timeout(now, idle=poll_interval))
+            now = time.monotonic()
+            debouncer.add((path for path in changed if path.exists()), now)
+
+            notebooks = debouncer.ready(now)
+            if notebooks:
+                convert(notebooks)
+    finally:
+        watcher.close()
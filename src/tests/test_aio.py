@@ -0,0 +1,65 @@
+import unittest
+import asyncio
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.aio import AsyncConverter
+
+NOTEBOOK = {
+    "cells": [{"cell_type": "markdown", "source": ["# Report\n"], "metadata": {}}],
+    "metadata": {},
+}
+
+
+class TestAsyncConverter(unittest.TestCase):
+    def test_convert(self):
+        async def convert_all():
+            converter = AsyncConverter(max_concurrency=2)
+            data = json.dumps(NOTEBOOK).encode()
+            return await asyncio.gather(
+                *(converter.convert(data, f"report {idx}") for idx in range(5))
+            )
+
+        results = asyncio.run(convert_all())
+        self.assertEqual([result.title for result in results], ["Report"] * 5)
+
+    def test_convert_file(self):
+        with TemporaryDirectory() as temp_dir:
+            path = Path(temp_dir) / "report.ipynb"
+            path.write_text(json.dumps(NOTEBOOK))
+
+            result = asyncio.run(AsyncConverter().convert_file(str(path)))
+            self.assertTrue(result.success)
+            self.assertIn("# Report", path.with_suffix(".md").read_text())
+
+    def test_large_notebooks_leave_room_for_small_ones(self):
+        async def scenario():
+            converter = AsyncConverter(max_concurrency=2, max_large=2, large_size=10)
+            entered = []
+
+            async def enter(size):
+                async with converter._slot(size):
+                    entered.append(size)
+
+            async with converter._slot(100):
+                large = asyncio.ensure_future(enter(200))
+                small = asyncio.ensure_future(enter(1))
+                await asyncio.wait_for(small, 1)
+                await asyncio.sleep(0.01)
+                # max_large is capped to keep one slot for small notebooks
+                self.assertFalse(large.done())
+            await asyncio.wait_for(large, 1)
+            return entered
+
+        self.assertEqual(asyncio.run(scenario()), [1, 200])
+
+    def test_single_slot_is_rejected(self):
+        with self.assertRaises(ValueError):
+            AsyncConverter(max_concurrency=1)
+        # The smallest pool keeps one slot for each lane
+        self.assertEqual(AsyncConverter(max_concurrency=2, max_large=5).max_large, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+import base64
+import hashlib
+import io
+import json
+import os
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.api import convert_notebook
+from src.ipynb2md.options import ConversionOptions
+
+IMAGE = base64.b64encode(b"image").decode()
+
+
+def make_notebook():
+    return {
+        "cells": [
+            {"cell_type": "markdown", "source": ["# Report\n"], "metadata": {}},
+            {
+                "cell_type": "code",
+                "source": ["plot()"],
+                "metadata": {},
+                "outputs": [
+                    {"output_type": "stream", "name": "stdout", "text": "a\nb\nc\nd\n"},
+                    {"output_type": "display_data", "data": {"image/png": IMAGE}},
+                ],
+            },
+        ],
+        "metadata": {},
+    }
+
+
+class TestConvertNotebook(unittest.TestCase):
+    def setUp(self):
+        # Conversions must not create anything in the working directory
+        self.temp_dir = TemporaryDirectory()
+        self.previous_dir = os.getcwd()
+        os.chdir(self.temp_dir.name)
+
+    def tearDown(self):
+        os.chdir(self.previous_dir)
+        self.temp_dir.cleanup()
+
+    def test_sources(self):
+        notebook = make_notebook()
+        data = json.dumps(notebook).encode()
+        for source in (notebook, data, io.BytesIO(data), io.StringIO(data.decode())):
+            result = convert_notebook(source, name="report")
+            self.assertEqual(result.title, "Report")
+            self.assertIn("](report_images/cell_2_image_1.png)", result.markdown)
+            self.assertEqual(
+                result.files, {"report_images/cell_2_image_1.png": b"image"}
+            )
+
+        # The caller's notebook keeps its payloads
+        self.assertEqual(notebook["cells"][1]["outputs"][1]["data"]["image/png"], IMAGE)
+        self.assertEqual(os.listdir("."), [])
+
+    def test_sinks(self):
+        fragments = []
+        files = {}
+        options = ConversionOptions(max_output_lines=2, spill_outputs=True)
+        result = convert_notebook(
+            make_notebook(),
+            options=options,
+            write=fragments.append,
+            sink=files.__setitem__,
+        )
+
+        self.assertEqual((result.markdown, result.files), ("", {}))
+        self.assertIn("](notebook_images/cell_2_output_1.txt)", "".join(fragments))
+        self.assertEqual(files["notebook_images/cell_2_output_1.txt"], b"a\nb\nc\nd\n")
+        self.assertEqual(files["notebook_images/cell_2_image_1.png"], b"image")
+        self.assertEqual(os.listdir("."), [])
+
+    def test_deterministic_image_names(self):
+        notebook = make_notebook()
+        # The same image twice is stored once under its content hash
+        notebook["cells"][1]["outputs"].append(
+            {"output_type": "display_data", "data": {"image/png": IMAGE}}
+        )
+        digest = hashlib.sha256(IMAGE.encode("ascii")).hexdigest()[:32]
+        image_path = f"notebook_images/{digest}.png"
+
+        result = convert_notebook(
+            notebook, options=ConversionOptions(deterministic=True)
+        )
+        self.assertEqual(result.files, {image_path: b"image"})
+        self.assertEqual(result.markdown.count(f"]({image_path})"), 2)
+        self.assertEqual(os.listdir("."), [])
+
+    def test_unsupported_source(self):
+        with self.assertRaises(TypeError):
+            convert_notebook("notebook.ipynb")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,73 @@
+import unittest
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.batch import convert_files, discover_notebooks, shard_notebooks
+
+
+class TestBatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+        notebook_content = {
+            "cells": [
+                {
+                    "cell_type": "code",
+                    "source": ["print('Hello, World!')"],
+                    "metadata": {},
+                    "outputs": [],
+                }
+            ],
+            "metadata": {},
+        }
+        for relative in ["a.ipynb", "sub/b.ipynb", "sub/.ipynb_checkpoints/b.ipynb"]:
+            path = self.root / relative
+            path.parent.mkdir(parents=True, exist_ok=True)
+            with open(path, "w") as f:
+                json.dump(notebook_content, f)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_discover_directory_skips_checkpoints(self):
+        notebooks = discover_notebooks([str(self.root)])
+        self.assertEqual(
+            notebooks, [self.root / "a.ipynb", self.root / "sub" / "b.ipynb"]
+        )
+
+    def test_discover_glob_and_duplicates(self):
+        notebooks = discover_notebooks(
+            [str(self.root / "*.ipynb"), str(self.root / "a.ipynb")]
+        )
+        self.assertEqual(notebooks, [self.root / "a.ipynb"])
+
+    def test_shards_partition_notebooks(self):
+        notebooks = [Path(f"team_{i}/notebook.ipynb") for i in range(50)]
+        shards = [shard_notebooks(notebooks, index, 4) for index in range(1, 5)]
+
+        self.assertEqual(sorted(sum(shards, [])), sorted(notebooks))
+        self.assertTrue(all(shards))
+        # A notebook stays in its shard when others are added
+        self.assertEqual(
+            shard_notebooks(notebooks[:10], 2, 4),
+            [notebook for notebook in shards[1] if notebook in notebooks[:10]],
+        )
+
+    def test_convert_files_in_parallel(self):
+        notebooks = discover_notebooks([str(self.root)])
+        reported = []
+        results = convert_files(notebooks, jobs=2, on_result=reported.append)
+        self.assertEqual(len(results), 2)
+        self.assertEqual(len(reported), 2)
+        self.assertTrue(all(result.success for result in results))
+        self.assertTrue((self.root / "sub" / "b.md").exists())
+
+    def test_convert_files_reports_failure(self):
+        results = convert_files([self.root / "missing.ipynb"])
+        self.assertFalse(results[0].success)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,162 @@
+import unittest
+import base64
+import importlib.util
+import io
+import json
+from contextlib import redirect_stderr
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from types import SimpleNamespace
+
+from src.ipynb2md.image_optimizer import (
+    ImageOptimizer,
+    create_image_optimizer,
+    sniff_extension,
+)
+from src.ipynb2md.images import ImageWriter, ThreadedImageWriter
+from src.ipynb2md.notebook_converter import NotebookConverter
+
+HAS_PILLOW = importlib.util.find_spec("PIL") is not None
+
+PNG_BYTES = base64.b64decode(
+    "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+)
+
+
+class CountingOptimizer(ImageOptimizer):
+    """Optimizer whose encoder only records how often it runs."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(SimpleNamespace(__name__="counting"), *args, **kwargs)
+        self.encoded = 0
+
+    def _encode(self, binary_data, extension):
+        self.encoded += 1
+        return b"optimised"
+
+
+class FailingOptimizer(CountingOptimizer):
+    """Optimizer whose encoder is missing."""
+
+    def _encode(self, binary_data, extension):
+        raise OSError("encoder webp not available")
+
+
+class TestImageOptimizer(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_sniff_extension(self):
+        self.assertEqual(sniff_extension(PNG_BYTES), "png")
+        self.assertEqual(sniff_extension(b"\xff\xd8\xff\xe0"), "jpg")
+        self.assertIsNone(sniff_extension(b"<svg/>"))
+
+    def test_cache_is_shared_between_runs(self):
+        first = CountingOptimizer(image_format="webp", cache_dir=str(self.root))
+        second = CountingOptimizer(image_format="webp", cache_dir=str(self.root))
+
+        self.assertEqual(first.optimize(PNG_BYTES), b"optimised")
+        self.assertEqual(second.optimize(PNG_BYTES), b"optimised")
+        self.assertEqual((first.encoded, second.encoded), (1, 0))
+        # Other settings never reuse the cached result
+        third = CountingOptimizer(image_format="png", cache_dir=str(self.root))
+        third.optimize(PNG_BYTES)
+        self.assertEqual(third.encoded, 1)
+
+    def test_writer_uses_converted_extension(self):
+        optimizer = CountingOptimizer(
+            image_format="webp", cache_dir=str(self.root / "cache")
+        )
+        writer = ImageWriter(optimizer=optimizer)
+        data = base64.b64encode(PNG_BYTES).decode("ascii")
+
+        path = writer.image_path(self.root, "cell_1_image_1.png", data, "png")
+        digest = writer.write_image(path, data)
+        writer.write_image(path, data, digest)
+
+        self.assertEqual(path.name, "cell_1_image_1.webp")
+        self.assertEqual(path.read_bytes(), b"optimised")
+        self.assertEqual(optimizer.encoded, 1)
+
+    def test_writer_keeps_extension_of_unconverted_images(self):
+        optimizer = CountingOptimizer(
+            image_format="webp", cache_dir=str(self.root / "cache")
+        )
+        writer = ImageWriter(optimizer=optimizer)
+        # A GIF embedded as image/png cannot be converted
+        data = base64.b64encode(b"GIF89a\x01\x00\x01\x00").decode("ascii")
+
+        path = writer.image_path(self.root, "cell_1_image_1.png", data, "png")
+        writer.write_image(path, data)
+
+        self.assertEqual(path.name, "cell_1_image_1.png")
+        self.assertEqual(path.read_bytes(), b"GIF89a\x01\x00\x01\x00")
+        self.assertEqual(optimizer.encoded, 0)
+
+    def test_failed_conversion_is_not_written(self):
+        optimizer = FailingOptimizer(
+            image_format="webp", cache_dir=str(self.root / "cache")
+        )
+        writer = ImageWriter(optimizer=optimizer)
+        data = base64.b64encode(PNG_BYTES).decode("ascii")
+
+        path = writer.image_path(self.root, "cell_1_image_1.png", data, "png")
+        self.assertEqual(path.name, "cell_1_image_1.webp")
+        # PNG bytes are never written to a .webp file
+        with self.assertRaises(ValueError):
+            writer.write_image(path, data)
+        self.assertFalse(path.exists())
+
+    def test_failed_conversion_is_dropped_by_every_writer(self):
+        notebook_path = self.root / "notebook.ipynb"
+        output = {
+            "output_type": "display_data",
+            "data": {"image/png": base64.b64encode(PNG_BYTES).decode("ascii")},
+        }
+        cell = {"cell_type": "code", "source": [], "metadata": {}, "outputs": [output]}
+        notebook_path.write_text(json.dumps({"cells": [cell], "metadata": {}}))
+
+        for writer_class, kwargs in (
+            (ImageWriter, {}),
+            (ThreadedImageWriter, {"max_workers": 2}),
+        ):
+            optimizer = FailingOptimizer(
+                image_format="webp", cache_dir=str(self.root / "cache")
+            )
+            with writer_class(optimizer=optimizer, **kwargs) as image_writer:
+                converter = NotebookConverter(
+                    str(notebook_path), image_writer=image_writer
+                )
+                converter.read_notebook()
+                with redirect_stderr(io.StringIO()) as stderr:
+                    success, _ = converter.save()
+
+            self.assertTrue(success)
+            self.assertIn("WARNING: The image could not be written", stderr.getvalue())
+            self.assertNotIn(".webp", notebook_path.with_suffix(".md").read_text())
+            self.assertFalse(
+                (self.root / "notebook_images" / "cell_1_image_1.webp").exists()
+            )
+
+    @unittest.skipIf(HAS_PILLOW, "Pillow is installed")
+    def test_missing_pillow_falls_back(self):
+        self.assertIsNone(create_image_optimizer(image_format="webp"))
+
+    @unittest.skipUnless(HAS_PILLOW, "Pillow is not installed")
+    def test_downscale(self):
+        from PIL import Image
+
+        source = io.BytesIO()
+        Image.new("RGB", (400, 200), "red").save(source, "PNG")
+        optimizer = create_image_optimizer(max_width=100, cache_dir=str(self.root))
+
+        with Image.open(io.BytesIO(optimizer.optimize(source.getvalue()))) as image:
+            self.assertEqual(image.size, (100, 50))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,175 @@
+import unittest
+import base64
+import json
+import threading
+import time
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.batch import convert_files
+from src.ipynb2md.images import (
+    ExtractedImage,
+    ImageWriter,
+    ThreadedImageWriter,
+    decode_base64_chunks,
+    iter_base64_text,
+)
+from src.ipynb2md.notebook_cell import NotebookCell
+from src.ipynb2md.options import ConversionOptions
+
+
+class TestImageWriter(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.image_dir = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_write_image(self):
+        digests = []
+        ImageWriter().submit(
+            self.image_dir / "a.png",
+            base64.b64encode(b"image").decode(),
+            None,
+            digests.append,
+        )
+        self.assertEqual((self.image_dir / "a.png").read_bytes(), b"image")
+        self.assertEqual(len(digests), 1)
+
+    def test_chunked_decoding(self):
+        binary_data = bytes(range(256)) * 5
+        payload = base64.b64encode(binary_data).decode()
+        lines = [payload[i : i + 76] + "\n" for i in range(0, len(payload), 76)]
+
+        for data in (payload, lines):
+            pieces = list(iter_base64_text(data, chunk_size=50))
+            self.assertGreater(len(pieces), 1)
+            self.assertTrue(all(len(piece) % 4 == 0 for piece in pieces))
+            self.assertEqual(b"".join(decode_base64_chunks(data)), binary_data)
+
+    def test_invalid_data_leaves_no_file(self):
+        with self.assertRaises(base64.binascii.Error):
+            ImageWriter().write_image(self.image_dir / "a.png", ["aW1n", "Z"])
+        self.assertFalse((self.image_dir / "a.png").exists())
+
+    def test_render_releases_payload(self):
+        output = {
+            "output_type": "display_data",
+            "data": {"image/png": [base64.b64encode(b"image").decode(), "\n"]},
+        }
+        cell_data = {"cell_type": "code", "source": [], "outputs": [output]}
+        cell = NotebookCell(cell_data, self.image_dir, 1)
+
+        markdown = cell.to_markdown()
+        image_path = self.image_dir / "cell_1_image_1.png"
+        self.assertEqual(output["data"]["image/png"], ExtractedImage(str(image_path)))
+        self.assertEqual(image_path.read_bytes(), b"image")
+        # Rendering again links the written image instead of writing another one
+        self.assertEqual(cell.to_markdown(), markdown)
+        self.assertEqual(len(list(self.image_dir.iterdir())), 1)
+
+    def test_threaded_writer_joins_all_images(self):
+        digests = []
+        with ThreadedImageWriter(max_workers=2, max_pending=1) as writer:
+            for idx in range(20):
+                writer.submit(
+                    self.image_dir / f"{idx}.png",
+                    base64.b64encode(f"image {idx}".encode()).decode(),
+                    None,
+                    digests.append,
+                )
+            writer.join()
+            self.assertEqual(len(digests), 20)
+
+        for idx in range(20):
+            self.assertEqual(
+                (self.image_dir / f"{idx}.png").read_bytes(), f"image {idx}".encode()
+            )
+
+    def test_threaded_writer_applies_back_pressure(self):
+        release = threading.Event()
+        writer = ThreadedImageWriter(max_workers=1, max_pending=1)
+        writer.submit(self.image_dir / "a.png", "", None, lambda _: release.wait())
+
+        def submit_second():
+            writer.submit(self.image_dir / "b.png", "", None, lambda _: None)
+
+        thread = threading.Thread(target=submit_second)
+        thread.start()
+        time.sleep(0.05)
+        # The second submit waits for a free slot
+        self.assertTrue(thread.is_alive())
+
+        release.set()
+        thread.join(timeout=5)
+        self.assertFalse(thread.is_alive())
+        writer.close()
+
+    def test_threaded_writer_counts_failures(self):
+        with ThreadedImageWriter(max_workers=1) as writer:
+            writer.submit(self.image_dir / "missing" / "a.png", "aW1n", None, print)
+            self.assertEqual(writer.join(), 1)
+            self.assertEqual(writer.failures, 1)
+            # Each failure is returned by one join only
+            self.assertEqual(writer.join(), 0)
+
+    def test_threaded_writer_reports_failed_images(self):
+        with ThreadedImageWriter(max_workers=1) as writer:
+            path = str(self.image_dir / "a.png")
+            writer.submit(Path(path), "not base64!", None, print)
+            writer.wait_for([path])
+            self.assertFalse(writer.pending([path]))
+            self.assertEqual(writer.failed_images([path]), {path})
+            # Failures left out of the output do not fail the conversion
+            self.assertEqual(writer.join(), 0)
+
+
+class TestContentAddressedImages(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_notebook(self, name, payloads):
+        outputs = [
+            {"output_type": "display_data", "data": {"image/png": payload}}
+            for payload in payloads
+        ]
+        notebook_content = {
+            "cells": [
+                {"cell_type": "code", "source": [], "metadata": {}, "outputs": outputs}
+            ],
+            "metadata": {},
+        }
+        path = self.root / "notebooks" / name
+        path.parent.mkdir(exist_ok=True)
+        with open(path, "w") as f:
+            json.dump(notebook_content, f)
+        return path
+
+    def test_identical_images_are_stored_once(self):
+        logo = base64.b64encode(b"logo").decode()
+        plot = base64.b64encode(b"plot").decode()
+        first = self.write_notebook("first.ipynb", [logo, logo, plot])
+        second = self.write_notebook("second.ipynb", [logo[:4] + "\n" + logo[4:]])
+
+        options = ConversionOptions(image_store=str(self.root / "store"))
+        results = convert_files([first, second], options=options)
+        self.assertTrue(all(result.success for result in results))
+
+        stored = sorted(path.name for path in (self.root / "store").iterdir())
+        self.assertEqual(len(stored), 2)
+
+        content = first.with_suffix(".md").read_text()
+        second_content = second.with_suffix(".md").read_text()
+        self.assertIn("../store/", content)
+        link = content.split("](")[1].split(")")[0]
+        self.assertIn(f"]({link})", second_content)
+        self.assertEqual((first.parent / link).read_bytes(), b"logo")
+
+
+if __name__ == "__main__":
+    unittest.main()
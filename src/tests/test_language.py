@@ -0,0 +1,41 @@
+import unittest
+from pathlib import Path
+
+from src.ipynb2md.language import (
+    detect_source_language,
+    language_from_kernelspec,
+    language_from_notebook_metadata,
+)
+from src.ipynb2md.notebook_cell import NotebookCell
+
+
+class TestLanguage(unittest.TestCase):
+    def test_language_from_kernelspec(self):
+        self.assertEqual(language_from_kernelspec({"language": "R"}), "r")
+        self.assertEqual(language_from_kernelspec({"name": "ir"}), "r")
+        self.assertEqual(language_from_kernelspec({"name": "julia-1.9"}), "julia")
+        self.assertEqual(language_from_kernelspec({}), "")
+
+    def test_language_from_notebook_metadata(self):
+        metadata = {"language_info": {"name": "Scala"}}
+        self.assertEqual(language_from_notebook_metadata(metadata), "scala")
+
+    def test_detect_source_language_priority(self):
+        # The python rule wins even if a lower priority rule matches first
+        self.assertEqual(
+            detect_source_language(["#include <stdio.h>\n", "import os\n"]), "python"
+        )
+        self.assertEqual(detect_source_language("SELECT * FROM users;"), "sql")
+        self.assertEqual(detect_source_language("SELECT * FROM users"), "")
+
+    def test_cell_uses_kernel_language_and_caches(self):
+        cell_data = {"cell_type": "code", "source": ["x <- 1"], "metadata": {}}
+        cell = NotebookCell(cell_data, Path("."), 1, kernel_language="r")
+        self.assertEqual(cell.detect_language(), "r")
+
+        cell.context.kernel_language = "julia"
+        self.assertEqual(cell.detect_language(), "r")
+
+
+if __name__ == "__main__":
+    unittest.main()
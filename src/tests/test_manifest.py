@@ -0,0 +1,154 @@
+import unittest
+import base64
+import hashlib
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+from unittest import mock
+
+from src.ipynb2md.batch import convert_files
+from src.ipynb2md.manifest import Manifest
+from src.ipynb2md.options import ConversionOptions
+from src.ipynb2md.notebook_cell import NotebookCell
+
+
+class TestManifest(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.notebook_path = self.root / "notebook.ipynb"
+        self.manifest_path = self.root / "manifest.json"
+        self.write_notebook(b"first_image")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_notebook(self, image_bytes):
+        notebook_content = {
+            "cells": [
+                {
+                    "cell_type": "code",
+                    "source": ["plot()"],
+                    "metadata": {},
+                    "outputs": [
+                        {
+                            "output_type": "display_data",
+                            "data": {
+                                "image/png": base64.b64encode(image_bytes).decode()
+                            },
+                        }
+                    ],
+                }
+            ],
+            "metadata": {},
+        }
+        with open(self.notebook_path, "w") as f:
+            json.dump(notebook_content, f)
+
+    def convert(self):
+        manifest = Manifest(str(self.manifest_path))
+        manifest.load()
+        results = convert_files([self.notebook_path], manifest=manifest)
+        manifest.save()
+        return results[0]
+
+    def test_save_and_load(self):
+        manifest = Manifest(str(self.manifest_path))
+        manifest.update(str(self.notebook_path), "abc", {}, "out.md", {"a.png": "1"})
+        manifest.save()
+
+        loaded = Manifest(str(self.manifest_path))
+        self.assertTrue(loaded.load())
+        self.assertEqual(loaded.get(str(self.notebook_path))["digest"], "abc")
+
+    def test_unchanged_notebook_is_skipped(self):
+        first = self.convert()
+        self.assertTrue(first.success)
+        self.assertFalse(first.skipped)
+
+        second = self.convert()
+        self.assertTrue(second.success)
+        self.assertTrue(second.skipped)
+
+        self.write_notebook(b"second_image")
+        third = self.convert()
+        self.assertFalse(third.skipped)
+
+    def test_deleted_output_is_rebuilt(self):
+        self.convert()
+        self.notebook_path.with_suffix(".md").unlink()
+        self.assertFalse(self.convert().skipped)
+
+    def test_new_version_is_rebuilt(self):
+        self.convert()
+        self.assertTrue(self.convert().skipped)
+
+        with mock.patch("src.ipynb2md.manifest.package_version", return_value="99.0.0"):
+            self.assertFalse(self.convert().skipped)
+
+    def test_deleted_notebook_is_pruned(self):
+        self.convert()
+        image_dir = self.root / "notebook_images"
+        self.assertTrue(any(image_dir.iterdir()))
+
+        self.notebook_path.unlink()
+        manifest = Manifest(str(self.manifest_path))
+        manifest.load()
+        self.assertEqual(manifest.prune(), [Manifest.key(str(self.notebook_path))])
+        self.assertEqual(manifest.entries, {})
+        self.assertFalse(image_dir.exists())
+
+    def test_prune_keeps_shared_store_images(self):
+        other_path = self.root / "other.ipynb"
+        other_path.write_bytes(self.notebook_path.read_bytes())
+        options = ConversionOptions(image_store=str(self.root / "store"))
+
+        def convert(notebooks):
+            manifest = Manifest(str(self.manifest_path))
+            manifest.load()
+            results = convert_files(notebooks, manifest=manifest, options=options)
+            manifest.prune()
+            manifest.save()
+            return results
+
+        convert([self.notebook_path, other_path])
+        stored = list((self.root / "store").iterdir())
+        self.assertEqual(len(stored), 1)
+
+        self.notebook_path.unlink()
+        result = convert([other_path])[0]
+        self.assertTrue(result.skipped)
+        self.assertTrue(stored[0].exists())
+
+    def test_replaced_deterministic_image_is_removed(self):
+        manifest = Manifest(str(self.manifest_path))
+        options = ConversionOptions(deterministic=True)
+        image_dir = self.root / "notebook_images"
+
+        convert_files([self.notebook_path], manifest=manifest, options=options)
+        first = set(image_dir.iterdir())
+        self.write_notebook(b"second_image")
+        convert_files([self.notebook_path], manifest=manifest, options=options)
+        second = set(image_dir.iterdir())
+
+        self.assertEqual(len(first), 1)
+        self.assertEqual(len(second), 1)
+        self.assertNotEqual(first, second)
+
+    def test_unchanged_image_is_not_rewritten(self):
+        image_dir = self.root / "images"
+        image_dir.mkdir()
+        image_path = image_dir / "cell_1_image_1.png"
+        image_path.write_bytes(b"sentinel")
+
+        cell_data = {"cell_type": "code", "source": [], "metadata": {}, "outputs": []}
+        image_hashes = {"cell_1_image_1.png": hashlib.sha256(b"data").hexdigest()}
+        cell = NotebookCell(cell_data, image_dir, 1, image_hashes)
+        cell.extract_image(base64.b64encode(b"data").decode(), "image/png")
+
+        self.assertEqual(image_path.read_bytes(), b"sentinel")
+        self.assertEqual(cell.image_digests, image_hashes)
+
+
+if __name__ == "__main__":
+    unittest.main()
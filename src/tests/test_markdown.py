@@ -0,0 +1,49 @@
+import unittest
+
+from src.ipynb2md.markdown import markdown_headings, normalize_markdown
+from src.ipynb2md.notebook_cell import NotebookCell
+
+
+def normalize(source):
+    fragments = []
+    summary = normalize_markdown(source, fragments.append)
+    return "".join(fragments), summary
+
+
+class TestMarkdown(unittest.TestCase):
+    def test_fence_info_string_is_kept(self):
+        text, _ = normalize(["Example:\n", "```python\n", "x = 1\n", "```\n", "Done"])
+        self.assertEqual(text, "Example:\n\n```python\nx = 1\n```\n\nDone")
+
+    def test_list_items_stay_together(self):
+        text, _ = normalize("- a\n- b\n  continued\n1. c\nAfter the list\n")
+        self.assertEqual(text, "- a\n- b\n  continued\n1. c\n\nAfter the list\n")
+
+    def test_heading_spacing_and_title(self):
+        text, summary = normalize("Intro\n# Title\nText\n## Section\n\nMore\n")
+        self.assertEqual(text, "Intro\n# Title\n\nText\n## Section\n\nMore\n")
+        self.assertEqual(summary, ("Title", 1))
+
+    def test_code_block_content_is_untouched(self):
+        source = "~~~\n# comment\n- item\n```\n~~~\n"
+        text, summary = normalize(source)
+        self.assertEqual(text, source)
+        self.assertIsNone(summary.title)
+
+    def test_headings_outside_code_blocks(self):
+        source = ["# Guide\n", "```\n", "# comment\n", "```\n", "## Setup ##\n"]
+        source.append("#tag\n")
+        self.assertEqual(markdown_headings(source), [(0, 1, "Guide"), (4, 2, "Setup")])
+
+    def test_cell_title_and_trailing_blank_line(self):
+        cell = NotebookCell(
+            {"cell_type": "markdown", "source": ["# My Notebook\n", "Text"]},
+            None,
+            1,
+        )
+        self.assertEqual(cell.to_markdown(), "# My Notebook\n\nText\n\n")
+        self.assertEqual(cell.markdown_title(), "My Notebook")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -68,6 +68,31 @@ class TestNotebookCell(unittest.TestCase):
         self.assertIn("# Heading", markdown)
         self.assertIn("Some text", markdown)
 
+    def test_cells_share_context(self):
+        image_data = base64.b64encode(b"fake_image_data").decode("utf-8")
+        cell_data = {
+            "cell_type": "code",
+            "source": ["x = 1"],
+            "metadata": {"language": "R"},
+            "outputs": [
+                {"output_type": "display_data", "data": {"image/png": image_data}}
+            ],
+        }
+        cell = NotebookCell(cell_data, self.image_dir, 1)
+        other = NotebookCell(cell_data, self.image_dir, 2, context=cell.context)
+        self.assertFalse(hasattr(cell, "__dict__"))
+        self.assertIs(other.image_writer, cell.image_writer)
+        self.assertEqual(cell.detect_language(), "r")
+        # Shared settings cannot be changed through a single cell
+        with self.assertRaises(AttributeError):
+            cell.image_dir = self.image_dir / "other"
+
+        other.render(lambda _: None, release=True)
+        self.assertEqual(other.outputs, ())
+        self.assertEqual(list(cell.image_digests), ["cell_2_image_1.png"])
+        # The caller's cell data keeps its outputs
+        self.assertEqual(len(cell_data["outputs"]), 1)
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,9 +1,15 @@
 import unittest
+import base64
+import io
 import json
+import os
+from contextlib import redirect_stderr
 from pathlib import Path
 from tempfile import TemporaryDirectory
 
+from src.ipynb2md.images import ImageWriter, ThreadedImageWriter
 from src.ipynb2md.notebook_converter import NotebookConverter
+from src.ipynb2md.options import ConversionOptions
 
 
 class TestNotebookConverter(unittest.TestCase):
@@ -55,6 +61,245 @@ class TestNotebookConverter(unittest.TestCase):
         self.assertIn("# Heading", markdown_content)
         self.assertIn("Some text", markdown_content)
 
+    def test_render_to_text_sink(self):
+        converter = NotebookConverter(str(self.test_notebook_path))
+        converter.read_notebook()
+        sink = io.StringIO()
+        converter.render(sink.write)
+        self.assertEqual(sink.getvalue(), converter.convert())
+
+    def test_relative_link(self):
+        converter = NotebookConverter(str(self.test_notebook_path))
+        self.assertEqual(
+            converter._relative_link(str(converter.image_dir / "cell_1_image_1.png")),
+            "./test_notebook_images/cell_1_image_1.png",
+        )
+        store_path = Path(self.temp_dir.name).parent / "store" / "a.png"
+        self.assertEqual(converter._relative_link(str(store_path)), "../store/a.png")
+
+    def test_links_of_notebook_in_subdirectory(self):
+        image_data = base64.b64encode(b"fake_image_data").decode("utf-8")
+        notebook_content = {
+            "cells": [
+                {
+                    "cell_type": "code",
+                    "source": ["plot()"],
+                    "metadata": {},
+                    "outputs": [
+                        {
+                            "output_type": "display_data",
+                            "data": {"image/png": image_data},
+                        }
+                    ],
+                }
+            ],
+            "metadata": {},
+        }
+        sub_dir = Path(self.temp_dir.name) / "sub"
+        sub_dir.mkdir()
+        with open(sub_dir / "nb.ipynb", "w") as f:
+            json.dump(notebook_content, f)
+
+        # Converted from the parent directory, the links are relative to sub/nb.md
+        previous_dir = os.getcwd()
+        os.chdir(self.temp_dir.name)
+        try:
+            converter = NotebookConverter(os.path.join("sub", "nb.ipynb"))
+            converter.read_notebook()
+            self.assertTrue(converter.save()[0])
+        finally:
+            os.chdir(previous_dir)
+
+        content = (sub_dir / "nb.md").read_text()
+        self.assertIn("](./nb_images/cell_1_image_1.png)", content)
+        self.assertTrue((sub_dir / "nb_images" / "cell_1_image_1.png").exists())
+
+    def test_inline_image_links_after_convert(self):
+        image_data = base64.b64encode(b"fake_image_data").decode("utf-8")
+        notebook_content = {
+            "cells": [
+                {
+                    "cell_type": "markdown",
+                    "source": [f"![x](data:image/png;base64,{image_data})"],
+                    "metadata": {},
+                }
+            ],
+            "metadata": {},
+        }
+        with open(self.test_notebook_path, "w") as f:
+            json.dump(notebook_content, f)
+
+        converter = NotebookConverter(str(self.test_notebook_path))
+        converter.read_notebook()
+        image_path = converter.image_dir / "cell_1_image_1.png"
+        self.assertIn(f"![x]({image_path})", converter.convert())
+
+        # The cell keeps the image path, the link is made when the file is written
+        self.assertTrue(converter.save()[0])
+        content = self.test_notebook_path.with_suffix(".md").read_text()
+        self.assertIn("![x](./test_notebook_images/cell_1_image_1.png)", content)
+
+    def test_deterministic_save(self):
+        image_data = base64.b64encode(b"fake_image_data").decode("utf-8")
+        notebook_content = {
+            "cells": [
+                {
+                    "cell_type": "code",
+                    "source": ["plot()"],
+                    "metadata": {},
+                    "outputs": [
+                        {
+                            "output_type": "display_data",
+                            "data": {
+                                "image/png": image_data,
+                                "text/plain": ["<Figure at 0x7f3a2b1c9d00>"],
+                            },
+                        }
+                    ],
+                }
+            ],
+            "metadata": {},
+        }
+        with open(self.test_notebook_path, "w") as f:
+            json.dump(notebook_content, f)
+        output_path = self.test_notebook_path.with_suffix(".md")
+
+        def save():
+            options = ConversionOptions(deterministic=True, normalize_volatile=True)
+            converter = NotebookConverter(
+                str(self.test_notebook_path),
+                image_writer=options.create_image_writer(),
+                deterministic=True,
+                normalize_volatile=True,
+            )
+            converter.read_notebook()
+            self.assertTrue(converter.save(formats=("markdown", "jsonl"))[0])
+            return output_path.read_text()
+
+        content = save()
+        # Images are named by their contents and linked relative to the output file
+        self.assertRegex(content, r"\]\(\./test_notebook_images/[0-9a-f]{16,}\.png\)")
+        self.assertIn("<Figure at 0x0>", content)
+        self.assertIn("0x0", self.test_notebook_path.with_suffix(".jsonl").read_text())
+
+        # An unchanged conversion leaves the files untouched
+        os.utime(output_path, (0, 0))
+        self.assertEqual(save(), content)
+        self.assertEqual(output_path.stat().st_mtime, 0)
+        self.assertEqual(
+            [path.name for path in Path(self.temp_dir.name).glob(".*.tmp")], []
+        )
+
+    def write_image_notebook(self, image_data):
+        notebook_content = {
+            "cells": [
+                {
+                    "cell_type": "code",
+                    "source": ["plot()"],
+                    "metadata": {},
+                    "outputs": [
+                        {
+                            "output_type": "display_data",
+                            "data": {"image/png": image_data},
+                        }
+                    ],
+                }
+            ],
+            "metadata": {},
+        }
+        with open(self.test_notebook_path, "w") as f:
+            json.dump(notebook_content, f)
+
+    def test_invalid_image_is_skipped_by_every_writer(self):
+        self.write_image_notebook("not base64!")
+
+        for image_writer in (ImageWriter(), ThreadedImageWriter(max_workers=1)):
+            with image_writer:
+                converter = NotebookConverter(
+                    str(self.test_notebook_path), image_writer=image_writer
+                )
+                converter.read_notebook()
+                with redirect_stderr(io.StringIO()) as stderr:
+                    success, _ = converter.save()
+
+            # The image is reported and left out before its link is written
+            self.assertTrue(success)
+            self.assertIn("Invalid Base64 data", stderr.getvalue())
+            self.assertNotIn(
+                "![Image", self.test_notebook_path.with_suffix(".md").read_text()
+            )
+
+    def test_invalid_inline_image_is_dropped_while_streaming(self):
+        with open(self.test_notebook_path, "w") as f:
+            json.dump(
+                {
+                    "cells": [
+                        {
+                            "cell_type": "markdown",
+                            "source": ["Plot: ![plot](data:image/png;base64,bad!)"],
+                            "metadata": {},
+                        }
+                    ],
+                    "metadata": {},
+                },
+                f,
+            )
+
+        with ThreadedImageWriter(max_workers=1) as image_writer:
+            converter = NotebookConverter(
+                str(self.test_notebook_path), image_writer=image_writer
+            )
+            with redirect_stderr(io.StringIO()) as stderr:
+                success, _ = converter.save_streaming()
+
+        self.assertTrue(success)
+        self.assertIn("Invalid Base64 data", stderr.getvalue())
+        markdown = self.test_notebook_path.with_suffix(".md").read_text()
+        self.assertIn("Plot:", markdown)
+        self.assertNotIn("![plot]", markdown)
+
+    def test_failed_background_image_is_not_linked(self):
+        self.write_image_notebook(base64.b64encode(b"fake_image_data").decode("ascii"))
+
+        class FailingImageWriter(ThreadedImageWriter):
+            def _store(self, image_path, chunks, atomic):
+                raise OSError("No space left on device")
+
+        with FailingImageWriter(max_workers=1) as image_writer:
+            converter = NotebookConverter(
+                str(self.test_notebook_path), image_writer=image_writer
+            )
+            converter.read_notebook()
+            with redirect_stderr(io.StringIO()) as stderr:
+                success, _ = converter.save()
+
+        # The cell waits for the writer thread, which reports the failure back
+        self.assertTrue(success)
+        self.assertIn("No space left on device", stderr.getvalue())
+        self.assertNotIn(
+            "![Image", self.test_notebook_path.with_suffix(".md").read_text()
+        )
+
+    def test_save_twice_keeps_outputs(self):
+        with open(self.test_notebook_path) as f:
+            notebook_content = json.load(f)
+        notebook_content["cells"][0]["outputs"] = [
+            {"output_type": "stream", "name": "stdout", "text": ["Hello, World!\n"]}
+        ]
+        with open(self.test_notebook_path, "w") as f:
+            json.dump(notebook_content, f)
+
+        converter = NotebookConverter(str(self.test_notebook_path))
+        converter.read_notebook()
+        first_path = Path(self.temp_dir.name) / "first.md"
+        second_path = Path(self.temp_dir.name) / "second.md"
+        converter.save(str(first_path))
+        converter.save(str(second_path))
+
+        self.assertIn("Hello, World!\n", first_path.read_text())
+        self.assertEqual(second_path.read_text(), first_path.read_text())
+        self.assertEqual(converter.convert(), first_path.read_text())
+
     def test_save(self):
         converter = NotebookConverter(str(self.test_notebook_path))
         converter.read_notebook()
@@ -68,6 +313,8 @@ class TestNotebookConverter(unittest.TestCase):
             self.assertIn("print('Hello, World!')", content)
             self.assertIn("# Heading", content)
             self.assertIn("Some text", content)
+        # Notebooks without images get no image directory
+        self.assertFalse(converter.image_dir.exists())
 
 
 if __name__ == "__main__":
@@ -0,0 +1,154 @@
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.constants import DEFAULT_DISPLAY_PRIORITY
+from src.ipynb2md.notebook_cell import NotebookCell
+from src.ipynb2md.outputs import (
+    OutputLimits,
+    apply_control_characters,
+    coalesce_streams,
+    select_representation,
+    write_truncated,
+)
+
+PNG_DATA = "iVBORw0KGgoAAAANSUhEUgAAAAEAAAABCAYAAAAfFcSJAAAADUlEQVR42mNkYPhfDwAChwGA60e6kgAAAABJRU5ErkJggg=="
+
+
+class TestOutputs(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.lines = [f"line {i}\n" for i in range(100)]
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_text_within_limits_is_unchanged(self):
+        fragments = []
+        result = write_truncated(fragments.append, "a\nb\nc", max_lines=3)
+
+        self.assertEqual("".join(fragments), "a\nb\nc")
+        self.assertEqual(result.omitted_lines, 0)
+
+    def test_head_and_tail_are_kept(self):
+        fragments = []
+        result = write_truncated(fragments.append, self.lines, max_lines=5)
+
+        self.assertEqual(
+            "".join(fragments),
+            "line 0\nline 1\nline 2\n[... 95 lines (753 bytes) omitted ...]\n"
+            "line 98\nline 99\n",
+        )
+        self.assertEqual((result.lines, result.omitted_lines), (5, 95))
+
+    def test_byte_limit(self):
+        fragments = []
+        result = write_truncated(fragments.append, "".join(self.lines), max_bytes=30)
+
+        self.assertLessEqual(result.bytes, 30)
+        self.assertTrue(fragments[0].startswith("line 0"))
+        self.assertEqual(fragments[-1], "line 99\n")
+
+    def test_spill_file_holds_full_text(self):
+        spill_path = self.root / "spill" / "output.txt"
+        result = write_truncated(
+            lambda fragment: None, self.lines, max_lines=4, spill_path=spill_path
+        )
+
+        self.assertTrue(result.spilled)
+        with open(spill_path) as f:
+            self.assertEqual(f.read(), "".join(self.lines))
+
+    def test_cell_limits_are_shared_by_outputs(self):
+        cell = NotebookCell(
+            {
+                "cell_type": "code",
+                "source": ["train()"],
+                "metadata": {},
+                "outputs": [
+                    {"output_type": "stream", "name": "stdout", "text": self.lines},
+                    {"output_type": "stream", "name": "stderr", "text": self.lines},
+                ],
+            },
+            self.root,
+            1,
+            output_limits=OutputLimits(max_lines=10, max_cell_lines=14, spill=True),
+        )
+        markdown = cell.to_markdown()
+
+        self.assertIn("[... 90 lines (715 bytes) omitted ...]", markdown)
+        self.assertIn("[... 96 lines (760 bytes) omitted ...]", markdown)
+        self.assertIn(f"]({self.root / 'cell_1_output_2.txt'})", markdown)
+
+    def test_carriage_returns_and_backspaces(self):
+        self.assertEqual(
+            apply_control_characters(
+                ["\r 10%|#   |", "\r 50%|##  |", "\r100%|####|\r", "\ndone\r\n"]
+            ),
+            ["100%|####|\n", "done\n"],
+        )
+        self.assertEqual(apply_control_characters(["abcdef\rXY"]), ["XYcdef"])
+        self.assertEqual(apply_control_characters(["ab\b\bcd\be"]), ["ce"])
+
+    def test_coalesce_adjacent_streams_of_same_name(self):
+        outputs = [
+            {"output_type": "stream", "name": "stdout", "text": ["a\n", "b"]},
+            {"output_type": "stream", "name": "stdout", "text": "c\n"},
+            {"output_type": "stream", "name": "stderr", "text": ["warning\n"]},
+            {"output_type": "execute_result", "data": {"text/plain": ["1"]}},
+            {"output_type": "stream", "name": "stdout", "text": ["x\r", "y\n"]},
+        ]
+        coalesced = coalesce_streams(outputs)
+
+        self.assertEqual([index for index, _ in coalesced], [0, 2, 3, 4])
+        self.assertEqual(coalesced[0][1]["text"], ["a\n", "b", "c\n"])
+        self.assertIs(coalesced[1][1], outputs[2])
+        self.assertEqual(coalesced[3][1]["text"], ["y\n"])
+        self.assertEqual(outputs[4]["text"], ["x\r", "y\n"])
+
+    def test_select_representation(self):
+        data = {"text/plain": ["<Figure>"], "image/svg+xml": ["<svg/>"]}
+        self.assertEqual(
+            select_representation(data, DEFAULT_DISPLAY_PRIORITY),
+            {"image/svg+xml": ["<svg/>"]},
+        )
+        self.assertEqual(select_representation(data, ("text/html",)), {})
+
+    def test_only_best_representation_is_written(self):
+        cell = NotebookCell(
+            {
+                "cell_type": "code",
+                "source": ["plt.plot()"],
+                "metadata": {},
+                "outputs": [
+                    {
+                        "output_type": "display_data",
+                        "data": {
+                            "text/plain": ["<Figure size 640x480 with 1 Axes>"],
+                            "image/svg+xml": ["<svg width='1'/>"],
+                            "image/png": PNG_DATA,
+                        },
+                    },
+                    {
+                        "output_type": "display_data",
+                        "data": {"image/svg+xml": ["<svg/>"], "text/plain": ["x"]},
+                    },
+                ],
+            },
+            self.root,
+            1,
+            display_priority=DEFAULT_DISPLAY_PRIORITY,
+        )
+        markdown = cell.to_markdown()
+
+        self.assertNotIn("<Figure", markdown)
+        self.assertEqual(
+            sorted(path.name for path in self.root.iterdir()),
+            ["cell_1_image_1.png", "cell_1_image_2.svg"],
+        )
+        self.assertEqual((self.root / "cell_1_image_2.svg").read_text(), "<svg/>")
+
+
+if __name__ == "__main__":
+    unittest.main()
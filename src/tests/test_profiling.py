@@ -0,0 +1,74 @@
+import unittest
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.notebook_converter import NotebookConverter
+from src.ipynb2md.profiling import NULL_PROFILER, Profiler
+
+
+class TestProfiler(unittest.TestCase):
+    def test_stage_and_callback(self):
+        events = []
+        profiler = Profiler(callback=lambda name, seconds: events.append(name))
+        with profiler.stage("parse"):
+            pass
+        with profiler.stage("parse"):
+            pass
+        profiler.count("cells", 3)
+
+        self.assertEqual(profiler.calls["parse"], 2)
+        self.assertEqual(profiler.counters["cells"], 3)
+        self.assertEqual(events, ["parse", "parse"])
+        self.assertIn("parse", profiler.report())
+
+    def test_merge(self):
+        first = Profiler()
+        first.add_time("parse", 1.0)
+        second = Profiler()
+        second.add_time("parse", 2.0)
+        second.count("cells")
+
+        first.merge(second.to_dict())
+        self.assertEqual(first.timings["parse"], 3.0)
+        self.assertEqual(first.calls["parse"], 2)
+        self.assertEqual(first.counters["cells"], 1)
+
+    def test_null_profiler_records_nothing(self):
+        with NULL_PROFILER.stage("parse"):
+            pass
+        NULL_PROFILER.count("cells")
+        self.assertEqual(NULL_PROFILER.to_dict()["timings"], {})
+        self.assertEqual(NULL_PROFILER.to_dict()["counters"], {})
+
+    def test_converter_stages(self):
+        with TemporaryDirectory() as temp_dir:
+            notebook_path = Path(temp_dir) / "notebook.ipynb"
+            notebook_content = {
+                "cells": [
+                    {"cell_type": "markdown", "source": ["# Title"], "metadata": {}},
+                    {
+                        "cell_type": "code",
+                        "source": ["print(1)"],
+                        "metadata": {},
+                        "outputs": [{"output_type": "stream", "text": ["1"]}],
+                    },
+                ],
+                "metadata": {},
+            }
+            with open(notebook_path, "w") as f:
+                json.dump(notebook_content, f)
+
+            profiler = Profiler()
+            converter = NotebookConverter(str(notebook_path), profiler=profiler)
+            converter.read_notebook()
+            converter.save(str(Path(temp_dir) / "notebook.md"))
+
+            for stage in ("read_notebook", "json_parse", "render", "write"):
+                self.assertIn(stage, profiler.timings)
+            self.assertEqual(profiler.counters["cells"], 2)
+            self.assertEqual(profiler.counters["outputs"], 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
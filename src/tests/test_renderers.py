@@ -0,0 +1,191 @@
+import base64
+import json
+import unittest
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.images import ImageWriter
+from src.ipynb2md.notebook_converter import NotebookConverter
+from src.ipynb2md.outputs import OutputLimits
+
+
+class CountingImageWriter(ImageWriter):
+    def __init__(self):
+        super().__init__()
+        self.submitted = 0
+        self.spilled = 0
+
+    def submit(self, *args, **kwargs):
+        self.submitted += 1
+        return super().submit(*args, **kwargs)
+
+    def open_text_file(self, path):
+        self.spilled += 1
+        return super().open_text_file(path)
+
+
+class TestRenderers(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.notebook_path = Path(self.temp_dir.name) / "notebook.ipynb"
+        image_data = base64.b64encode(b"fake_image_data").decode("utf-8")
+        notebook_content = {
+            "cells": [
+                {
+                    "cell_type": "markdown",
+                    "source": ["# Report\n", "Some <text>"],
+                    "metadata": {},
+                },
+                {
+                    "cell_type": "code",
+                    "source": ["print('hi')"],
+                    "metadata": {},
+                    "outputs": [
+                        {"output_type": "stream", "name": "stdout", "text": ["hi\n"]},
+                        {
+                            "output_type": "display_data",
+                            "data": {"image/png": image_data, "text/plain": ["<Fig>"]},
+                        },
+                        {
+                            "output_type": "error",
+                            "traceback": ["\x1b[0;31mValueError\x1b[0m: bad"],
+                        },
+                    ],
+                },
+            ],
+            "metadata": {"kernelspec": {"name": "python3", "language": "python"}},
+        }
+        with open(self.notebook_path, "w") as f:
+            json.dump(notebook_content, f)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_formats_share_one_pass(self):
+        image_writer = CountingImageWriter()
+        converter = NotebookConverter(
+            str(self.notebook_path), image_writer=image_writer
+        )
+        converter.read_notebook()
+        success, output = converter.save(formats=("markdown", "html", "text", "jsonl"))
+
+        self.assertTrue(success)
+        self.assertEqual(output, str(self.notebook_path.with_suffix(".md")))
+        # The image is written once and linked from every format
+        self.assertEqual(image_writer.submitted, 1)
+        link = "./notebook_images/cell_2_image_1.png"
+
+        markdown = self.notebook_path.with_suffix(".md").read_text()
+        self.assertIn(f"]({link})", markdown)
+
+        page = self.notebook_path.with_suffix(".html").read_text()
+        self.assertIn("<title>Report</title>", page)
+        self.assertIn(f'<img src="{link}"', page)
+        self.assertIn("&lt;Fig&gt;", page)
+        self.assertTrue(page.rstrip().endswith("</html>"))
+
+        text = self.notebook_path.with_suffix(".txt").read_text()
+        self.assertIn("Some <text>", text)
+        self.assertIn("ValueError: bad", text)
+        self.assertNotIn("\x1b", text)
+
+        with open(self.notebook_path.with_suffix(".jsonl")) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(
+            [record["language"] for record in records], ["markdown", "python"]
+        )
+        self.assertEqual(
+            [output["type"] for output in records[1]["outputs"]],
+            ["text", "text", "image", "error"],
+        )
+        self.assertEqual(records[1]["outputs"][2]["path"], link)
+
+    def test_output_limits_apply_to_every_format(self):
+        with open(self.notebook_path) as f:
+            notebook_content = json.load(f)
+        lines = [f"line {number}\n" for number in range(100)]
+        notebook_content["cells"][1]["outputs"][0]["text"] = lines
+        with open(self.notebook_path, "w") as f:
+            json.dump(notebook_content, f)
+
+        image_writer = CountingImageWriter()
+        converter = NotebookConverter(
+            str(self.notebook_path),
+            image_writer=image_writer,
+            output_limits=OutputLimits(max_lines=4, spill=True),
+        )
+        converter.read_notebook()
+        formats = ("markdown", "html", "text", "jsonl", "index")
+        self.assertTrue(converter.save(formats=formats)[0])
+        # The truncated output is spilled once for every format
+        self.assertEqual(image_writer.spilled, 1)
+
+        for suffix in (".md", ".html", ".txt", ".jsonl"):
+            content = self.notebook_path.with_suffix(suffix).read_text()
+            self.assertIn("[... 96 lines", content)
+            self.assertNotIn("line 50", content)
+        record = json.loads(
+            self.notebook_path.with_suffix(".jsonl").read_text().splitlines()[1]
+        )
+        self.assertEqual(
+            record["outputs"][0]["full_output"],
+            "./notebook_images/cell_2_output_1.txt",
+        )
+        spill_path = converter.image_dir / "cell_2_output_1.txt"
+        self.assertEqual(spill_path.read_text(), "".join(lines))
+
+    def test_streaming_formats(self):
+        converter = NotebookConverter(str(self.notebook_path))
+        output_file = Path(self.temp_dir.name) / "out" / "preview.md"
+        output_file.parent.mkdir()
+        success, output = converter.save_streaming(str(output_file), ("html", "text"))
+
+        self.assertTrue(success)
+        self.assertEqual(output, str(output_file.with_suffix(".html")))
+        self.assertFalse(output_file.exists())
+        # The title is not known before the cells while streaming
+        page = output_file.with_suffix(".html").read_text()
+        self.assertIn("<title>notebook</title>", page)
+        self.assertIn("hi", output_file.with_suffix(".txt").read_text())
+
+    def test_search_index_chunks(self):
+        notebook_content = {
+            "cells": [
+                {
+                    "cell_type": "markdown",
+                    "source": ["# Guide\n", "## Setup\n", "Install"],
+                },
+                {"cell_type": "code", "source": ["pip install x"], "outputs": []},
+                {"cell_type": "markdown", "source": ["# Usage\n", "word " * 10]},
+            ],
+            "metadata": {},
+        }
+        with open(self.notebook_path, "w") as f:
+            json.dump(notebook_content, f)
+
+        converter = NotebookConverter(str(self.notebook_path), index_chunk_size=20)
+        converter.read_notebook()
+        converter.save(formats=("index",))
+
+        with open(self.notebook_path.with_suffix(".index.jsonl")) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual(
+            [(record["cell"], record["chunk"]) for record in records],
+            [(1, 0), (1, 1), (2, 0), (3, 0), (3, 1), (3, 2), (3, 3)],
+        )
+        self.assertEqual(records[1]["headings"], ["Guide", "Setup"])
+        self.assertEqual(records[1]["text"], "## Setup\nInstall")
+        self.assertEqual(records[2]["language"], "python")
+        self.assertEqual(records[2]["headings"], ["Guide", "Setup"])
+        self.assertEqual(records[4]["headings"], ["Usage"])
+        self.assertEqual(records[4]["notebook"], str(self.notebook_path))
+        self.assertTrue(all(len(record["text"]) <= 20 for record in records))
+
+    def test_unknown_format(self):
+        converter = NotebookConverter(str(self.notebook_path))
+        with self.assertRaises(ValueError):
+            converter.resolve_output_paths(None, ("markdown", "pdf"))
+
+
+if __name__ == "__main__":
+    unittest.main()
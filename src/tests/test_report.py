@@ -0,0 +1,80 @@
+import unittest
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.batch import ConversionResult
+from src.ipynb2md.report import build_report, load_report, merge_reports, write_report
+
+
+class TestReport(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_merge_shard_reports(self):
+        first = build_report(
+            [
+                ConversionResult(
+                    "b.ipynb",
+                    True,
+                    "b.md",
+                    "b_images",
+                    0.5,
+                    images={"cell_1_image_1.png": "abc"},
+                ),
+                ConversionResult(
+                    "a.ipynb", False, "Notebook could not be read", None, 0.1
+                ),
+            ],
+            (1, 3),
+            1.5,
+            {"timings": {"render": 0.25}, "calls": {"render": 1}, "counters": {}},
+        )
+        second = build_report(
+            [ConversionResult("c.ipynb", True, "c.md", None, 0.2, skipped=True)],
+            (3, 3),
+            0.5,
+            {"timings": {"render": 0.5}, "calls": {"render": 2}, "counters": {}},
+        )
+        path = str(self.root / "reports" / "shard-1.json")
+        write_report(path, first)
+
+        merged = merge_reports([load_report(path), second])
+
+        self.assertEqual(merged["shards"], [1, 3])
+        self.assertEqual(merged["missing_shards"], [2])
+        self.assertEqual(
+            [entry["input"] for entry in merged["notebooks"]],
+            ["a.ipynb", "b.ipynb", "c.ipynb"],
+        )
+        self.assertEqual(merged["notebooks"][0]["error"], "Notebook could not be read")
+        self.assertEqual(
+            {key: merged["summary"][key] for key in ("converted", "skipped", "failed")},
+            {"converted": 1, "skipped": 1, "failed": 1},
+        )
+        self.assertEqual(merged["summary"]["images"], 1)
+        self.assertEqual(merged["elapsed"], {"1": 1.5, "3": 0.5})
+        self.assertEqual(merged["profile"]["timings"], {"render": 0.75})
+        self.assertEqual(merged["profile"]["calls"], {"render": 3})
+
+    def test_merge_rejects_inconsistent_shards(self):
+        report = build_report([], (1, 2))
+        with self.assertRaises(ValueError):
+            merge_reports([report, report])
+        with self.assertRaises(ValueError):
+            merge_reports([report, build_report([], (2, 3))])
+
+    def test_load_rejects_other_files(self):
+        path = self.root / "manifest.json"
+        with open(path, "w") as f:
+            json.dump({"version": 1, "entries": {}}, f)
+        with self.assertRaises(ValueError):
+            load_report(str(path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+import io
+import json
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.notebook_converter import NotebookConverter
+from src.ipynb2md.streaming import NotebookStreamReader
+
+
+class TestNotebookStreamReader(unittest.TestCase):
+    def setUp(self):
+        self.notebook_content = {
+            "cells": [
+                {
+                    "cell_type": "markdown",
+                    "source": ["# Heading\n", "Some text ", "x" * 500],
+                    "metadata": {},
+                },
+                {
+                    "cell_type": "code",
+                    "source": ["print('Hello, World!')"],
+                    "metadata": {},
+                    "outputs": [{"output_type": "stream", "text": ["12345"]}],
+                },
+            ],
+            "metadata": {"kernelspec": {"name": "python3", "language": "python"}},
+            "nbformat": 4,
+            "nbformat_minor": 12345,
+        }
+
+    def test_cells_match_json_load(self):
+        for indent in (None, 2):
+            text = json.dumps(self.notebook_content, indent=indent)
+            # A tiny chunk size forces values to span many reads
+            reader = NotebookStreamReader(io.StringIO(text), chunk_size=7)
+            cells = list(reader.cells())
+            self.assertEqual(cells, self.notebook_content["cells"])
+            self.assertEqual(reader.notebook_data["nbformat_minor"], 12345)
+            self.assertEqual(
+                reader.notebook_data["metadata"], self.notebook_content["metadata"]
+            )
+
+    def test_read_entries_skips_cells(self):
+        self.notebook_content["cells"][0]["source"].append('"[{\\"}]')
+        text = json.dumps(self.notebook_content, indent=1)
+        reader = NotebookStreamReader(io.StringIO(text), chunk_size=5)
+        entries = reader.read_entries()
+        self.assertEqual(entries["metadata"], self.notebook_content["metadata"])
+        self.assertEqual(entries["nbformat_minor"], 12345)
+        self.assertNotIn("cells", entries)
+
+    def test_invalid_document(self):
+        reader = NotebookStreamReader(io.StringIO('{"cells": [{"a": 1} {"b": 2}]}'))
+        with self.assertRaises(json.JSONDecodeError):
+            list(reader.cells())
+
+    def test_save_streaming_matches_save(self):
+        with TemporaryDirectory() as temp_dir:
+            notebook_path = Path(temp_dir) / "notebook.ipynb"
+            with open(notebook_path, "w") as f:
+                json.dump(self.notebook_content, f)
+
+            converter = NotebookConverter(str(notebook_path))
+            converter.read_notebook()
+            converter.save(str(Path(temp_dir) / "full.md"))
+
+            streaming = NotebookConverter(str(notebook_path))
+            success, _ = streaming.save_streaming(str(Path(temp_dir) / "stream.md"))
+
+            self.assertTrue(success)
+            self.assertEqual(streaming.cells, [])
+            self.assertEqual(
+                (Path(temp_dir) / "full.md").read_text(),
+                (Path(temp_dir) / "stream.md").read_text(),
+            )
+
+    def test_save_streaming_uses_kernel_language(self):
+        self.notebook_content["cells"][1]["source"] = ["x <- 1\n", "x + 1"]
+        self.notebook_content["metadata"] = {
+            "kernelspec": {"name": "ir", "language": "R"}
+        }
+        with TemporaryDirectory() as temp_dir:
+            notebook_path = Path(temp_dir) / "notebook.ipynb"
+            with open(notebook_path, "w") as f:
+                json.dump(self.notebook_content, f)
+
+            streaming = NotebookConverter(str(notebook_path))
+            success, output = streaming.save_streaming()
+
+            self.assertTrue(success)
+            # The metadata follows the cells in the file
+            self.assertIn("```r\n", Path(output).read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+import unittest
+
+from src.ipynb2md.notebook_cell import NotebookCell
+from src.ipynb2md.tables import TableLimits, parse_html_tables, write_markdown_tables
+
+DATAFRAME_HTML = [
+    "<div>\n",
+    "<style scoped>\n",
+    "    .dataframe thead th { text-align: right; }\n",
+    "</style>\n",
+    '<table border="1" class="dataframe">\n',
+    "  <thead>\n",
+    "    <tr><th></th><th>name</th><th>value</th></tr>\n",
+    "  </thead>\n",
+    "  <tbody>\n",
+    "    <tr><th>0</th><td>a|b</td><td>1</td></tr>\n",
+    "    <tr><th>1</th><td>c</td><td>2</td></tr>\n",
+    "    <tr><th>2</th><td>d</td><td>3</td></tr>\n",
+    "  </tbody>\n",
+    "</table>\n",
+    "</div>",
+]
+
+
+def render(html, limits):
+    fragments = []
+    write_markdown_tables(parse_html_tables(html, limits), fragments.append)
+    return "".join(fragments)
+
+
+class TestTables(unittest.TestCase):
+    def test_dataframe_to_pipe_table(self):
+        self.assertEqual(
+            render(DATAFRAME_HTML, TableLimits()),
+            "|  | name | value |\n"
+            "| --- | --- | --- |\n"
+            "| 0 | a\\|b | 1 |\n"
+            "| 1 | c | 2 |\n"
+            "| 2 | d | 3 |\n\n",
+        )
+
+    def test_rows_and_columns_are_capped(self):
+        self.assertEqual(
+            render(DATAFRAME_HTML, TableLimits(max_rows=1, max_columns=2)),
+            "|  | name | ... |\n"
+            "| --- | --- | --- |\n"
+            "| 0 | a\\|b | ... |\n"
+            "| ... | ... | ... |\n\n",
+        )
+
+    def test_spans_keep_columns_aligned(self):
+        html = (
+            "<table><tr><th colspan='2'>A</th><th>B</th></tr>"
+            "<tr><td rowspan='2'>x</td><td>1</td><td>2</td></tr>"
+            "<tr><td>3</td><td>4</td></tr></table>"
+        )
+        self.assertEqual(
+            render(html, TableLimits()),
+            "| A |  | B |\n| --- | --- | --- |\n| x | 1 | 2 |\n|  | 3 | 4 |\n\n",
+        )
+
+    def test_unsupported_html_is_rejected(self):
+        self.assertIsNone(parse_html_tables("<p>No table</p>", TableLimits()))
+        self.assertIsNone(
+            parse_html_tables(
+                "<table><tr><td><img src='x.png'></td></tr></table>", TableLimits()
+            )
+        )
+
+    def test_cell_skips_plain_text_duplicate(self):
+        cell = NotebookCell(
+            {
+                "cell_type": "code",
+                "source": ["df"],
+                "metadata": {},
+                "outputs": [
+                    {
+                        "output_type": "execute_result",
+                        "data": {
+                            "text/plain": ["  name  value\n", "0    a      1"],
+                            "text/html": DATAFRAME_HTML,
+                        },
+                    }
+                ],
+            },
+            None,
+            1,
+            table_limits=TableLimits(),
+        )
+        markdown = cell.to_markdown()
+
+        self.assertIn("| 2 | d | 3 |", markdown)
+        self.assertNotIn("```html", markdown)
+        self.assertNotIn("name  value", markdown)
+
+
+if __name__ == "__main__":
+    unittest.main()
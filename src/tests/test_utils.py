@@ -0,0 +1,29 @@
+import unittest
+
+from src.ipynb2md.constants import DEFAULT_DISPLAY_PRIORITY
+from src.ipynb2md.utils import setup_argparser
+
+
+class TestArgumentParser(unittest.TestCase):
+    def setUp(self):
+        self.parser = setup_argparser()
+
+    def test_best_display_keeps_inputs(self):
+        args = self.parser.parse_args(["--best-display", "a.ipynb", "b.ipynb"])
+        self.assertEqual(args.display_priority, DEFAULT_DISPLAY_PRIORITY)
+        self.assertEqual(args.input_files, ["a.ipynb", "b.ipynb"])
+
+    def test_display_priority(self):
+        args = self.parser.parse_args(
+            ["--display-priority", "text/html, image/png", "a.ipynb"]
+        )
+        self.assertEqual(args.display_priority, ("text/html", "image/png"))
+        self.assertIsNone(self.parser.parse_args(["a.ipynb"]).display_priority)
+
+    def test_display_priority_rejects_non_mime_types(self):
+        with self.assertRaises(SystemExit):
+            self.parser.parse_args(["--display-priority", "a.ipynb", "b.ipynb"])
+
+
+if __name__ == "__main__":
+    unittest.main()
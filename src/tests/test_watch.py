@@ -0,0 +1,113 @@
+import unittest
+import json
+import os
+import sys
+import threading
+from pathlib import Path
+from tempfile import TemporaryDirectory
+
+from src.ipynb2md.manifest import Manifest
+from src.ipynb2md.options import ConversionOptions
+from src.ipynb2md.watch import Debouncer, InotifyWatcher, PollingWatcher, watch
+
+
+def write_notebook(path, text):
+    with open(path, "w") as f:
+        json.dump(
+            {
+                "cells": [{"cell_type": "markdown", "source": [text], "metadata": {}}],
+                "metadata": {},
+            },
+            f,
+        )
+
+
+class TestWatch(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = TemporaryDirectory()
+        self.root = Path(self.temp_dir.name)
+        self.notebook = self.root / "a.ipynb"
+        write_notebook(self.notebook, "first")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def test_debouncer_waits_for_quiet_period(self):
+        debouncer = Debouncer(0.5)
+        debouncer.add([Path("a"), Path("b")], now=10.0)
+        debouncer.add([Path("a")], now=10.3)
+
+        self.assertEqual(debouncer.ready(now=10.6), [])
+        self.assertAlmostEqual(debouncer.timeout(now=10.6, idle=5.0), 0.2)
+        self.assertEqual(debouncer.ready(now=10.8), [Path("a"), Path("b")])
+        self.assertEqual(debouncer.ready(now=11.0), [])
+
+    def test_polling_watcher_reports_modified_notebooks(self):
+        watcher = PollingWatcher([self.root], interval=0)
+        self.assertEqual(watcher.wait(0), set())
+
+        write_notebook(self.notebook, "second, longer")
+        (self.root / "notes.txt").write_text("ignored")
+        self.assertEqual(watcher.wait(0), {self.notebook})
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_watcher_reports_saved_notebooks(self):
+        watcher = InotifyWatcher([self.root])
+        try:
+            write_notebook(self.notebook, "second")
+            # Jupyter saves through a temporary file renamed over the notebook
+            temp_path = self.root / "b.ipynb~"
+            write_notebook(temp_path, "new")
+            os.replace(temp_path, self.root / "b.ipynb")
+
+            self.assertEqual(watcher.wait(1.0), {self.notebook, self.root / "b.ipynb"})
+        finally:
+            watcher.close()
+
+    @unittest.skipUnless(sys.platform.startswith("linux"), "inotify is Linux only")
+    def test_inotify_watcher_matches_glob_patterns(self):
+        docs = self.root / "docs"
+        (docs / "sub").mkdir(parents=True)
+        watcher = InotifyWatcher([docs / "*.ipynb"])
+        try:
+            write_notebook(docs / "b.ipynb", "new")
+            write_notebook(docs / "sub" / "c.ipynb", "not matched")
+            write_notebook(self.notebook, "outside the pattern")
+
+            self.assertEqual(watcher.wait(1.0), {docs / "b.ipynb"})
+        finally:
+            watcher.close()
+
+    def test_watch_reconverts_changed_notebook(self):
+        stop = threading.Event()
+        results = []
+
+        def on_result(result):
+            results.append(result)
+            if len(results) == 1:
+                write_notebook(self.notebook, "second")
+            else:
+                stop.set()
+
+        # Never hang the test suite if the change goes unnoticed
+        timer = threading.Timer(5.0, stop.set)
+        timer.start()
+        watch(
+            [str(self.root)],
+            ConversionOptions(),
+            Manifest(),
+            on_result=on_result,
+            debounce=0.01,
+            poll_interval=0.05,
+            stop=stop,
+        )
+        timer.cancel()
+
+        self.assertEqual(len(results), 2)
+        self.assertTrue(all(result.success for result in results))
+        with open(self.root / "a.md") as f:
+            self.assertIn("second", f.read())
+
+
+if __name__ == "__main__":
+    unittest.main()